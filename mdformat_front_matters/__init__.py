@@ -6,6 +6,87 @@ __plugin_name__ = "front_matters"
 
 # FYI see source code for available interfaces:
 #   https://github.com/executablebooks/mdformat/blob/5d9b573ce33bae219087984dd148894c774f41d4/src/mdformat/plugins.py
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+from ._data import FrontMatterData, front_matter_data
+from ._extract import FrontMatterBlock, extract
+from ._formatters import BlockLimits, YAMLBudget
+from ._settings import FrontMatterSettings
+from ._stats import (
+    FrontMatterStats,
+    PhaseStats,
+    enable_stats,
+    get_stats,
+    reset_stats,
+)
+from .mdit_plugins import FrontMatterFormat, register_format
 from .plugin import POSTPROCESSORS, RENDERERS, add_cli_argument_group, update_mdit
 
-__all__ = ("POSTPROCESSORS", "RENDERERS", "add_cli_argument_group", "update_mdit")
+if TYPE_CHECKING:
+    from ._async import AsyncFormatter, aformat_many, aformat_text
+    from ._batch import FileResult, FrontMatterIssue, check_files, format_files
+    from ._splice import check_front_matter, format_front_matter
+
+# mdformat imports the plugin on every run; the APIs for use from Python are
+# imported on first access, along with the process pools they depend on
+_LAZY = {
+    "AsyncFormatter": "._async",
+    "aformat_many": "._async",
+    "aformat_text": "._async",
+    "FileResult": "._batch",
+    "FrontMatterIssue": "._batch",
+    "check_files": "._batch",
+    "format_files": "._batch",
+    "check_front_matter": "._splice",
+    "format_front_matter": "._splice",
+}
+
+__all__ = (
+    "POSTPROCESSORS",
+    "RENDERERS",
+    "AsyncFormatter",
+    "BlockLimits",
+    "FileResult",
+    "FrontMatterBlock",
+    "FrontMatterData",
+    "FrontMatterFormat",
+    "FrontMatterIssue",
+    "FrontMatterSettings",
+    "FrontMatterStats",
+    "PhaseStats",
+    "YAMLBudget",
+    "add_cli_argument_group",
+    "aformat_many",
+    "aformat_text",
+    "check_files",
+    "check_front_matter",
+    "enable_stats",
+    "extract",
+    "format_files",
+    "format_front_matter",
+    "front_matter_data",
+    "get_stats",
+    "register_format",
+    "reset_stats",
+    "update_mdit",
+)
+
+
+def __getattr__(name: str) -> Any:  # noqa: ANN401
+    """Import the Python APIs on first access.
+
+    Raises:
+        AttributeError: If the module has no such attribute.
+    """
+    if name not in _LAZY:
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg)
+    value = getattr(import_module(_LAZY[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    """List the lazily imported APIs along with the module attributes."""
+    return sorted({*globals(), *_LAZY})
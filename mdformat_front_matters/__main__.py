@@ -0,0 +1,154 @@
+"""Format front matter in many files in parallel: `python -m mdformat_front_matters`."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from collections.abc import Sequence
+from typing import Any
+
+from ._batch import check_files, format_files
+from .plugin import add_cli_argument_group
+
+
+def _wrap(value: str) -> str | int:
+    if value in {"keep", "no"}:
+        return value
+    return int(value)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Run the batch formatter.
+
+    Args:
+        argv: Command line arguments (default: `sys.argv[1:]`).
+
+    Returns:
+        Exit code: 1 if any file failed or, with `--check` or
+        `--check-front-matter`, would change.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m mdformat_front_matters",
+        description="Format Markdown files with mdformat across worker processes.",
+    )
+    parser.add_argument(
+        "paths", nargs="+", help="files, directories or glob patterns ('**')"
+    )
+    parser.add_argument(
+        "--check", action="store_true", help="do not apply changes to files"
+    )
+    parser.add_argument(
+        "--check-front-matter",
+        action="store_true",
+        help=(
+            "only check that front matter is formatted, without rendering the "
+            "body or writing files"
+        ),
+    )
+    parser.add_argument(
+        "--fail-fast",
+        action="store_true",
+        help="with --check-front-matter, stop at the first unformatted file",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help=(
+            "with --check-front-matter, print the unformatted files and the "
+            "byte ranges of their front matter as JSON"
+        ),
+    )
+    parser.add_argument(
+        "--front-matter-only",
+        action="store_true",
+        help="format only the front matter and copy the rest of each file as is",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        metavar="N",
+        help="number of worker processes (default: the CPU count)",
+    )
+    parser.add_argument(
+        "--wrap",
+        type=_wrap,
+        default="keep",
+        metavar="{keep,no,INTEGER}",
+        help="paragraph word wrap mode (default: keep)",
+    )
+    parser.add_argument(
+        "--end-of-line",
+        choices=("lf", "crlf", "keep"),
+        default="lf",
+        help="output file line ending mode (default: lf)",
+    )
+    parser.add_argument(
+        "--no-validate",
+        action="store_false",
+        dest="validate",
+        help="do not validate that the rendered HTML is consistent",
+    )
+    plugin_group = parser.add_argument_group("front_matters")
+    add_cli_argument_group(plugin_group)
+    args = parser.parse_args(argv)
+
+    plugin_keys = {action.dest for action in plugin_group._group_actions}  # noqa: SLF001
+    options = {
+        "wrap": args.wrap,
+        "end_of_line": args.end_of_line,
+        "validate": args.validate,
+        "plugin": {
+            "front_matters": {
+                key: value
+                for key, value in vars(args).items()
+                if key in plugin_keys and value is not None
+            }
+        },
+    }
+
+    if args.check_front_matter:
+        return _check(args, options)
+    exit_code = 0
+    for result in format_files(
+        args.paths,
+        workers=args.workers,
+        options=options,
+        check=args.check,
+        front_matter_only=args.front_matter_only,
+    ):
+        if result.error is not None:
+            message = f'Error: Failed to format "{result.path}": {result.error}'
+        elif result.changed and args.check:
+            message = f'Error: File "{result.path}" is not formatted.'
+        else:
+            continue
+        print(message, file=sys.stderr)  # noqa: T201
+        exit_code = 1
+    return exit_code
+
+
+def _check(args: argparse.Namespace, options: dict[str, Any]) -> int:
+    """Report the files whose front matter is not formatted."""
+    issues = []
+    for issue in check_files(
+        args.paths, workers=args.workers, options=options, fail_fast=args.fail_fast
+    ):
+        issues.append(issue)
+        if args.json:
+            continue
+        if issue.error is not None:
+            message = f'Error: Failed to check "{issue.path}": {issue.error}'
+        else:
+            message = (
+                f'Error: Front matter of "{issue.path}" is not formatted '
+                f"(bytes {issue.start_byte}-{issue.end_byte})."
+            )
+        print(message, file=sys.stderr)  # noqa: T201
+    if args.json:
+        print(json.dumps([issue._asdict() for issue in issues], indent=2))  # noqa: T201
+    return int(bool(issues))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+"""Format Markdown from asyncio code without blocking the event loop."""
+
+from __future__ import annotations
+
+import os
+import threading
+import weakref
+from collections.abc import Iterable, Mapping
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from contextlib import suppress
+from types import TracebackType
+from typing import TYPE_CHECKING, Any
+
+from ._batch import _init_worker
+from ._splice import format_front_matter
+
+if TYPE_CHECKING:
+    import asyncio  # Imported on first use, as it is slow to import
+    from concurrent.futures import ProcessPoolExecutor
+
+    from typing_extensions import Self
+
+_DEFAULT_EXTENSIONS = ("front_matters",)
+
+
+def _format_text(
+    text: str,
+    extensions: tuple[str, ...],
+    options: Mapping[str, Any],
+    front_matter_only: bool,
+) -> str:
+    """Format one document in a worker thread or process."""
+    if front_matter_only:
+        return format_front_matter(text, options=options)
+    import mdformat  # noqa: PLC0415
+
+    return mdformat.text(text, options=options, extensions=extensions)
+
+
+class AsyncFormatter:
+    """Format Markdown on a long-lived executor from asyncio code.
+
+    Workers are warmed up once, loading the plugins and parsing backends, and
+    keep the formatter caches and YAML engines between calls. At most
+    `max_in_flight` documents are queued on or running in the executor: more
+    callers wait without blocking the event loop. Cancelling a caller cancels
+    its document if a worker has not started it yet; a document that is being
+    formatted finishes in the background and still holds its slot until then.
+
+    Use as an async context manager, or call `close` when done.
+    """
+
+    def __init__(
+        self,
+        *,
+        executor: Executor | None = None,
+        workers: int | None = None,
+        processes: bool = False,
+        max_in_flight: int | None = None,
+        options: Mapping[str, Any] | None = None,
+        extensions: Iterable[str] = _DEFAULT_EXTENSIONS,
+    ) -> None:
+        """Create the formatter and, unless one is given, its executor.
+
+        Args:
+            executor: Executor to submit work to. It is not warmed up or shut
+                down by this formatter.
+            workers: Number of workers of the owned executor (default: the CPU
+                count).
+            processes: Use worker processes instead of threads. Processes
+                format in parallel, while threads only keep the event loop
+                responsive, but options must be picklable.
+            max_in_flight: Maximum number of documents submitted at once
+                (default: twice the number of workers).
+            options: mdformat options, as for `mdformat.text`.
+            extensions: mdformat parser extensions to enable.
+        """
+        workers = workers or os.cpu_count() or 1
+        self.extensions = tuple(extensions)
+        self.options = dict(options or {})
+        self.max_in_flight = max_in_flight or 2 * workers
+        self._owns_executor = executor is None
+        if executor is None:
+            if processes:
+                from concurrent.futures import ProcessPoolExecutor  # noqa: PLC0415
+
+                pool_class: type[ProcessPoolExecutor | ThreadPoolExecutor] = (
+                    ProcessPoolExecutor
+                )
+            else:
+                pool_class = ThreadPoolExecutor
+            executor = pool_class(
+                workers,
+                initializer=_init_worker,
+                initargs=(self.extensions, self.options),
+            )
+        self.executor: Executor = executor
+        # asyncio primitives belong to one event loop
+        self._slots: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, asyncio.Semaphore
+        ] = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _semaphore(self, loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+        import asyncio  # noqa: PLC0415
+
+        with self._lock:
+            if (semaphore := self._slots.get(loop)) is None:
+                semaphore = self._slots[loop] = asyncio.Semaphore(self.max_in_flight)
+            return semaphore
+
+    def _submit(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        semaphore: asyncio.Semaphore,
+        text: str,
+        front_matter_only: bool,
+    ) -> asyncio.Future[str]:
+        """Submit a document whose slot the caller has acquired.
+
+        The slot is released when the executor is done with the document,
+        even if the caller was cancelled.
+        """
+        try:
+            future: Future[str] = self.executor.submit(
+                _format_text, text, self.extensions, self.options, front_matter_only
+            )
+        except BaseException:
+            semaphore.release()
+            raise
+
+        def release(_: Future[str]) -> None:
+            with suppress(RuntimeError):  # The event loop was closed
+                loop.call_soon_threadsafe(semaphore.release)
+
+        future.add_done_callback(release)
+        import asyncio  # noqa: PLC0415
+
+        return asyncio.wrap_future(future, loop=loop)
+
+    async def format_text(self, text: str, *, front_matter_only: bool = False) -> str:
+        """Format a Markdown document.
+
+        Args:
+            text: Markdown document.
+            front_matter_only: If True, format only the front matter and keep
+                the rest of the document unchanged.
+
+        Returns:
+            The formatted document.
+        """
+        import asyncio  # noqa: PLC0415
+
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphore(loop)
+        await semaphore.acquire()
+        return await self._submit(loop, semaphore, text, front_matter_only)
+
+    async def format_many(
+        self, texts: Iterable[str], *, front_matter_only: bool = False
+    ) -> list[str]:
+        """Format Markdown documents concurrently.
+
+        Documents are taken from `texts` only as slots become free, so a lazy
+        iterable is never read far ahead of the workers. If a document fails
+        or the caller is cancelled, the documents not yet started are
+        cancelled.
+
+        Args:
+            texts: Markdown documents.
+            front_matter_only: If True, format only the front matter and keep
+                the rest of each document unchanged.
+
+        Returns:
+            The formatted documents, in input order.
+        """
+        import asyncio  # noqa: PLC0415
+
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphore(loop)
+        futures: list[asyncio.Future[str]] = []
+        try:
+            for text in texts:
+                await semaphore.acquire()
+                futures.append(self._submit(loop, semaphore, text, front_matter_only))
+            return list(await asyncio.gather(*futures))
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+    def close(self, *, wait: bool = True) -> None:
+        """Shut down the executor, if this formatter created it.
+
+        Args:
+            wait: Wait for the documents being formatted to finish.
+        """
+        if self._owns_executor:
+            self.executor.shutdown(wait=wait, cancel_futures=True)
+
+    async def __aenter__(self) -> Self:
+        """Return the formatter."""
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Shut down the executor without blocking the event loop."""
+        import asyncio  # noqa: PLC0415
+
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+
+_SHARED: dict[tuple[object, ...], AsyncFormatter] = {}
+_SHARED_LOCK = threading.Lock()
+
+
+def _shared_formatter(
+    options: Mapping[str, Any] | None, extensions: Iterable[str]
+) -> AsyncFormatter:
+    """Return the thread-backed formatter shared by calls with these options."""
+    key = (repr(sorted((options or {}).items())), tuple(extensions))
+    with _SHARED_LOCK:
+        if (formatter := _SHARED.get(key)) is None:
+            formatter = _SHARED[key] = AsyncFormatter(
+                options=options, extensions=extensions
+            )
+        return formatter
+
+
+async def aformat_text(
+    text: str,
+    *,
+    options: Mapping[str, Any] | None = None,
+    extensions: Iterable[str] = _DEFAULT_EXTENSIONS,
+    front_matter_only: bool = False,
+    formatter: AsyncFormatter | None = None,
+) -> str:
+    """Format a Markdown document without blocking the event loop.
+
+    Args:
+        text: Markdown document.
+        options: mdformat options, as for `mdformat.text`.
+        extensions: mdformat parser extensions to enable.
+        front_matter_only: If True, format only the front matter.
+        formatter: Formatter to use instead of a shared thread-backed one;
+            `options` and `extensions` are then ignored.
+
+    Returns:
+        The formatted document.
+    """
+    formatter = formatter or _shared_formatter(options, extensions)
+    return await formatter.format_text(text, front_matter_only=front_matter_only)
+
+
+async def aformat_many(
+    texts: Iterable[str],
+    *,
+    options: Mapping[str, Any] | None = None,
+    extensions: Iterable[str] = _DEFAULT_EXTENSIONS,
+    front_matter_only: bool = False,
+    formatter: AsyncFormatter | None = None,
+) -> list[str]:
+    """Format Markdown documents concurrently without blocking the event loop.
+
+    Args:
+        texts: Markdown documents.
+        options: mdformat options, as for `mdformat.text`.
+        extensions: mdformat parser extensions to enable.
+        front_matter_only: If True, format only the front matter.
+        formatter: Formatter to use instead of a shared thread-backed one;
+            `options` and `extensions` are then ignored.
+
+    Returns:
+        The formatted documents, in input order.
+    """
+    formatter = formatter or _shared_formatter(options, extensions)
+    return await formatter.format_many(texts, front_matter_only=front_matter_only)
@@ -0,0 +1,345 @@
+"""Format many Markdown files across a pool of worker processes."""
+
+from __future__ import annotations
+
+import glob
+import os
+import re
+from collections.abc import Callable, Generator, Iterable, Iterator, Mapping
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from contextlib import closing, suppress
+from itertools import chain
+from pathlib import Path
+from typing import Any, NamedTuple, TypeVar
+
+from ._splice import check_front_matter, format_front_matter
+
+CHUNK_BYTES = 1024 * 1024
+"""Target size of the files sent to a worker in one task."""
+CHUNK_FILES = 64
+"""Maximum number of files sent to a worker in one task."""
+SERIAL_FILES = 64
+SERIAL_BYTES = 4 * 1024 * 1024
+"""Inputs up to these sizes are formatted in-process without starting a pool."""
+
+_GLOB_CHARS = frozenset("*?[")
+_NEWLINE = re.compile(r"\r\n|\r|\n")
+_HTML_CHANGED = (
+    "Formatted Markdown renders to different HTML than input Markdown. This is "
+    "a bug in mdformat or one of its installed plugins."
+)
+_WARMUP = '---\nb: 1\na: "x"\n---\n\n+++\na = 1\n+++\n'
+
+_Result = TypeVar("_Result")
+_Config = tuple[tuple[str, ...], dict[str, Any]]
+
+
+class FileResult(NamedTuple):
+    """Outcome of formatting one file."""
+
+    path: str
+    changed: bool
+    error: str | None = None
+
+
+class FrontMatterIssue(NamedTuple):
+    """Front matter of a file that is not formatted, or could not be checked."""
+
+    path: str
+    start_byte: int
+    end_byte: int
+    """End of the block in UTF-8 bytes, exclusive (0 if it was not located)."""
+    error: str | None = None
+
+
+def iter_paths(patterns: Iterable[str | os.PathLike[str]]) -> Iterator[Path]:
+    """Expand files, directories and glob patterns into Markdown file paths.
+
+    Directories are searched recursively for `*.md` files, like the mdformat
+    CLI. Patterns are expanded lazily so that huge trees are not listed
+    up front.
+
+    Args:
+        patterns: Paths, directories or glob patterns (`**` is recursive).
+
+    Yields:
+        Paths of the files to format.
+    """
+    for pattern in patterns:
+        text = os.fspath(pattern)
+        if _GLOB_CHARS.intersection(text):
+            for match in glob.iglob(text, recursive=True):  # noqa: PTH207
+                path = Path(match)
+                if path.is_file():
+                    yield path
+        elif (path := Path(text)).is_dir():
+            yield from sorted(path.glob("**/*.md"))
+        else:
+            yield path
+
+
+def _chunks(paths: Iterable[Path]) -> Iterator[tuple[list[Path], int]]:
+    """Group paths so that each task holds about `CHUNK_BYTES` of input.
+
+    Yields:
+        Paths of a chunk and their total size in bytes.
+    """
+    chunk: list[Path] = []
+    size = 0
+    for path in paths:
+        chunk.append(path)
+        with suppress(OSError):  # Reported when the file is formatted
+            size += path.stat().st_size
+        if size >= CHUNK_BYTES or len(chunk) >= CHUNK_FILES:
+            yield chunk, size
+            chunk = []
+            size = 0
+    if chunk:
+        yield chunk, size
+
+
+def _init_worker(extensions: tuple[str, ...], options: Mapping[str, Any]) -> None:
+    """Load the plugins and parsing backends once per worker process."""
+    import mdformat  # noqa: PLC0415
+
+    mdformat.text(_WARMUP, options=options, extensions=extensions)
+
+
+def _changes_ast(extensions: tuple[str, ...]) -> bool:
+    """Check whether a parser extension opts out of the HTML safety check."""
+    from mdformat.plugins import PARSER_EXTENSIONS  # noqa: PLC0415
+
+    return any(
+        getattr(PARSER_EXTENSIONS.get(name), "CHANGES_AST", False)
+        for name in extensions
+    )
+
+
+def _newline(text: str, end_of_line: str) -> str:
+    """Pick the newline for the output, as the mdformat CLI does."""
+    if end_of_line == "keep":
+        first = _NEWLINE.search(text)
+        return "\r\n" if first and first[0] == "\r\n" else "\n"
+    return "\r\n" if end_of_line == "crlf" else "\n"
+
+
+def _format_path(
+    path: Path,
+    extensions: tuple[str, ...],
+    options: Mapping[str, Any],
+    *,
+    check: bool,
+    front_matter_only: bool = False,
+) -> FileResult:
+    """Format a file in place, as the mdformat CLI does, and report the outcome.
+
+    Unless `options["validate"]` is False, a file whose formatted Markdown
+    renders to different HTML is reported and left unchanged. Front matter
+    renders to no HTML, so front-matter-only mode skips the check.
+    """
+    import mdformat  # noqa: PLC0415
+
+    try:
+        original = path.read_bytes().decode()
+        newline = _newline(original, options.get("end_of_line", "lf"))
+        if front_matter_only:
+            formatted = _NEWLINE.sub(
+                newline, format_front_matter(original, options=options)
+            )
+        else:
+            formatted = mdformat.text(
+                original, options=options, extensions=extensions, _filename=str(path)
+            ).replace("\n", newline)
+        changed = formatted != original
+        if changed and not check:
+            if (
+                not front_matter_only
+                and options.get("validate", True)
+                and not _changes_ast(extensions)
+                and not _renders_equal(original, formatted, extensions, options)
+            ):
+                return FileResult(str(path), changed=False, error=_HTML_CHANGED)
+            path.write_bytes(formatted.encode())
+    except Exception as e:
+        return FileResult(str(path), changed=False, error=f"{type(e).__name__}: {e}")
+    return FileResult(str(path), changed=changed)
+
+
+def _renders_equal(
+    original: str,
+    formatted: str,
+    extensions: tuple[str, ...],
+    options: Mapping[str, Any],
+) -> bool:
+    """Run the safety check of the mdformat CLI, which has no public API."""
+    from mdformat._util import is_md_equal  # noqa: PLC0415, PLC2701
+
+    return is_md_equal(original, formatted, options=options, extensions=extensions)
+
+
+def _format_chunk(
+    paths: list[Path],
+    extensions: tuple[str, ...],
+    options: Mapping[str, Any],
+    check: bool,
+    front_matter_only: bool,
+) -> list[FileResult]:
+    return [
+        _format_path(
+            path, extensions, options, check=check, front_matter_only=front_matter_only
+        )
+        for path in paths
+    ]
+
+
+def _check_path(path: Path, options: Mapping[str, Any]) -> FrontMatterIssue | None:
+    """Check the front matter of a file without writing it."""
+    try:
+        byte_range = check_front_matter(path.read_bytes().decode(), options=options)
+    except Exception as e:
+        return FrontMatterIssue(str(path), 0, 0, error=f"{type(e).__name__}: {e}")
+    return None if byte_range is None else FrontMatterIssue(str(path), *byte_range)
+
+
+def _check_chunk(
+    paths: list[Path],
+    _extensions: tuple[str, ...],
+    options: Mapping[str, Any],
+    fail_fast: bool,
+) -> list[FrontMatterIssue]:
+    issues = []
+    for path in paths:
+        if (issue := _check_path(path, options)) is not None:
+            issues.append(issue)
+            if fail_fast:
+                break
+    return issues
+
+
+def _run_chunks(
+    task: Callable[..., list[_Result]],
+    paths: Iterable[str | os.PathLike[str]],
+    workers: int | None,
+    config: _Config,
+    *args: object,
+) -> Generator[list[_Result], None, None]:
+    """Run a task over chunks of files, in this process or across workers.
+
+    Only a few chunks per worker are in flight at once. Closing the iterator
+    cancels the chunks that have not started.
+
+    Yields:
+        The results of each chunk, in completion order.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = _chunks(iter_paths(paths))
+
+    # Look ahead far enough to know whether a pool would pay off
+    head: list[list[Path]] = []
+    head_files = head_bytes = 0
+    for chunk, size in chunks:
+        head.append(chunk)
+        head_files += len(chunk)
+        head_bytes += size
+        if head_files > SERIAL_FILES or head_bytes > SERIAL_BYTES:
+            break
+    else:
+        workers = 1
+
+    all_chunks = chain(head, (chunk for chunk, _ in chunks))
+    if workers == 1:
+        _init_worker(*config)
+        for chunk in all_chunks:
+            yield task(chunk, *config, *args)
+        return
+
+    # multiprocessing is slow to import, and small inputs never need it
+    from concurrent.futures import ProcessPoolExecutor  # noqa: PLC0415
+
+    pool = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=config)
+    try:
+        pending: set[Future[list[_Result]]] = set()
+        for chunk in all_chunks:
+            pending.add(pool.submit(task, chunk, *config, *args))
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+def format_files(
+    paths: Iterable[str | os.PathLike[str]],
+    *,
+    workers: int | None = None,
+    options: Mapping[str, Any] | None = None,
+    extensions: Iterable[str] = ("front_matters",),
+    check: bool = False,
+    front_matter_only: bool = False,
+) -> Iterator[FileResult]:
+    """Format Markdown files in place across worker processes.
+
+    Files are sent to workers in chunks of about `CHUNK_BYTES`, and only a few
+    chunks per worker are in flight at once, so results stream back as they
+    complete while memory stays bounded for any number of files. Inputs
+    smaller than `SERIAL_BYTES` are formatted in this process. Each worker
+    keeps its formatter caches and parsers for all of its chunks. As in the
+    mdformat CLI, files whose rendered HTML would change are reported with
+    an error and not written, unless `options["validate"]` is False.
+
+    Args:
+        paths: Files, directories or glob patterns.
+        workers: Number of worker processes (default: the CPU count).
+        options: mdformat options, as for `mdformat.text`.
+        extensions: mdformat parser extensions to enable.
+        check: If True, report files that would change without writing them.
+        front_matter_only: If True, format only the front matter and keep the
+            rest of each file unchanged apart from its line endings, which
+            follow `options["end_of_line"]` (see `format_front_matter`).
+
+    Yields:
+        One result per file, in completion order.
+    """
+    config = (tuple(extensions), dict(options or {}))
+    for results in _run_chunks(
+        _format_chunk, paths, workers, config, check, front_matter_only
+    ):
+        yield from results
+
+
+def check_files(
+    paths: Iterable[str | os.PathLike[str]],
+    *,
+    workers: int | None = None,
+    options: Mapping[str, Any] | None = None,
+    fail_fast: bool = False,
+) -> Iterator[FrontMatterIssue]:
+    """Find Markdown files whose front matter is not formatted.
+
+    Only the front matter of each file is formatted and compared with the
+    original (see `check_front_matter`): the body is neither rendered nor
+    written. Files are spread across worker processes as by `format_files`.
+
+    Args:
+        paths: Files, directories or glob patterns.
+        workers: Number of worker processes (default: the CPU count).
+        options: mdformat options, as for `mdformat.text`.
+        fail_fast: Stop after the first file with an issue, cancelling the
+            chunks of files that have not started.
+
+    Yields:
+        One issue per unformatted or unreadable file, in completion order.
+    """
+    config = (("front_matters",), dict(options or {}))
+    with closing(
+        _run_chunks(_check_chunk, paths, workers, config, fail_fast)
+    ) as chunks:
+        for issues in chunks:
+            yield from issues
+            if fail_fast and issues:
+                return
@@ -0,0 +1,192 @@
+"""Front matter parsed once per block and shared by everything that reads it."""
+
+from __future__ import annotations
+
+import copy
+import time
+from collections.abc import Callable, Mapping
+from typing import TYPE_CHECKING, Any
+
+from ._formatters import _check_size, _time_limit
+
+if TYPE_CHECKING:
+    from markdown_it.token import Token
+    from mdformat.renderer import RenderTreeNode
+
+    from ._settings import FrontMatterSettings
+
+ENV_KEY = "front_matters"
+"""Key in the markdown-it `env` of the `FrontMatterData` of the document."""
+
+_UNPARSED = object()
+
+
+class FrontMatterData:
+    """Front matter of a block, parsed on first access and then shared.
+
+    The token of the block (`token.meta["data"]`), the mdformat renderer and
+    other plugins (`env["front_matters"]`) read the same object, so a block
+    is parsed at most once, within the size, time and YAML limits of the
+    settings. YAML is loaded in round-trip mode, as the renderer needs it.
+    The renderer formats a private copy taken when the block is parsed, so
+    changes made by readers never reach the output or the format caches.
+
+    Attributes:
+        format: Front matter format ("yaml", "toml", "json").
+        content: Raw content of the block, as in `token.content`.
+    """
+
+    __slots__ = (
+        "_error",
+        "_load",
+        "_parse_ns",
+        "_pristine",
+        "_settings",
+        "_value",
+        "content",
+        "format",
+    )
+
+    def __init__(
+        self,
+        format: str,  # noqa: A002
+        content: str,
+        load: Callable[[str, FrontMatterSettings], Any],
+        settings: FrontMatterSettings,
+    ) -> None:
+        """Record the block without parsing it.
+
+        Args:
+            format: Front matter format.
+            content: Raw content of the block.
+            load: Parses the content, raising on invalid front matter.
+            settings: Resolved plugin options, for the limits and the parser.
+        """
+        self.format = format
+        self.content = content
+        self._load = load
+        self._settings = settings
+        self._value: Any = _UNPARSED
+        self._error: Exception | None = None
+        self._pristine: dict[str, Any] | None = None
+        self._parse_ns = 0
+
+    @property
+    def parsed(self) -> bool:
+        """Whether the block has been parsed."""
+        return self._value is not _UNPARSED
+
+    @property
+    def data(self) -> dict[str, Any] | None:
+        """Parsed mapping, or None if the block is invalid (see `error`)."""
+        if self._value is _UNPARSED:
+            self._parse()
+        return self._value
+
+    @property
+    def error(self) -> Exception | None:
+        """Exception raised while parsing an invalid block, if any."""
+        if self._value is _UNPARSED:
+            self._parse()
+        return self._error
+
+    @property
+    def parse_ns(self) -> int:
+        """Nanoseconds spent parsing (0 until the block has been parsed)."""
+        return self._parse_ns
+
+    def load(self) -> dict[str, Any]:
+        """Return the parsed mapping, raising the error of an invalid block again.
+
+        Returns:
+            The mapping shared by all readers of the block.
+        """
+        if (data := self.data) is None:
+            raise self._error  # type: ignore[misc]
+        return data
+
+    def load_copy(self) -> dict[str, Any]:
+        """Return an unshared mapping as parsed, for the renderer to format.
+
+        The first call hands over the copy taken when the block was parsed,
+        later calls parse the block again.
+
+        Returns:
+            A mapping that no reader of the block has seen.
+        """
+        self.load()
+        pristine, self._pristine = self._pristine, None
+        return self._parse_value() if pristine is None else pristine
+
+    def _parse_value(self) -> dict[str, Any]:
+        _check_size(self.content, self._settings.limits.max_bytes)
+        with _time_limit(self._settings.limits.timeout):
+            # Empty blocks are valid (CommonMark v0.29 spec example 68)
+            value = (
+                self._load(self.content, self._settings) if self.content.strip() else {}
+            )
+        if not isinstance(value, dict):
+            msg = f"Front matter must be key-value pairs, got {type(value).__name__}"
+            raise TypeError(msg)
+        return value
+
+    def _parse(self) -> None:
+        start = time.perf_counter_ns()
+        try:
+            value = self._parse_value()
+        except Exception as e:
+            self._value, self._error = None, e
+        else:
+            self._value = value
+            # Much cheaper than parsing, and readers may change `value`
+            self._pristine = _copy_containers(value)
+        self._parse_ns = time.perf_counter_ns() - start
+
+    def __repr__(self) -> str:
+        """Return a representation that does not parse the block."""
+        state = "parsed" if self.parsed else "unparsed"
+        return f"{type(self).__name__}({self.format!r}, {self.content!r}, {state})"
+
+
+def _copy_containers(value: dict[str, Any]) -> dict[str, Any]:
+    """Deep copy the mappings and sequences of parsed data, sharing the scalars.
+
+    Scalars are immutable, and ruamel's `TimeStamp.__deepcopy__` drops the
+    time zone and microseconds, so they are seeded into the memo as-is.
+    """
+    memo: dict[int, Any] = {}
+    seen: set[int] = set()
+    stack: list[Any] = [value]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:  # Aliases share nodes and may form cycles
+            continue
+        seen.add(id(item))
+        if isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            stack.extend(item)
+        else:
+            memo[id(item)] = item
+    return copy.deepcopy(value, memo)
+
+
+def front_matter_data(
+    source: Token | RenderTreeNode | Mapping[str, Any],
+) -> FrontMatterData | None:
+    """Return the shared front matter of a token, syntax tree node or `env`.
+
+    Data is only attached when the parser was set up with `data_settings`
+    (`--front-matter-data` in mdformat).
+
+    Args:
+        source: The front matter token or node, or the `env` of the document.
+
+    Returns:
+        The shared front matter, or None if the document has none.
+    """
+    if isinstance(source, Mapping):
+        value = source.get(ENV_KEY)
+    else:
+        value = (source.meta or {}).get("data")
+    return value if isinstance(value, FrontMatterData) else None
@@ -0,0 +1,250 @@
+"""Persistent cache of rendered front matter shared across mdformat runs."""
+
+from __future__ import annotations
+
+import atexit
+import hashlib
+import importlib.metadata
+import os
+import sqlite3
+import sys
+import threading
+import time
+from functools import cache
+from pathlib import Path
+
+from mdformat.renderer import LOGGER
+
+from . import __version__
+
+DEFAULT_DISK_CACHE_MAX_BYTES = 64 * 1024 * 1024
+"""Default size cap for the rendered front matter stored on disk."""
+
+_DB_NAME = "front_matters.sqlite3"
+_PRUNE_INTERVAL = 256
+"""Number of writes between size checks, and of hits between access time updates."""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    accessed REAL NOT NULL
+)
+"""
+
+
+def _dist_version(dist: str) -> str:
+    try:
+        return importlib.metadata.version(dist)
+    except importlib.metadata.PackageNotFoundError:
+        return ""
+
+
+@cache
+def _dependency_versions() -> tuple[str, ...]:
+    """Versions of the packages that determine the rendered output.
+
+    The Python version is included because it selects the TOML engine.
+    """
+    return (
+        __version__,
+        _dist_version("ruamel.yaml"),
+        _dist_version("toml"),
+        f"{sys.version_info.major}.{sys.version_info.minor}",
+    )
+
+
+class DiskCache:
+    """SQLite-backed cache of rendered front matter blocks.
+
+    SQLite serializes concurrent writers (e.g. parallel pre-commit workers)
+    with file locks, and WAL mode lets readers proceed during writes. Entries
+    are pruned least-recently-used first once the stored size exceeds the cap.
+    Hits only update the access times in memory, which are written in one
+    transaction every `_PRUNE_INTERVAL` hits, before pruning and on close.
+    Database errors are logged and treated as cache misses so that the cache
+    can never break formatting, and a cache that cannot be opened (e.g. an
+    unwritable directory) is disabled for the rest of the run.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | os.PathLike[str],
+        max_bytes: int = DEFAULT_DISK_CACHE_MAX_BYTES,
+    ) -> None:
+        """Initialize the cache, deferring the connection until first use.
+
+        Args:
+            cache_dir: Directory that holds the SQLite database.
+            max_bytes: Size cap for stored values.
+        """
+        self.path = Path(cache_dir) / _DB_NAME
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._connection: sqlite3.Connection | None = None
+        self._pid: int | None = None
+        self._writes = 0
+        self._accessed: dict[str, float] = {}
+        self._disabled = False
+
+    @staticmethod
+    def make_key(format_type: str, content: str, *options: object) -> str:
+        """Build a key from the block, the resolved options and the versions.
+
+        Args:
+            format_type: Front matter format ("yaml", "toml", "json").
+            content: Raw front matter content.
+            *options: Resolved options that affect the rendered output.
+
+        Returns:
+            Hex digest identifying the rendered output.
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(repr((format_type, options, _dependency_versions())).encode())
+        digest.update(b"\0")
+        digest.update(content.encode())
+        return digest.hexdigest()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Connections must not be shared with forked child processes
+        if self._connection is None or self._pid != os.getpid():
+            connection = None
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                connection = sqlite3.connect(
+                    self.path, timeout=30, check_same_thread=False, isolation_level=None
+                )
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute("PRAGMA synchronous=NORMAL")
+                connection.execute(_SCHEMA)
+            except (OSError, sqlite3.Error):
+                if connection is not None:
+                    connection.close()
+                self._disabled = True
+                raise
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+
+    def _flush_accessed(self, connection: sqlite3.Connection) -> None:
+        if not self._accessed:
+            return
+        accessed = [(at, key) for key, at in self._accessed.items()]
+        self._accessed.clear()
+        connection.execute("BEGIN")
+        try:
+            connection.executemany(
+                "UPDATE entries SET accessed = ? WHERE key = ?", accessed
+            )
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def get(self, key: str) -> str | None:
+        """Return the cached value and mark it as recently used.
+
+        Args:
+            key: Key from `make_key`.
+
+        Returns:
+            Cached rendered front matter, or None on a miss, a database error
+            or when the cache is disabled.
+        """
+        with self._lock:
+            if self._disabled:
+                return None
+            try:
+                connection = self._connect()
+                row = connection.execute(
+                    "SELECT value FROM entries WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                self._accessed[key] = time.time()
+                if len(self._accessed) >= _PRUNE_INTERVAL:
+                    self._flush_accessed(connection)
+            except (OSError, sqlite3.Error) as e:
+                LOGGER.debug("Front matter disk cache read failed: %s", e)
+                return None
+        return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        """Store a value, pruning old entries periodically.
+
+        Args:
+            key: Key from `make_key`.
+            value: Rendered front matter.
+        """
+        with self._lock:
+            if self._disabled:
+                return
+            try:
+                connection = self._connect()
+                connection.execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                    (key, value, len(value.encode()), time.time()),
+                )
+                self._accessed.pop(key, None)
+                self._writes += 1
+                if self._writes % _PRUNE_INTERVAL == 1:
+                    self._prune(connection)
+            except (OSError, sqlite3.Error) as e:
+                LOGGER.debug("Front matter disk cache write failed: %s", e)
+
+    def prune(self) -> None:
+        """Remove least recently used entries until under the size cap."""
+        with self._lock:
+            if self._disabled:
+                return
+            try:
+                self._prune(self._connect())
+            except (OSError, sqlite3.Error) as e:
+                LOGGER.debug("Front matter disk cache prune failed: %s", e)
+
+    def _prune(self, connection: sqlite3.Connection) -> None:
+        self._flush_accessed(connection)
+        connection.execute(
+            """
+            DELETE FROM entries WHERE key IN (
+                SELECT key FROM (
+                    SELECT key, SUM(size) OVER (
+                        ORDER BY accessed DESC, key
+                    ) AS total FROM entries
+                ) WHERE total > ?
+            )
+            """,
+            (self.max_bytes,),
+        )
+
+    def close(self) -> None:
+        """Write pending access times and close the database connection, if open."""
+        with self._lock:
+            if self._connection is not None and self._pid == os.getpid():
+                try:
+                    self._flush_accessed(self._connection)
+                except sqlite3.Error as e:
+                    LOGGER.debug("Front matter disk cache update failed: %s", e)
+                self._connection.close()
+            self._connection = None
+            self._accessed.clear()
+
+
+_DISK_CACHES: dict[str, DiskCache] = {}
+
+
+def get_disk_cache(cache_dir: str) -> DiskCache:
+    """Return the shared DiskCache for a directory.
+
+    Args:
+        cache_dir: Directory that holds the SQLite database.
+
+    Returns:
+        DiskCache instance reused across calls in this process, closed when
+        Python exits.
+    """
+    if (disk_cache := _DISK_CACHES.get(cache_dir)) is None:
+        disk_cache = _DISK_CACHES[cache_dir] = DiskCache(cache_dir)
+        atexit.register(disk_cache.close)  # Write the pending access times
+    return disk_cache
@@ -0,0 +1,225 @@
+"""Read front matter from the head of a document without parsing Markdown."""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Iterator
+from typing import BinaryIO
+
+from .mdit_plugins import (
+    _OPENERS,
+    _closing_delimiter_patterns,
+    _find_json_closing_brace,
+)
+
+_CODE_INDENT = 4
+"""Columns of indentation that make the first line an indented code block."""
+
+
+class FrontMatterBlock:
+    """Front matter found at the start of a document.
+
+    Attributes:
+        format: Front matter format ("yaml", "toml", "json").
+        content: Raw content between the delimiters, or the whole JSON object.
+        markup: Opening delimiter (empty for JSON).
+        end_line: Line number after the block (the first line of the body).
+        end_byte: UTF-8 byte offset after the block (the start of the body).
+    """
+
+    __slots__ = ("content", "end_byte", "end_line", "format", "markup")
+
+    def __init__(
+        self,
+        *,
+        format: str,  # noqa: A002
+        content: str,
+        markup: str,
+        end_line: int,
+        end_byte: int,
+    ) -> None:
+        """Initialize the block record."""
+        self.format = format
+        self.content = content
+        self.markup = markup
+        self.end_line = end_line
+        self.end_byte = end_byte
+
+    def __repr__(self) -> str:
+        """Return a representation that lists every field."""
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+    def __eq__(self, other: object) -> bool:
+        """Compare all fields."""
+        if not isinstance(other, FrontMatterBlock):
+            return NotImplemented
+        return all(getattr(self, n) == getattr(other, n) for n in self.__slots__)
+
+    __hash__ = None  # type: ignore[assignment]
+
+
+class _TextSource:
+    """Lines of an in-memory document, split lazily."""
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+    def lines(self) -> Iterator[tuple[str, int]]:
+        """Yield each line with its line ending and the offset after it."""
+        text = self.text
+        pos = 0
+        while pos < len(text):
+            newline = text.find("\n", pos)
+            end = len(text) if newline == -1 else newline + 1
+            yield text[pos:end], end
+            pos = end
+
+    def read(self, start: int, end: int) -> str:
+        return self.text[start:end]
+
+    def byte_offset(self, offset: int) -> int:
+        return len(self.text[:offset].encode())
+
+
+class _FileSource:
+    """Lines of a UTF-8 file, read incrementally."""
+
+    def __init__(self, file: BinaryIO) -> None:
+        self.file = file
+
+    def lines(self) -> Iterator[tuple[str, int]]:
+        """Yield each line with its line ending and the byte offset after it."""
+        end = 0
+        for raw in self.file:
+            end += len(raw)
+            yield raw.decode(), end
+
+    def read(self, start: int, end: int) -> str:
+        self.file.seek(start)
+        return self.file.read(end - start).decode()
+
+    @staticmethod
+    def byte_offset(offset: int) -> int:
+        return offset
+
+
+def _strip_line_ending(line: str) -> str:
+    return line.removesuffix("\n").removesuffix("\r")
+
+
+def _indent_columns(line: str) -> int:
+    columns = 0
+    for char in line:
+        if char == " ":
+            columns += 1
+        elif char == "\t":
+            columns += 4 - columns % 4
+        else:
+            break
+    return columns
+
+
+def extract(source: str | os.PathLike[str]) -> FrontMatterBlock | None:
+    """Extract the front matter of a document without parsing the Markdown body.
+
+    Detection matches the markdown-it rule used when formatting, but only the
+    lines up to the closing delimiter are read, so the cost depends on the
+    size of the front matter rather than of the document. An opening
+    delimiter that is never closed is read to the end of the document.
+
+    Args:
+        source: Markdown text, or the path of a UTF-8 Markdown file.
+
+    Returns:
+        The front matter block, or None if the document has none.
+    """
+    if isinstance(source, str):
+        return _extract_from_source(_TextSource(source))
+    with open(source, "rb") as file:  # noqa: PTH123
+        return _extract_from_source(_FileSource(file))
+
+
+def _extract_from_source(source: _TextSource | _FileSource) -> FrontMatterBlock | None:
+    lines = source.lines()
+    first = next(lines, None)
+    if first is None:
+        return None
+    first_line = _strip_line_ending(first[0])
+    if _indent_columns(first_line) >= _CODE_INDENT:
+        return None  # Parsed as an indented code block
+    first_line = first_line.lstrip(" \t")
+
+    front_matter_format = _OPENERS.get(first_line[:1])
+    if front_matter_format is None or not front_matter_format.pattern.match(first_line):
+        return None
+    if not front_matter_format.delimited:
+        return _extract_json(source, first_line, first[1], lines)
+
+    format_type = front_matter_format.name
+    markup = first_line.rstrip()
+    pattern = _closing_delimiter_patterns(markup[0])[0]
+    content_end = first[1]
+    for line_number, (line, end) in enumerate(lines, start=1):
+        match = pattern.fullmatch(_strip_line_ending(line).lstrip(" \t"))
+        if match and len(match[1]) >= len(markup):
+            content = source.read(first[1], content_end).replace("\r\n", "\n")
+            if content_end > first[1]:
+                content = content.removesuffix("\n")
+            return FrontMatterBlock(
+                format=format_type,
+                content=content,
+                markup=markup,
+                end_line=line_number + 1,
+                end_byte=source.byte_offset(end),
+            )
+        content_end = end
+    return None
+
+
+def _extract_json(
+    source: _TextSource | _FileSource,
+    first_line: str,
+    first_end: int,
+    lines: Iterator[tuple[str, int]],
+) -> FrontMatterBlock | None:
+    """Read lines until the brace that closes the JSON object.
+
+    The brace scanner runs over the lines read so far whenever a line with a
+    closing brace arrives and the buffer has doubled since the last scan, so
+    the total scanning work stays linear in the size of the object.
+    """
+    buffer = [first_line]
+    ends = [first_end]  # Offset after each buffered line
+    size = next_scan = 0
+    pending = False  # A closing brace arrived since the last scan
+    for line, end in lines:
+        stripped = _strip_line_ending(line).lstrip(" \t")
+        buffer.append(stripped)
+        ends.append(end)
+        size += len(stripped) + 1
+        pending = pending or "}" in stripped
+        if pending and size >= next_scan:
+            if block := _scan_json_buffer(source, buffer, ends):
+                return block
+            pending = False
+            next_scan = 2 * size
+    return _scan_json_buffer(source, buffer, ends) if pending else None
+
+
+def _scan_json_buffer(
+    source: _TextSource | _FileSource, buffer: list[str], ends: list[int]
+) -> FrontMatterBlock | None:
+    text = "\n".join(buffer)
+    closing = _find_json_closing_brace(text, 0, len(text))
+    if closing == -1:
+        return None
+    last_line = text.count("\n", 0, closing)
+    newline = text.find("\n", closing)
+    return FrontMatterBlock(
+        format="json",
+        content=text if newline == -1 else text[:newline],
+        markup="",
+        end_line=last_line + 1,
+        end_byte=source.byte_offset(ends[last_line]),
+    )
@@ -1,19 +1,36 @@
-"""Front matter formatters for YAML, TOML, and JSON."""
+"""Front matter formatters for YAML, TOML, and JSON.
+
+The parsing backends (ruamel.yaml, toml, json) are imported on first use so
+that loading the plugin stays cheap for documents without front matter.
+"""
 
 from __future__ import annotations
 
-import json
+import datetime
 import re
 import sys
-from collections.abc import Generator
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable, Generator
 from contextlib import contextmanager
+from functools import cache, partial
 from io import StringIO
-from typing import Any
+from itertools import pairwise
+from typing import TYPE_CHECKING, Any, NamedTuple
 
-import toml  # type: ignore[import-untyped]
 from mdformat.renderer import LOGGER
-from ruamel.yaml import YAML
-from ruamel.yaml.comments import CommentedMap, CommentedSeq
+
+from . import __version__
+from ._stats import collecting, phase, record
+
+if TYPE_CHECKING:
+    from ruamel.yaml import YAML
+    from ruamel.yaml.comments import CommentedMap, CommentedSeq
+
+    from ._data import FrontMatterData
+    from ._settings import FrontMatterSettings
 
 SPECIAL_YAML_CHARS = {
     ":",
@@ -40,6 +57,343 @@ SPECIAL_YAML_CHARS = {
 }
 """These characters require quoting: : { } [ ] , & * # ? | - < > = ! % @ `."""
 
+_YAML_ENGINES = threading.local()
+"""Per-thread cache of configured YAML instances (not thread-safe to share)."""
+
+
+_YAML_ROUND_TRIP = "round-trip"
+"""Engine kind that preserves comments, quotes and scalar formatting."""
+_YAML_LIBYAML = "libyaml"
+"""Engine kind that loads and emits with libyaml (ruamel.yaml.clib)."""
+_YAML_LIBYAML_LOADER = "libyaml-loader"
+"""Engine kind that loads with libyaml and emits with ruamel's Python emitter."""
+
+_LIBYAML_MAX_WIDTH = 2**31 - 1
+"""libyaml stores the line width in a C int."""
+
+
+class YAMLBudget(NamedTuple):
+    """Limits on the work done to format one YAML block.
+
+    Attributes:
+        max_nodes: Nodes in the document, counting each alias as a copy of
+            the node it refers to (as sorting and validation visit it).
+        max_aliases: Alias dereferences (`*anchor`).
+        max_depth: Nesting depth of collections and scalars.
+        max_output_chars: Characters emitted by the dump.
+    """
+
+    max_nodes: int = 250_000
+    max_aliases: int = 10_000
+    max_depth: int = 200
+    max_output_chars: int = 8 * 1024 * 1024
+
+
+DEFAULT_YAML_BUDGET: YAMLBudget = YAMLBudget()
+
+
+class BlockLimits(NamedTuple):
+    """Limits that apply to a front matter block of any format.
+
+    Attributes:
+        max_bytes: Size of the UTF-8 encoded block; larger blocks are not
+            parsed.
+        timeout: Seconds that formatting one block may take.
+    """
+
+    max_bytes: int | None = None
+    timeout: float | None = None
+
+
+NO_LIMITS: BlockLimits = BlockLimits()
+
+
+class BudgetExceededError(ValueError):
+    """Raised when a block exceeds its `YAMLBudget` or `BlockLimits`."""
+
+
+class _Deadline(threading.local):
+    """Per-thread time limit of the block being formatted."""
+
+    at: float | None = None
+    timeout: float | None = None
+
+
+_DEADLINE = _Deadline()
+
+
+@contextmanager
+def _time_limit(timeout: float | None) -> Generator[None, None, None]:
+    """Set the deadline checked by `_check_deadline` for the enclosed code.
+
+    Args:
+        timeout: Seconds from now, or None for no limit.
+
+    Yields:
+        None
+    """
+    previous = (_DEADLINE.at, _DEADLINE.timeout)
+    _DEADLINE.at = None if timeout is None else time.perf_counter() + timeout
+    _DEADLINE.timeout = timeout
+    try:
+        yield
+    finally:
+        _DEADLINE.at, _DEADLINE.timeout = previous
+
+
+def _check_deadline() -> None:
+    """Stop formatting once the deadline of the current block has passed.
+
+    Called from the loops that grow with the block (composing YAML nodes,
+    sorting mappings, emitting YAML and TOML), so that a runaway block is
+    abandoned at the next step. Parsers implemented in one call (json,
+    tomllib, libyaml) are bounded by `BlockLimits.max_bytes` instead.
+
+    Raises:
+        BudgetExceededError: If the deadline has passed.
+    """
+    if (at := _DEADLINE.at) is not None and time.perf_counter() > at:
+        msg = f"Formatting took longer than {_DEADLINE.timeout} seconds"
+        raise BudgetExceededError(msg)
+
+
+class _SharedData(threading.local):
+    """Per-thread parsed data of the block being rendered, if any."""
+
+    data: FrontMatterData | None = None
+
+
+_SHARED_DATA = _SharedData()
+
+
+@contextmanager
+def _reuse_data(data: FrontMatterData | None) -> Generator[None, None, None]:
+    """Let the formatters reuse the parsed data of the block being rendered.
+
+    Args:
+        data: Data shared on the token of the block, or None.
+
+    Yields:
+        None
+    """
+    previous = _SHARED_DATA.data
+    _SHARED_DATA.data = data
+    try:
+        yield
+    finally:
+        _SHARED_DATA.data = previous
+
+
+def _shared_loader(format_type: str, content: str) -> Callable[[str], Any] | None:
+    """Return a parse function that reuses the shared data of this block, if any.
+
+    The formatters sort the parsed mapping in place, and cache the output by
+    content, so they get a private copy rather than the mapping readers see.
+    """
+    data = _SHARED_DATA.data
+    if data is None or data.format != format_type or data.content != content:
+        return None
+    return lambda _content: data.load_copy()
+
+
+def _check_size(content: str, max_bytes: int | None) -> None:
+    """Reject a block larger than `max_bytes` when encoded as UTF-8.
+
+    Raises:
+        BudgetExceededError: If the block is too large.
+    """
+    if max_bytes is None or len(content) * 4 <= max_bytes:
+        return  # A character takes at most four bytes, so no need to encode
+    if len(content) > max_bytes or len(content.encode()) > max_bytes:
+        msg = f"Front matter is larger than {max_bytes} bytes"
+        raise BudgetExceededError(msg)
+
+
+def _over_size_limit(content: str, *, strict: bool, limits: BlockLimits) -> bool:
+    """Check the size limit ahead of the canonical fast path and the cache.
+
+    Raises:
+        BudgetExceededError: If the block is too large in strict mode.
+    """
+    try:
+        _check_size(content, limits.max_bytes)
+    except BudgetExceededError as e:
+        if strict:
+            raise
+        LOGGER.debug("Skipping front matter: %s", e)
+        return True
+    return False
+
+
+class _BoundedStringIO(StringIO):
+    """String buffer that stops the dump once it grows past a limit."""
+
+    def __init__(self, limit: int | None) -> None:
+        super().__init__()
+        self.limit = limit
+        self.size = 0
+
+    def write(self, text: str) -> int:
+        _check_deadline()
+        self.size += len(text)
+        if self.limit is not None and self.size > self.limit:
+            msg = f"YAML output exceeds {self.limit} characters"
+            raise BudgetExceededError(msg)
+        return super().write(text)
+
+
+@cache
+def _budget_composer() -> type:
+    """Build the round-trip composer class that enforces `YAMLBudget`.
+
+    Each node adds one to the count, and each alias adds the size of the
+    node it refers to, so documents that expand exponentially through
+    nested aliases ("billion laughs") are rejected while being composed,
+    before anything walks the expanded structure. Nesting is counted here
+    too, before each level recurses, as `YAML.max_depth` only exists in
+    newer ruamel.yaml releases.
+    """
+    from ruamel.yaml.composer import Composer  # noqa: PLC0415
+    from ruamel.yaml.events import AliasEvent  # noqa: PLC0415
+
+    class BudgetComposer(Composer):
+        budget = DEFAULT_YAML_BUDGET
+
+        def compose_document(self) -> Any:  # noqa: ANN401
+            self.expanded = 0
+            self.aliases = 0
+            self.nesting = 0
+            self.anchor_sizes: dict[str, int] = {}
+            return super().compose_document()
+
+        def compose_node(self, parent: Any, index: Any) -> Any:  # noqa: ANN401
+            _check_deadline()
+            event = self.parser.peek_event()
+            if isinstance(event, AliasEvent):
+                self.aliases += 1
+                if self.aliases > self.budget.max_aliases:
+                    msg = f"YAML has more than {self.budget.max_aliases} aliases"
+                    raise BudgetExceededError(msg)
+                self._add_nodes(self.anchor_sizes.get(event.anchor, 1))
+                return super().compose_node(parent, index)
+            before = self.expanded
+            self._add_nodes(1)
+            self.nesting += 1
+            if self.nesting > self.budget.max_depth:
+                msg = f"YAML is nested deeper than {self.budget.max_depth} levels"
+                raise BudgetExceededError(msg)
+            try:
+                node = super().compose_node(parent, index)
+            finally:
+                self.nesting -= 1
+            if event.anchor is not None:
+                self.anchor_sizes[event.anchor] = self.expanded - before
+            return node
+
+        def _add_nodes(self, count: int) -> None:
+            self.expanded += count
+            if self.expanded > self.budget.max_nodes:
+                msg = f"YAML has more than {self.budget.max_nodes} nodes"
+                raise BudgetExceededError(msg)
+
+    return BudgetComposer
+
+
+def _load_yaml(yaml: YAML, budget: YAMLBudget, content: str) -> Any:  # noqa: ANN401
+    """Load YAML content within a budget.
+
+    The round-trip composer raises `BudgetExceededError` once the document
+    exceeds the budget. The libyaml engine kinds compose in C, so
+    `_select_yaml_engine` only routes blocks to them whose line count and
+    indentation are within the budget; they never contain aliases.
+    """
+    if isinstance(composer := yaml.composer, _budget_composer()):
+        composer.budget = budget  # type: ignore[attr-defined]
+    return yaml.load(content)
+
+
+@cache
+def _has_libyaml() -> bool:
+    """Check if ruamel's C extension (libyaml bindings) is installed."""
+    from ruamel.yaml.main import CParser  # type: ignore[attr-defined]  # noqa: PLC0415
+
+    return CParser is not None
+
+
+def _build_yaml_engine(width: int, kind: str = _YAML_ROUND_TRIP) -> YAML:
+    """Create a YAML instance configured for front matter.
+
+    Args:
+        width: Line length at which ruamel wraps scalars.
+        kind: One of the `_YAML_*` engine kinds.
+
+    Returns:
+        Configured YAML instance used for both loading and dumping.
+    """
+    from ruamel.yaml import YAML  # noqa: PLC0415
+
+    if kind == _YAML_ROUND_TRIP:
+        yaml = YAML()
+        yaml.preserve_quotes = True
+        yaml.Composer = _budget_composer()  # type: ignore[assignment]
+    else:
+        from ruamel.yaml.emitter import Emitter  # noqa: PLC0415
+        from ruamel.yaml.representer import SafeRepresenter  # noqa: PLC0415
+
+        class InsertionOrderRepresenter(SafeRepresenter):
+            """Safe representer that keeps keys in the order they were loaded."""
+
+            def __init__(self, *args: Any, **kwargs: Any) -> None:  # noqa: ANN401
+                super().__init__(*args, **kwargs)
+                self.sort_base_mapping_type_on_output = False
+
+        yaml = YAML(typ="safe")
+        yaml.Representer = InsertionOrderRepresenter
+        if kind == _YAML_LIBYAML:
+            width = min(width, _LIBYAML_MAX_WIDTH)
+        else:
+            yaml.Emitter = Emitter
+    yaml.default_flow_style = False
+    yaml.allow_unicode = True
+    yaml.width = width
+
+    # Consistent indentation for previous mdformat-frontmatter users:
+    # https://github.com/butler54/mdformat-frontmatter/blob/93bb972b6044d22043d6c191a2e73858ff09d3e5/mdformat_frontmatter/plugin.py#L14
+    yaml.indent(mapping=2, sequence=4, offset=2)
+    return yaml
+
+
+@contextmanager
+def _yaml_engine(
+    wrap: int | None, kind: str = _YAML_ROUND_TRIP
+) -> Generator[YAML, None, None]:
+    """Borrow the cached YAML instance for the effective configuration.
+
+    ruamel keeps constructor state between calls, so an instance that raised
+    mid-load is discarded rather than reused for the next block.
+
+    Args:
+        wrap: Line length limit, if any.
+        kind: One of the `_YAML_*` engine kinds.
+
+    Yields:
+        Configured YAML instance.
+    """
+    engines: dict[tuple[str, int], YAML] | None = getattr(
+        _YAML_ENGINES, "engines", None
+    )
+    if engines is None:
+        engines = _YAML_ENGINES.engines = {}
+    width = wrap or sys.maxsize  # Prevent line wrapping by default
+    yaml = engines.get((kind, width))
+    if yaml is None:
+        yaml = engines[kind, width] = _build_yaml_engine(width, kind)
+    try:
+        yield yaml
+    except BaseException:
+        engines.pop((kind, width), None)
+        raise
+
 
 class _UnicodePreservingYAMLHandler:
     """Custom YAML handler that preserves unicode characters and comments.
@@ -48,6 +402,18 @@ class _UnicodePreservingYAMLHandler:
     and outputs unicode characters (including emojis) in their original form.
     """
 
+    format_type = "yaml"
+
+    def __init__(self, yaml: YAML, max_output_chars: int | None = None) -> None:
+        """Initialize with the YAML instance used to dump.
+
+        Args:
+            yaml: Configured YAML instance from `_yaml_engine`.
+            max_output_chars: Stop dumping past this size, if set.
+        """
+        self.yaml = yaml
+        self.max_output_chars = max_output_chars
+
     def export(self, metadata: dict[str, object], **kwargs: object) -> str:
         """Export metadata as YAML with unicode and comment preservation.
 
@@ -60,57 +426,90 @@ class _UnicodePreservingYAMLHandler:
         """
         sort_keys = kwargs.pop("sort_keys", True)
 
-        yaml = YAML()
-        yaml.preserve_quotes = True
-        yaml.default_flow_style = False
-        yaml.allow_unicode = True
-        yaml.width = (
-            kwargs.pop("wrap", None) or sys.maxsize
-        )  # Prevent line wrapping by default
-
-        # Consistent indentation for previous mdformat-frontmatter users:
-        # https://github.com/butler54/mdformat-frontmatter/blob/93bb972b6044d22043d6c191a2e73858ff09d3e5/mdformat_frontmatter/plugin.py#L14
-        yaml.indent(mapping=2, sequence=4, offset=2)
-
         if sort_keys:
-            self._sort_mappings_in_place(metadata)
+            with phase("yaml", "sort"):
+                self._sort_mappings_in_place(metadata)
 
-        stream = StringIO()
-        yaml.dump(metadata, stream)
-        return stream.getvalue().strip()
+        stream = _BoundedStringIO(self.max_output_chars)
+        with phase("yaml", "dump"):
+            self.yaml.dump(metadata, stream)
+        with phase("yaml", "normalize"):
+            return stream.getvalue().strip()
 
     def _sort_mappings_in_place(
         self, data: CommentedMap | CommentedSeq | dict[str, object] | list[object]
     ) -> None:
         """Recursively sort dictionary keys in-place while preserving comments.
 
-        This uses the .insert() method of CommentedMap to preserve end-of-line
-        comments. The .pop() method doesn't delete comments, and .insert()
-        re-associates them with the key.
-
-        Based on: https://stackoverflow.com/a/51387713/3219667
+        Comments on a CommentedMap are stored in `data.ca.items` by key rather
+        than by position, so reordering the keys with `move_to_end` carries
+        end-of-line and block comments along in a single O(n log n) pass.
+        Mappings that are already sorted are left untouched.
 
         Args:
             data: Dictionary or list to sort in-place.
         """
+        _check_deadline()
         if isinstance(data, list):
             for elem in data:
                 if isinstance(elem, (dict, list)):
                     self._sort_mappings_in_place(elem)
             return
+        from ruamel.yaml.comments import merge_attrib  # noqa: PLC0415
+
+        if getattr(data, merge_attrib, None):
+            self._sort_merged_mapping_in_place(data)  # type: ignore[arg-type]
+            return
+        for value in data.values():
+            if isinstance(value, (dict, list)):
+                self._sort_mappings_in_place(value)
+        keys = list(data)
+        sorted_keys = sorted(keys)
+        if keys == sorted_keys:
+            return
+        if isinstance(data, OrderedDict):
+            for key in sorted_keys:
+                data.move_to_end(key)
+        else:
+            items = [(key, data[key]) for key in sorted_keys]
+            data.clear()
+            data.update(items)
+
+    def _sort_merged_mapping_in_place(self, data: CommentedMap) -> None:
+        """Sort a mapping that contains merge keys (`<<: *anchor`).
+
+        ruamel tracks the merge position, which only `.insert()` keeps
+        consistent. The `.pop()` method doesn't delete comments, and `.insert()`
+        re-associates them with the key.
+
+        Based on: https://stackoverflow.com/a/51387713/3219667
+
+        Args:
+            data: Mapping with merge keys to sort in-place.
+        """
         # Sort in reverse order and insert at position 0 to get ascending order
         for key in sorted(data, reverse=True):
             value = data.pop(key)
             if isinstance(value, (dict, list)):
                 self._sort_mappings_in_place(value)
-            data.insert(0, key, value)  # type: ignore[union-attr]
+            data.insert(0, key, value)
 
 
 class _SortingTOMLHandler:
     """Custom TOML handler that supports key sorting."""
 
-    def export(self, metadata: dict[str, object], **kwargs: object) -> str:  # noqa: PLR6301
-        """Export metadata as TOML with optional key sorting.
+    format_type = "toml"
+
+    def __init__(self, engine: _TOMLEngine) -> None:
+        """Initialize with the TOML engine used to dump.
+
+        Args:
+            engine: TOML engine from `_get_toml_engine`.
+        """
+        self.engine = engine
+
+    def export(self, metadata: dict[str, object], **kwargs: object) -> str:
+        """Export metadata as TOML, sorting the keys of every table if asked.
 
         Args:
             metadata: Dictionary to export as TOML.
@@ -121,14 +520,14 @@ class _SortingTOMLHandler:
         """
         sort_keys_val = kwargs.pop("sort_keys", True)
         sort_keys = bool(sort_keys_val) if sort_keys_val is not None else True
-        if sort_keys:
-            metadata = dict(sorted(metadata.items()))
-        return toml.dumps(metadata)
+        return self.engine.dumps(metadata, sort_keys=sort_keys)
 
 
 class _SortingJSONHandler:
     """Custom JSON handler that supports key sorting."""
 
+    format_type = "json"
+
     def export(self, metadata: dict[str, object], **kwargs: object) -> str:  # noqa: PLR6301
         """Export metadata as JSON with optional key sorting.
 
@@ -141,34 +540,278 @@ class _SortingJSONHandler:
         """
         sort_keys_val = kwargs.pop("sort_keys", True)
         sort_keys = bool(sort_keys_val) if sort_keys_val is not None else True
-        return json.dumps(metadata, indent=4, sort_keys=sort_keys)
+        import json  # noqa: PLC0415
+
+        with phase("json", "dump"):  # Includes sorting
+            return json.dumps(metadata, indent=4, sort_keys=sort_keys)
 
 
-def _normalize_toml_output(content: str) -> str:
-    """Normalize TOML output.
+_TOML_BARE_KEY = re.compile(r"[A-Za-z0-9_-]+")
 
-    Removes extra blank lines and trailing commas added by the TOML library.
+
+def _toml_str(value: str) -> str:
+    """Quote a TOML basic string, escaping like `toml.dumps`.
 
     Args:
-        content: TOML content to normalize.
+        value: String to quote.
 
     Returns:
-        Normalized TOML content.
+        Double-quoted TOML string.
+    """
+    if value.isprintable() and "\\" not in value and '"' not in value:
+        return f'"{value}"'
+    escaped = []
+    for char in value:
+        if char in {"\\", '"'}:
+            escaped.append(f"\\{char}")
+        elif char in _TOML_SHORT_ESCAPES:
+            escaped.append(_TOML_SHORT_ESCAPES[char])
+        elif char.isprintable():
+            escaped.append(char)
+        elif (code := ord(char)) > 0xFFFF:  # noqa: PLR2004
+            escaped.append(f"\\U{code:08x}")
+        else:
+            escaped.append(f"\\u{code:04x}")
+    return f'"{"".join(escaped)}"'
+
+
+_TOML_SHORT_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+
+
+def _is_array_of_tables(value: object) -> bool:
+    return isinstance(value, list) and any(isinstance(item, dict) for item in value)
+
+
+class _TOMLWriter:
+    """Emit TOML directly in the plugin's normalized layout, in one pass.
+
+    Follows the ordering of `toml.dumps` (top-level values, then arrays of
+    tables, then tables breadth-first) and appends each line once to a
+    single buffer, joined at the end: no blank lines before `[table]`
+    headers, blank lines kept before `[[array-of-tables]]`, and arrays
+    without trailing commas. String values are never altered once quoted.
     """
-    # Remove blank lines before section headers like [section]
-    # but NOT array tables [[section]] - they should keep blank lines
-    content = re.sub(r"\n\n+(\[(?!\[))", r"\n\1", content)
 
-    # Remove trailing commas in arrays - handle both ,] and , ]
-    # This handles: ["a", "b",] and ["a", "b", ] formats
-    content = re.sub(r",\s*]", "]", content)
+    def __init__(self, *, sort_keys: bool = False) -> None:
+        """Initialize the writer.
+
+        Args:
+            sort_keys: Sort the keys of every table, including nested ones.
+        """
+        self.sort_keys = sort_keys
+        self._lines: list[str] = []
+        self._blank_lines = 0
+
+    def dumps(self, metadata: dict[str, Any]) -> str:
+        """Serialize a table to TOML.
+
+        Args:
+            metadata: Parsed TOML document.
+
+        Returns:
+            TOML string.
+        """
+        self._lines = []
+        self._blank_lines = 0
+        tables = self._write_table(metadata, "")
+        while tables:
+            nested: dict[str, dict[str, Any]] = {}
+            for name, table in tables.items():
+                if not table:
+                    self._write_line(f"[{name}]")
+                for subname, subtable in self._write_table(
+                    table, name, f"[{name}]"
+                ).items():
+                    nested[f"{name}.{subname}"] = subtable
+            tables = nested
+        self._lines.append("")  # Final newline
+        return "\n".join(self._lines)
+
+    def _write_line(self, line: str) -> None:
+        """Write a line, with the blank lines before it unless it opens a table."""
+        if self._blank_lines:
+            if not line.startswith("[") or line.startswith("[["):
+                self._lines.extend([""] * self._blank_lines)
+            self._blank_lines = 0
+        self._lines.append(line)
+
+    def _write_blank_line(self) -> None:
+        """Write a blank line once the next line is known to need it."""
+        self._blank_lines += 1
+
+    def _write_table(
+        self, table: dict[str, Any], prefix: str, header: str = ""
+    ) -> dict[str, dict[str, Any]]:
+        """Write the values and arrays of tables of one table.
+
+        Args:
+            table: Table to write.
+            prefix: Dotted name of the table ("" for the document root).
+            header: Line written before the first value or array of tables,
+                omitted if the table only contains tables.
 
-    # NOTE: We do NOT normalize array spacing (e.g., [ "item" -> ["item"])
-    # because regex-based approach would corrupt bracket spacing inside strings.
-    # Example: description = "[ spaced ]" would incorrectly become "[spaced]"
+        Returns:
+            The nested tables to write later, by quoted key.
+        """
+        _check_deadline()
+        if prefix:
+            prefix += "."
+        items = sorted(table.items()) if self.sort_keys else table.items()
+        arrays: list[tuple[str, list[Any]]] = []
+        tables: dict[str, dict[str, Any]] = {}
+        for key, value in items:
+            qkey = key if _TOML_BARE_KEY.fullmatch(key) else _toml_str(key)
+            if isinstance(value, dict):
+                tables[qkey] = value
+            elif isinstance(value, list) and any(isinstance(v, dict) for v in value):
+                arrays.append((qkey, value))
+            else:
+                if header:
+                    self._write_line(header)
+                    header = ""
+                line = f"{qkey} = {self._dump_value(value)}"
+                if self._blank_lines:
+                    self._write_line(line)
+                else:  # The common case, without a method call per line
+                    self._lines.append(line)
+        if arrays and header:
+            self._write_line(header)
+        for qkey, value in arrays:
+            for element in value:
+                self._write_array_table(element, f"{prefix}{qkey}")
+        return tables
+
+    def _write_array_table(self, element: object, name: str) -> None:
+        """Write one element of an array of tables with its nested tables.
 
-    # Remove blank line before closing (if present)
-    return re.sub(r"\n\n+$", "\n", content)
+        Args:
+            element: Table in the array.
+            name: Dotted name of the array.
+
+        Raises:
+            TypeError: When the array mixes tables with other values.
+        """
+        if not isinstance(element, dict):
+            msg = f"Array of tables {name} also contains {type(element).__name__}"
+            raise TypeError(msg)
+        self._write_line(f"[[{name}]]")
+        # Like `toml.dumps`, the blank line follows the values of the element,
+        # or precedes its arrays of tables if it has no values
+        has_values = any(
+            not isinstance(value, dict) and not _is_array_of_tables(value)
+            for value in element.values()
+        )
+        if not has_values:
+            self._write_blank_line()
+        tables = self._write_table(element, name)
+        if has_values:
+            self._write_blank_line()
+        while tables:
+            deeper: dict[str, dict[str, Any]] = {}
+            for subname, table in tables.items():
+                if not table:
+                    self._write_line(f"[{name}.{subname}]")
+                for key, subtable in self._write_table(
+                    table, f"{name}.{subname}", f"[{name}.{subname}]"
+                ).items():
+                    deeper[f"{subname}.{key}"] = subtable
+            tables = deeper
+
+    def _dump_value(self, value: object) -> str:  # noqa: PLR0911
+        """Emit an inline value.
+
+        Args:
+            value: Value to emit.
+
+        Returns:
+            TOML representation of the value.
+
+        Raises:
+            TypeError: For values that cannot be represented inline.
+        """
+        if isinstance(value, str):
+            return _toml_str(value)
+        if isinstance(value, bool):
+            return "true" if value else "false"
+        if isinstance(value, int):
+            return str(value)
+        if isinstance(value, float):
+            return str(value).replace("e+0", "e+").replace("e-0", "e-")
+        if isinstance(value, datetime.datetime):
+            return value.isoformat().replace("+00:00", "Z")
+        if isinstance(value, (datetime.date, datetime.time)):
+            return value.isoformat()
+        if isinstance(value, list):
+            if not value:
+                return "[]"
+            return f"[ {', '.join(self._dump_value(item) for item in value)}]"
+        msg = f"Cannot represent {type(value).__name__} as an inline TOML value"
+        raise TypeError(msg)
+
+
+class _TOMLEngine(ABC):
+    """TOML parser used to format TOML front matter, with the shared writer."""
+
+    name = ""
+
+    @abstractmethod
+    def loads(self, content: str) -> dict[str, Any]:
+        """Parse TOML content."""
+
+    def dumps(self, metadata: dict[str, Any], *, sort_keys: bool = False) -> str:  # noqa: PLR6301
+        """Serialize metadata in the normalized layout with `_TOMLWriter`.
+
+        Args:
+            metadata: Parsed TOML document.
+            sort_keys: Sort the keys of every table, while writing.
+
+        Returns:
+            TOML string.
+        """
+        with phase("toml", "dump"):  # Includes sorting
+            return _TOMLWriter(sort_keys=sort_keys).dumps(metadata)
+
+
+class _LegacyTOMLEngine(_TOMLEngine):
+    """Engine backed by the pure-Python `toml` package."""
+
+    name = "toml"
+
+    def loads(self, content: str) -> dict[str, Any]:  # noqa: PLR6301
+        """Parse TOML content with `toml.loads`."""
+        import toml  # type: ignore[import-untyped]  # noqa: PLC0415
+
+        return toml.loads(content)
+
+
+class _TomllibTOMLEngine(_TOMLEngine):
+    """Engine backed by the stdlib `tomllib` parser."""
+
+    name = "tomllib"
+
+    def loads(self, content: str) -> dict[str, Any]:  # noqa: PLR6301
+        """Parse TOML content with `tomllib.loads`.
+
+        Raises:
+            RuntimeError: When tomllib is unavailable (Python < 3.11).
+        """
+        if sys.version_info >= (3, 11):
+            import tomllib  # noqa: PLC0415
+
+            return tomllib.loads(content)
+        msg = "tomllib requires Python 3.11 or newer"
+        raise RuntimeError(msg)
+
+
+def _get_toml_engine() -> _TOMLEngine:
+    """Return the fastest available TOML engine.
+
+    Returns:
+        The tomllib engine on Python 3.11+, otherwise the `toml` package.
+    """
+    if sys.version_info >= (3, 11):
+        return _TomllibTOMLEngine()
+    return _LegacyTOMLEngine()
 
 
 def _strip_delimiters(formatted: str, delimiter: str) -> str:
@@ -195,6 +838,25 @@ def _strip_delimiters(formatted: str, delimiter: str) -> str:
     return formatted.rstrip("\n")
 
 
+class _LimitFallbacks(threading.local):
+    """Per-thread number of blocks kept as-is because they exceeded a limit."""
+
+    count = 0
+
+
+_LIMIT_FALLBACKS = _LimitFallbacks()
+
+
+def _limit_fallback_count() -> int:
+    """Return the limit fallbacks of this thread so far, to tell if a call hit one.
+
+    Blocks that fail to parse fall back the same way on every run, so their
+    fallback is cached. Blocks over a limit are not: a block that timed out
+    on a loaded machine is formatted normally by the next run.
+    """
+    return _LIMIT_FALLBACKS.count
+
+
 class FormatError(Exception):
     """Exception raised when formatting fails and original content should be returned."""
 
@@ -214,13 +876,18 @@ def _handle_format_errors(
     format_type: str,
     *,
     strict: bool,
+    limits: BlockLimits = NO_LIMITS,
 ) -> Generator[None, None, None]:
     """Handle errors during front matter formatting.
 
+    Blocks over the size limit fail before they are parsed, and formatting
+    that runs past the time limit fails at its next deadline check.
+
     Args:
         content: Original content to return if formatting fails.
         format_type: Type of format being processed (e.g., 'YAML', 'TOML').
         strict: If True, raise exceptions instead of preserving original.
+        limits: Size and time limits for the block.
 
     Yields:
         None
@@ -231,12 +898,19 @@ def _handle_format_errors(
         TypeError: Re-raised in strict mode from invalid content types.
         AttributeError: Re-raised in strict mode from invalid content structure.
     """
+    start = time.perf_counter_ns() if collecting() else 0
     try:
-        yield
+        _check_size(content, limits.max_bytes)
+        with _time_limit(limits.timeout):
+            yield
     except (ValueError, TypeError, AttributeError) as e:
         LOGGER.debug("Failed to format %s front matter: %s", format_type, e)
         if strict:
             raise
+        if isinstance(e, BudgetExceededError):
+            _LIMIT_FALLBACKS.count += 1
+        if start:
+            record(format_type.lower(), "fallback", time.perf_counter_ns() - start)
         raise FormatError(content) from e
     except Exception as e:
         LOGGER.warning(
@@ -244,6 +918,8 @@ def _handle_format_errors(
         )
         if strict:
             raise
+        if start:
+            record(format_type.lower(), "fallback", time.perf_counter_ns() - start)
         raise FormatError(content) from e
 
 
@@ -259,7 +935,7 @@ def _format_with_handler(
 
     Args:
         content: Raw front matter content (without delimiters).
-        handler: Handler instance with export() method.
+        handler: Handler instance with export() method and `format_type`.
         parse_func: Function to parse content (YAML().load, toml.loads, etc.).
         sort_keys: Whether to sort keys in the front matter.
         wrap: Line length limit, if any.
@@ -271,7 +947,8 @@ def _format_with_handler(
         TypeError: When metadata is not a dictionary.
         ValueError: When metadata contains no valid key-value pairs.
     """
-    metadata = parse_func(content)
+    with phase(handler.format_type, "parse"):
+        metadata = parse_func(content)
 
     # Metadata must be a dictionary (key-value pairs)
     # Scalar values, lists, etc. are not valid front matter
@@ -292,12 +969,500 @@ def _format_with_handler(
     return handler.export(metadata, sort_keys=sort_keys, wrap=wrap).strip()
 
 
+# Conservative lexical patterns for front matter that is already in the exact
+# form the formatters emit. A block that matches is returned as-is without a
+# parse/dump round-trip; anything else takes the full path.
+_YAML_SCALAR = (
+    r"-?[1-9]\d*(?:\.\d+)?|-?0\.\d+|0"  # Integers and plain decimals
+    r"|(?P<date>\d{4}-\d{2}-\d{2})"  # Dates, checked separately
+    r"|[^\W\d_](?:[\w .,/()'+-]*[\w.,/()'+-])?"  # Plain words without indicators
+)
+_YAML_CANONICAL_KEY = re.compile(
+    rf"(?P<key>[A-Za-z_][\w.-]*):(?: (?P<value>{_YAML_SCALAR}))?"
+)
+_YAML_CANONICAL_ITEM = re.compile(rf"  - (?P<value>{_YAML_SCALAR})")
+_YAML_NON_STRING_WORDS = frozenset({"true", "false", "null"})
+"""Words that ruamel resolves to booleans or null and may re-emit differently."""
+
+_TOML_STRING = r'"[ !#-\[\]-~]*"'  # Printable ASCII without quotes or escapes
+_TOML_CANONICAL_LINE = re.compile(
+    r"(?P<key>[A-Za-z0-9_-]+) = (?:"
+    rf"{_TOML_STRING}|0|-?[1-9]\d*|true|false|\d{{4}}-\d{{2}}-\d{{2}}"
+    rf"|\[ {_TOML_STRING}(?:, {_TOML_STRING})*\]"
+    r")"
+)
+
+_JSON_STRING = r'"[ !#-\[\]-~]*"'  # Printable ASCII without quotes or escapes
+_JSON_CANONICAL_LINE = re.compile(
+    rf"    (?P<key>{_JSON_STRING}): "
+    rf"(?:{_JSON_STRING}|0|-?[1-9]\d*|true|false|null)(?P<comma>,?)"
+)
+
+
+def _keys_are_canonical(keys: list[str], *, sort_keys: bool) -> bool:
+    """Check that keys are unique and, if sorting, already in order."""
+    if sort_keys:
+        return all(a < b for a, b in pairwise(keys))
+    return len(set(keys)) == len(keys)
+
+
+def _is_valid_date(text: str) -> bool:
+    """Check whether a `YYYY-MM-DD` string is a date of the calendar."""
+    try:
+        datetime.date.fromisoformat(text)
+    except ValueError:
+        return False
+    return True
+
+
+def _is_canonical_yaml(content: str, *, sort_keys: bool, wrap: int | None) -> bool:
+    """Check if YAML content is already in the form that would be emitted.
+
+    Only flat mappings of plain scalars and block sequences of plain scalars
+    are recognized. Lines longer than the wrap width are rejected because
+    ruamel may fold them.
+
+    Args:
+        content: Raw YAML string (without delimiters).
+        sort_keys: If True, keys must already be sorted.
+        wrap: Line length limit, if any.
+
+    Returns:
+        True if formatting would return the content unchanged.
+    """
+    keys = []
+    expect_items = False
+    for line in content.split("\n"):
+        if wrap and len(line) > wrap:
+            return False
+        if expect_items and (match := _YAML_CANONICAL_ITEM.fullmatch(line)):
+            key = None
+        elif match := _YAML_CANONICAL_KEY.fullmatch(line):
+            key = match["key"]
+            if key.lower() in _YAML_NON_STRING_WORDS:
+                return False
+            keys.append(key)
+        else:
+            return False
+        value = match["value"]
+        if (
+            value is not None
+            and value.lower() in _YAML_NON_STRING_WORDS
+            and value not in {"true", "false"}
+        ):
+            return False
+        if match["date"] and not _is_valid_date(match["date"]):
+            return False  # Parsing rejects it, even if it is in canonical form
+        expect_items = key is None or value is None
+    return bool(keys) and _keys_are_canonical(keys, sort_keys=sort_keys)
+
+
+_YAML_PLAIN_SCALAR = (
+    r"0|-?[1-9]\d*"  # Integers
+    r"|\d{4}-\d{2}-\d{2}"  # Dates
+    r"|[^\W\d_](?:[\w .,/()'+-]*[\w.,/()'+-])?"  # Plain words without indicators
+)
+_YAML_PLAIN_LINE = re.compile(
+    r"(?P<indent> *)(?P<items>(?:- +)*)(?:"
+    rf"(?P<key>[A-Za-z_][\w.-]*):(?: +(?P<value>{_YAML_PLAIN_SCALAR}))?"
+    rf"|(?P<item>{_YAML_PLAIN_SCALAR})"
+    r")"
+)
+
+
+def _match_plain_yaml_line(line: str) -> re.Match[str] | None:
+    """Match a line whose scalars load the same with every YAML engine."""
+    if not (match := _YAML_PLAIN_LINE.fullmatch(line)):
+        return None
+    key = match["key"]
+    if key is not None and key.lower() in _YAML_NON_STRING_WORDS:
+        return None
+    scalar = match["value"] or match["item"]
+    if (
+        scalar is not None
+        and scalar.lower() in _YAML_NON_STRING_WORDS
+        and scalar not in {"true", "false"}
+    ):
+        return None
+    return match
+
+
+def _select_yaml_engine(
+    content: str, wrap: int | None, budget: YAMLBudget = DEFAULT_YAML_BUDGET
+) -> str:
+    """Classify a YAML block by the engine that can format it.
+
+    Blocks of nested block mappings and sequences whose scalars are plain
+    strings, canonical integers, booleans or dates carry nothing that
+    round-trip mode preserves (comments, quotes, anchors, tags, flow style,
+    scalar formatting or blank lines), so the C-backed safe loader produces
+    the same data. libyaml's emitter ignores the sequence offset and wraps
+    differently, so it is only used for sequence-free blocks without a wrap.
+
+    Blocks that might exceed the node or depth budget are left to the
+    round-trip engine, which enforces it.
+
+    Args:
+        content: Raw YAML string (without delimiters).
+        wrap: Line length limit, if any.
+        budget: Resource limits for the block.
+
+    Returns:
+        One of the `_YAML_*` engine kinds.
+    """
+    lines = content.split("\n")
+    # Each line holds at most a key and a value
+    if not content or not _has_libyaml() or 2 * len(lines) > budget.max_nodes:
+        return _YAML_ROUND_TRIP
+    has_sequence = False
+    open_key_column = None  # Column of a key whose value is on the next lines
+    for line in lines:
+        match = _match_plain_yaml_line(line)
+        if (
+            not match
+            or len(match["indent"]) + len(match["items"]) + 2 > budget.max_depth
+        ):
+            return _YAML_ROUND_TRIP
+        column = len(match["indent"])
+        if open_key_column is not None and not (
+            column > open_key_column or (column == open_key_column and match["items"])
+        ):
+            return _YAML_ROUND_TRIP  # The open key would be null
+        has_sequence = has_sequence or bool(match["items"])
+        open_key_column = None
+        if match["key"] is not None and match["value"] is None:
+            open_key_column = match.start("key")
+    if open_key_column is not None:
+        return _YAML_ROUND_TRIP
+    if wrap is None and not has_sequence:
+        return _YAML_LIBYAML
+    return _YAML_LIBYAML_LOADER
+
+
+def _is_canonical_toml(content: str, *, sort_keys: bool) -> bool:
+    """Check if TOML content is already in the form that would be emitted.
+
+    Only flat tables of strings, integers, booleans, dates and string arrays
+    are recognized.
+
+    Args:
+        content: Raw TOML string (without delimiters).
+        sort_keys: If True, keys must already be sorted.
+
+    Returns:
+        True if formatting would return the content unchanged.
+    """
+    keys = []
+    for line in content.split("\n"):
+        if not (match := _TOML_CANONICAL_LINE.fullmatch(line)):
+            return False
+        keys.append(match["key"])
+    return bool(keys) and _keys_are_canonical(keys, sort_keys=sort_keys)
+
+
+def _is_canonical_json(content: str, *, sort_keys: bool) -> bool:
+    """Check if JSON content is already in the form that would be emitted.
+
+    Only flat objects of ASCII strings, integers, booleans and null are
+    recognized.
+
+    Args:
+        content: Raw JSON string.
+        sort_keys: If True, keys must already be sorted.
+
+    Returns:
+        True if formatting would return the content unchanged.
+    """
+    lines = content.split("\n")
+    if len(lines) < 3 or lines[0] != "{" or lines[-1] != "}":  # noqa: PLR2004
+        return False
+    keys = []
+    last = len(lines) - 2
+    for index, line in enumerate(lines[1:-1], start=1):
+        if not (match := _JSON_CANONICAL_LINE.fullmatch(line)):
+            return False
+        if bool(match["comma"]) == (index == last):
+            return False
+        keys.append(match["key"][1:-1])
+    return _keys_are_canonical(keys, sort_keys=sort_keys)
+
+
+DEFAULT_CACHE_SIZE = 1024
+"""Default number of formatted blocks kept by the in-process cache."""
+
+
+class CacheInfo(NamedTuple):
+    """Statistics for the formatted front matter cache."""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class _FormatCache:
+    """Bounded LRU cache of formatted front matter.
+
+    Entries are keyed by the format, a digest of the content, the options that
+    affect the output, and the plugin version. Fallback results (the original
+    content returned for invalid blocks) are cached too, so an invalid block
+    only pays for a failed parse once. Blocks kept as-is because they
+    exceeded a time or budget limit, and exceptions raised in strict mode,
+    are never cached.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE) -> None:
+        """Initialize an empty cache.
+
+        Args:
+            maxsize: Maximum number of entries. Zero disables caching.
+        """
+        self._entries: OrderedDict[tuple[object, ...], str] = OrderedDict()
+        self._lock = threading.Lock()
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_format(
+        self,
+        options: tuple[object, ...],
+        content: str,
+        format_func: Callable[[], str],
+    ) -> str:
+        """Return the cached result for content and options, formatting on a miss.
+
+        Args:
+            options: Format type and options that affect the output.
+            content: Raw front matter content (without delimiters).
+            format_func: Called to format the content on a cache miss.
+
+        Returns:
+            Formatted front matter (without delimiters).
+        """
+        if self.maxsize <= 0:
+            return format_func()
+        import hashlib  # noqa: PLC0415
+
+        digest = hashlib.blake2b(content.encode(), digest_size=16).digest()
+        key = (*options, digest, __version__)
+        with self._lock:
+            if (cached := self._entries.get(key)) is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+        limit_fallbacks = _limit_fallback_count()
+        result = format_func()
+        if _limit_fallback_count() != limit_fallbacks:
+            return result
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return result
+
+    def resize(self, maxsize: int) -> None:
+        """Change the maximum size, evicting the least recently used entries.
+
+        Args:
+            maxsize: Maximum number of entries. Zero disables caching.
+        """
+        if maxsize == self.maxsize:
+            return
+        with self._lock:
+            self.maxsize = max(maxsize, 0)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def info(self) -> CacheInfo:
+        """Return hit/miss counters and the current size."""
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
+
+    def clear(self) -> None:
+        """Remove all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+_FORMAT_CACHE = _FormatCache()
+
+
+def cache_info() -> CacheInfo:
+    """Return statistics for the in-process formatted front matter cache."""
+    return _FORMAT_CACHE.info()
+
+
+def cache_clear() -> None:
+    """Clear the in-process formatted front matter cache."""
+    _FORMAT_CACHE.clear()
+
+
 def format_yaml(
     content: str,
     *,
     strict: bool = False,
     sort_keys: bool = True,
     wrap: int | None = None,
+    budget: YAMLBudget = DEFAULT_YAML_BUDGET,
+    limits: BlockLimits = NO_LIMITS,
+) -> str:
+    """Format YAML front matter content, reusing cached results.
+
+    Args:
+        content: Raw YAML string to format (without delimiters).
+        strict: If True, raise exceptions instead of preserving original.
+        sort_keys: If True, sort keys alphabetically.
+        wrap: Line length limit, if any.
+        budget: Resource limits; blocks over budget are handled as invalid.
+        limits: Size and time limits; exceeding them is handled as invalid.
+
+    Returns:
+        Formatted YAML string (without delimiters), or original content if
+        formatting fails in non-strict mode.
+    """
+    if _over_size_limit(content, strict=strict, limits=limits):
+        return content
+    if _is_canonical_yaml(content, sort_keys=sort_keys, wrap=wrap):
+        return content
+    return _FORMAT_CACHE.get_or_format(
+        ("yaml", strict, sort_keys, wrap, budget, limits),
+        content,
+        lambda: _format_yaml(
+            content,
+            strict=strict,
+            sort_keys=sort_keys,
+            wrap=wrap,
+            budget=budget,
+            limits=limits,
+        ),
+    )
+
+
+def format_toml(
+    content: str,
+    *,
+    strict: bool = False,
+    sort_keys: bool = True,
+    limits: BlockLimits = NO_LIMITS,
+) -> str:
+    """Format TOML front matter content, reusing cached results.
+
+    Args:
+        content: Raw TOML string to format (without delimiters).
+        strict: If True, raise exceptions instead of preserving original.
+        sort_keys: If True, sort keys alphabetically.
+        limits: Size and time limits; exceeding them is handled as invalid.
+
+    Returns:
+        Formatted TOML string (without delimiters), or original content if
+        formatting fails in non-strict mode.
+    """
+    if _over_size_limit(content, strict=strict, limits=limits):
+        return content
+    if _is_canonical_toml(content, sort_keys=sort_keys):
+        return content
+    return _FORMAT_CACHE.get_or_format(
+        ("toml", strict, sort_keys, None, limits),
+        content,
+        lambda: _format_toml(
+            content, strict=strict, sort_keys=sort_keys, limits=limits
+        ),
+    )
+
+
+def format_json(
+    content: str,
+    *,
+    strict: bool = False,
+    sort_keys: bool = True,
+    limits: BlockLimits = NO_LIMITS,
+) -> str:
+    """Format JSON front matter content, reusing cached results.
+
+    Args:
+        content: Raw JSON string to format (without delimiters).
+        strict: If True, raise exceptions instead of preserving original.
+        sort_keys: If True, sort keys alphabetically.
+        limits: Size and time limits; exceeding them is handled as invalid.
+
+    Returns:
+        Formatted JSON string (without delimiters), or original content if
+        formatting fails in non-strict mode.
+    """
+    if _over_size_limit(content, strict=strict, limits=limits):
+        return content
+    if _is_canonical_json(content, sort_keys=sort_keys):
+        return content
+    return _FORMAT_CACHE.get_or_format(
+        ("json", strict, sort_keys, None, limits),
+        content,
+        lambda: _format_json(
+            content, strict=strict, sort_keys=sort_keys, limits=limits
+        ),
+    )
+
+
+def format_yaml_block(content: str, settings: FrontMatterSettings) -> str:
+    """Format YAML front matter content with the resolved plugin options."""
+    return format_yaml(
+        content,
+        strict=settings.strict,
+        sort_keys=settings.sort_keys,
+        wrap=settings.wrap,
+        budget=settings.yaml_budget,
+        limits=settings.limits,
+    )
+
+
+def format_toml_block(content: str, settings: FrontMatterSettings) -> str:
+    """Format TOML front matter content with the resolved plugin options."""
+    return format_toml(
+        content,
+        strict=settings.strict,
+        sort_keys=settings.sort_keys,
+        limits=settings.limits,
+    )
+
+
+def format_json_block(content: str, settings: FrontMatterSettings) -> str:
+    """Format JSON front matter content with the resolved plugin options."""
+    return format_json(
+        content,
+        strict=settings.strict,
+        sort_keys=settings.sort_keys,
+        limits=settings.limits,
+    )
+
+
+def load_yaml_block(content: str, settings: FrontMatterSettings) -> Any:  # noqa: ANN401
+    """Parse YAML front matter in round-trip mode, within the YAML budget."""
+    with _yaml_engine(settings.wrap) as yaml:
+        return _load_yaml(yaml, settings.yaml_budget, content)
+
+
+def load_toml_block(content: str, settings: FrontMatterSettings) -> Any:  # noqa: ANN401, ARG001
+    """Parse TOML front matter with the preferred engine."""
+    return _get_toml_engine().loads(content)
+
+
+def load_json_block(content: str, settings: FrontMatterSettings) -> Any:  # noqa: ANN401, ARG001
+    """Parse JSON front matter."""
+    import json  # noqa: PLC0415
+
+    return json.loads(content)
+
+
+def _format_yaml(
+    content: str,
+    *,
+    strict: bool = False,
+    sort_keys: bool = True,
+    wrap: int | None = None,
+    budget: YAMLBudget = DEFAULT_YAML_BUDGET,
+    limits: BlockLimits = NO_LIMITS,
 ) -> str:
     """Format YAML front matter content.
 
@@ -306,19 +1471,25 @@ def format_yaml(
         strict: If True, raise exceptions instead of preserving original.
         sort_keys: If True, sort keys alphabetically.
         wrap: Line length limit, if any.
+        budget: Resource limits; blocks over budget are handled as invalid.
+        limits: Size and time limits; exceeding them is handled as invalid.
 
     Returns:
         Formatted YAML string (without delimiters), or original content if
         formatting fails in non-strict mode.
     """
+    # Shared data was loaded in round-trip mode, so it is dumped the same way
+    shared = _shared_loader("yaml", content)
+    kind = _YAML_ROUND_TRIP if shared else _select_yaml_engine(content, wrap, budget)
     try:
-        with _handle_format_errors(content, "YAML", strict=strict):
-            yaml = YAML()
-            yaml.preserve_quotes = True
+        with (
+            _handle_format_errors(content, "YAML", strict=strict, limits=limits),
+            _yaml_engine(wrap, kind) as yaml,
+        ):
             return _format_with_handler(
                 content,
-                _UnicodePreservingYAMLHandler(),
-                yaml.load,
+                _UnicodePreservingYAMLHandler(yaml, budget.max_output_chars),
+                shared or partial(_load_yaml, yaml, budget),
                 sort_keys=sort_keys,
                 wrap=wrap,
             )
@@ -326,49 +1497,65 @@ def format_yaml(
         return e.content
 
 
-def format_toml(content: str, *, strict: bool = False, sort_keys: bool = True) -> str:
+def _format_toml(
+    content: str,
+    *,
+    strict: bool = False,
+    sort_keys: bool = True,
+    limits: BlockLimits = NO_LIMITS,
+) -> str:
     """Format TOML front matter content.
 
     Args:
         content: Raw TOML string to format (without delimiters).
         strict: If True, raise exceptions instead of preserving original.
         sort_keys: If True, sort keys alphabetically.
+        limits: Size and time limits; exceeding them is handled as invalid.
 
     Returns:
         Formatted TOML string (without delimiters), or original content if
         formatting fails in non-strict mode.
     """
+    engine = _get_toml_engine()
     try:
-        with _handle_format_errors(content, "TOML", strict=strict):
-            formatted = _format_with_handler(
+        with _handle_format_errors(content, "TOML", strict=strict, limits=limits):
+            return _format_with_handler(
                 content,
-                _SortingTOMLHandler(),
-                toml.loads,
+                _SortingTOMLHandler(engine),
+                _shared_loader("toml", content) or engine.loads,
                 sort_keys=sort_keys,
             )
-            return _normalize_toml_output(formatted)
     except FormatError as e:
         return e.content
 
 
-def format_json(content: str, *, strict: bool = False, sort_keys: bool = True) -> str:
+def _format_json(
+    content: str,
+    *,
+    strict: bool = False,
+    sort_keys: bool = True,
+    limits: BlockLimits = NO_LIMITS,
+) -> str:
     """Format JSON front matter content.
 
     Args:
         content: Raw JSON string to format (without delimiters).
         strict: If True, raise exceptions instead of preserving original.
         sort_keys: If True, sort keys alphabetically.
+        limits: Size and time limits; exceeding them is handled as invalid.
 
     Returns:
         Formatted JSON string (without delimiters), or original content if
         formatting fails in non-strict mode.
     """
+    import json  # noqa: PLC0415
+
     try:
-        with _handle_format_errors(content, "JSON", strict=strict):
+        with _handle_format_errors(content, "JSON", strict=strict, limits=limits):
             return _format_with_handler(
                 content,
                 _SortingJSONHandler(),
-                json.loads,
+                _shared_loader("json", content) or json.loads,
                 sort_keys=sort_keys,
             )
     except FormatError as e:
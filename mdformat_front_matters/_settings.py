@@ -0,0 +1,285 @@
+"""Plugin options resolved once per combination of option values."""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Hashable
+from typing import NoReturn, TypeGuard
+
+from mdformat.renderer import LOGGER
+
+from ._formatters import (
+    DEFAULT_CACHE_SIZE,
+    DEFAULT_YAML_BUDGET,
+    NO_LIMITS,
+    BlockLimits,
+    YAMLBudget,
+)
+from ._helpers import ContextOptions, get_conf
+from .mdit_plugins import FORMATS
+
+_MEMO_SIZE = 32
+"""Number of recently used option combinations whose settings are remembered."""
+
+
+class FrontMatterSettings:
+    """Validated, immutable front matter options.
+
+    Attributes:
+        strict: Raise on invalid front matter instead of keeping it.
+        sort_keys: Sort keys alphabetically.
+        wrap: Line length limit for YAML, if any.
+        cache_size: Number of formatted blocks kept in memory.
+        cache_dir: Directory of the persistent cache, if enabled.
+        stats: Print formatting statistics at exit.
+        yaml_budget: Limits on the work done to format a YAML block.
+        limits: Size and time limits of a block of any format.
+        max_lines: Maximum length of a block in lines, if limited.
+        formats: Names of the formats to recognize, or None for all.
+        data: Share the parsed data of each block on its token and `env`.
+    """
+
+    __slots__ = (
+        "cache_dir",
+        "cache_size",
+        "data",
+        "formats",
+        "limits",
+        "max_lines",
+        "sort_keys",
+        "stats",
+        "strict",
+        "wrap",
+        "yaml_budget",
+    )
+
+    strict: bool
+    sort_keys: bool
+    wrap: int | None
+    cache_size: int
+    cache_dir: str | None
+    stats: bool
+    yaml_budget: YAMLBudget
+    limits: BlockLimits
+    max_lines: int | None
+    formats: frozenset[str] | None
+    data: bool
+
+    def __init__(
+        self,
+        *,
+        strict: bool = False,
+        sort_keys: bool = False,
+        wrap: int | None = None,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        cache_dir: str | None = None,
+        stats: bool = False,
+        yaml_budget: YAMLBudget = DEFAULT_YAML_BUDGET,
+        limits: BlockLimits = NO_LIMITS,
+        max_lines: int | None = None,
+        formats: frozenset[str] | None = None,
+        data: bool = False,
+    ) -> None:
+        """Initialize the settings; see the class attributes."""
+        for name, value in (
+            ("strict", strict),
+            ("sort_keys", sort_keys),
+            ("wrap", wrap),
+            ("cache_size", cache_size),
+            ("cache_dir", cache_dir),
+            ("stats", stats),
+            ("yaml_budget", yaml_budget),
+            ("limits", limits),
+            ("max_lines", max_lines),
+            ("formats", formats),
+            ("data", data),
+        ):
+            object.__setattr__(self, name, value)
+
+    @classmethod
+    def from_options(cls, options: ContextOptions) -> FrontMatterSettings:
+        """Read the settings from mdformat options.
+
+        API options take precedence over CLI and TOML options. Values of the
+        wrong type fall back to their defaults, as `--wrap=keep` does for the
+        wrap width.
+
+        Args:
+            options: mdformat options, as in `RenderContext.options`.
+
+        Returns:
+            The resolved settings.
+        """
+        wrap = get_conf(options, "wrap_front_matter")
+        if not _is_int(wrap):
+            wrap = get_conf(options, "wrap")
+        cache_size = get_conf(options, "front_matter_cache_size")
+        cache_dir = get_conf(options, "front_matter_cache_dir")
+        max_bytes = get_conf(options, "front_matter_max_bytes")
+        timeout = get_conf(options, "front_matter_timeout")
+        max_lines = get_conf(options, "front_matter_max_lines")
+        return cls(
+            strict=bool(get_conf(options, "strict_front_matter")),
+            sort_keys=bool(get_conf(options, "sort_front_matter")),
+            wrap=wrap if _is_int(wrap) else None,
+            cache_size=cache_size if _is_int(cache_size) else DEFAULT_CACHE_SIZE,
+            cache_dir=cache_dir if isinstance(cache_dir, str) and cache_dir else None,
+            stats=bool(get_conf(options, "front_matter_stats")),
+            yaml_budget=_yaml_budget(options),
+            limits=BlockLimits(
+                max_bytes=max_bytes if _is_int(max_bytes) and max_bytes >= 0 else None,
+                timeout=float(timeout) if _is_number(timeout) and timeout > 0 else None,
+            ),
+            max_lines=max_lines if _is_int(max_lines) and max_lines > 0 else None,
+            formats=_formats(get_conf(options, "front_matter_formats")),
+            data=bool(get_conf(options, "front_matter_data")),
+        )
+
+    def __setattr__(self, name: str, value: object) -> NoReturn:
+        """Reject changes: settings are shared between documents.
+
+        Raises:
+            AttributeError: Always.
+        """
+        msg = f"{type(self).__name__} is immutable"
+        raise AttributeError(msg)
+
+    def __delattr__(self, name: str) -> NoReturn:
+        """Reject changes: settings are shared between documents.
+
+        Raises:
+            AttributeError: Always.
+        """
+        msg = f"{type(self).__name__} is immutable"
+        raise AttributeError(msg)
+
+    def _fields(self) -> tuple[object, ...]:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __repr__(self) -> str:
+        """Return a representation that lists every field."""
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+    def __eq__(self, other: object) -> bool:
+        """Compare all fields."""
+        if not isinstance(other, FrontMatterSettings):
+            return NotImplemented
+        return self._fields() == other._fields()
+
+    def __hash__(self) -> int:
+        """Hash all fields."""
+        return hash(self._fields())
+
+
+def _is_int(value: object) -> TypeGuard[int]:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _is_number(value: object) -> TypeGuard[int | float]:
+    return isinstance(value, float) or _is_int(value)
+
+
+_BUDGET_OPTIONS = {
+    "max_nodes": "front_matter_max_nodes",
+    "max_aliases": "front_matter_max_aliases",
+    "max_depth": "front_matter_max_depth",
+    "max_output_chars": "front_matter_max_output",
+}
+
+
+def _yaml_budget(options: ContextOptions) -> YAMLBudget:
+    """Read the YAML limits, keeping the default of unset or negative ones."""
+    limits = {}
+    for field, key in _BUDGET_OPTIONS.items():
+        value = get_conf(options, key)
+        if _is_int(value) and value >= 0:
+            limits[field] = value
+    return DEFAULT_YAML_BUDGET._replace(**limits) if limits else DEFAULT_YAML_BUDGET
+
+
+def _formats(value: object) -> frozenset[str] | None:
+    """Read the enabled formats, from a list or a comma-separated string.
+
+    Unknown names, e.g. a typo, are reported with a warning and fall back to
+    recognizing every format rather than leaving blocks unformatted.
+    """
+    if isinstance(value, str):
+        value = value.split(",")
+    if not isinstance(value, (list, tuple)):
+        return None
+    names = [name.strip() if isinstance(name, str) else name for name in value]
+    if unknown := [name for name in names if name not in FORMATS]:
+        LOGGER.warning(
+            "Unknown front matter formats %s, recognizing all of: %s",
+            ", ".join(map(repr, unknown)),
+            ", ".join(FORMATS),
+        )
+        return None
+    return frozenset(names) or None
+
+
+_OPTIONS = (
+    "wrap_front_matter",
+    "wrap",
+    "front_matter_cache_size",
+    "front_matter_cache_dir",
+    "front_matter_max_bytes",
+    "front_matter_timeout",
+    "front_matter_max_lines",
+    "strict_front_matter",
+    "sort_front_matter",
+    "front_matter_stats",
+    *_BUDGET_OPTIONS.values(),
+    "front_matter_formats",
+    "front_matter_data",
+)
+"""Every option read by `FrontMatterSettings.from_options`."""
+
+_MEMO: dict[Hashable, FrontMatterSettings] = {}
+_MEMO_LOCK = threading.Lock()
+
+
+def _options_key(options: ContextOptions) -> Hashable | None:
+    """Return the values of the options, or None if one cannot be hashed.
+
+    Types are part of the key: `True` and `1` are equal but resolve differently.
+    """
+    values = []
+    for name in _OPTIONS:
+        value: object = get_conf(options, name)
+        if isinstance(value, list):  # e.g. `front_matter_formats`
+            value = tuple(value)
+        values.append((type(value), value))
+    key = tuple(values)
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def resolve_settings(options: ContextOptions) -> FrontMatterSettings:
+    """Return the settings for mdformat options, resolving each combination once.
+
+    Results are remembered by the values of the options in `_OPTIONS`, so a
+    mapping that is changed after it has been used resolves again, and the
+    copies mdformat makes for each document share their settings.
+
+    Args:
+        options: mdformat options, as in `RenderContext.options`.
+
+    Returns:
+        The resolved settings.
+    """
+    key = _options_key(options)
+    if key is None:
+        return FrontMatterSettings.from_options(options)
+    if (settings := _MEMO.get(key)) is not None:
+        return settings
+    settings = FrontMatterSettings.from_options(options)
+    with _MEMO_LOCK:
+        if len(_MEMO) >= _MEMO_SIZE:
+            del _MEMO[next(iter(_MEMO))]
+        _MEMO[key] = settings
+    return settings
@@ -0,0 +1,158 @@
+"""Format only the front matter of a document and keep the body byte for byte."""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable, Mapping
+from functools import cache
+from itertools import chain
+from typing import Any
+
+from markdown_it import MarkdownIt
+from markdown_it.rules_block import StateBlock
+from markdown_it.token import Token
+
+from ._settings import FrontMatterSettings, resolve_settings
+from .mdit_plugins import FrontMatterFormat, _front_matter_rule, _openers
+from .plugin import _render_block
+
+_HEAD_SIZE = 4096
+"""Characters of the document given to the block rule on the first attempt."""
+_CODE_INDENT = 4
+_NEWLINE = re.compile(r"\r\n|\r|\n")
+_NO_OPTIONS: Mapping[str, Any] = {}
+
+
+@cache
+def _md() -> MarkdownIt:
+    """Parser the block rule runs with, created on first use."""
+    return MarkdownIt("commonmark")
+
+
+def _opens_front_matter(
+    state: StateBlock, openers: Mapping[str, FrontMatterFormat]
+) -> bool:
+    """Check whether the first line could open a block, to stop early otherwise."""
+    if state.sCount[0] >= _CODE_INDENT:
+        return False  # The indented code rule runs first
+    first_line = state.src[state.bMarks[0] + state.tShift[0] : state.eMarks[0]]
+    front_matter_format = openers.get(first_line[:1])
+    return front_matter_format is not None and bool(
+        front_matter_format.pattern.match(first_line)
+    )
+
+
+def _locate_front_matter(
+    text: str, max_lines: int | None = None, formats: Iterable[str] | None = None
+) -> Token | None:
+    """Run the block rule over a prefix of the text that doubles until it closes.
+
+    Prefixes end on a line boundary, so every line the rule sees is complete
+    and the work done is proportional to the size of the front matter. The
+    prefix stops growing once it holds `max_lines` lines.
+    """
+    openers = _openers(formats)
+    size = _HEAD_SIZE
+    while True:
+        newline = text.find("\n", size)
+        head = text if newline == -1 else text[: newline + 1]
+        state = StateBlock(_NEWLINE.sub("\n", head), _md(), {}, [])
+        if state.lineMax == 0 or state.sCount[0] >= _CODE_INDENT:
+            return None
+        if _front_matter_rule(
+            state,
+            0,
+            state.lineMax,
+            silent=False,
+            openers=openers,
+            max_lines=max_lines,
+        ):
+            return state.tokens[0]
+        if (
+            len(head) == len(text)
+            or not _opens_front_matter(state, openers)
+            or (max_lines is not None and state.lineMax >= max_lines)
+        ):
+            return None
+        size *= 2
+
+
+def _render_head(text: str, settings: FrontMatterSettings) -> tuple[str, int] | None:
+    """Format the front matter of a document.
+
+    Returns:
+        The formatted block with its line ending, in the document's first line
+        ending, and the index in `text` at which the body starts; or None if
+        the document has no front matter.
+    """
+    token = _locate_front_matter(text, settings.max_lines, settings.formats)
+    if token is None or token.map is None:
+        return None
+
+    newlines = _NEWLINE.finditer(text)
+    first = next(newlines, None)
+    newline = first[0] if first else "\n"
+    body_start = len(text)
+    for line, match in enumerate(chain([first], newlines), start=1):
+        if match is not None and line == token.map[1]:
+            body_start = match.end()
+            break
+
+    rendered = _render_block(
+        token.meta["format"], token.content, token.markup, settings
+    )
+    return f"{rendered}\n".replace("\n", newline), body_start
+
+
+def format_front_matter(text: str, *, options: Mapping[str, Any] | None = None) -> str:
+    """Format the front matter of a document without rendering the Markdown body.
+
+    The block is found with the same markdown-it rule and formatted with the
+    same options as `mdformat.text`, but the rest of the document is copied
+    unchanged after it, so the cost depends only on the size of the front
+    matter. The formatted block uses the document's first line ending.
+
+    Args:
+        text: Markdown text.
+        options: mdformat options, as for `mdformat.text`.
+
+    Returns:
+        The document with formatted front matter, or the text unchanged if it
+        has none.
+    """
+    settings = resolve_settings({"mdformat": options or _NO_OPTIONS})
+    head = _render_head(text, settings)
+    if head is None:
+        return text
+    rendered, body_start = head
+    return rendered + text[body_start:]
+
+
+def check_front_matter(
+    text: str, *, options: Mapping[str, Any] | None = None
+) -> tuple[int, int] | None:
+    """Check that the front matter of a document is formatted.
+
+    The block is formatted as by `format_front_matter` and compared with the
+    original lines, so the body is never read. Blocks already in canonical
+    form are recognized without being parsed. In strict mode, invalid front
+    matter raises as it does in `mdformat.text`.
+
+    Args:
+        text: Markdown text.
+        options: mdformat options, as for `mdformat.text`.
+
+    Returns:
+        The UTF-8 byte range `(start, end)` of the block, including its last
+        line ending, if formatting would change it; None if it is formatted
+        or the document has no front matter.
+    """
+    settings = resolve_settings({"mdformat": options or _NO_OPTIONS})
+    head = _render_head(text, settings)
+    if head is None:
+        return None
+    rendered, body_start = head
+    # Compares up to the first differing character, without copying the block
+    if len(rendered) == body_start and text.startswith(rendered):
+        return None
+    return 0, len(text[:body_start].encode())
@@ -0,0 +1,204 @@
+"""Opt-in counters and timings of the front matter formatting phases."""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from contextlib import AbstractContextManager, nullcontext
+from types import TracebackType
+from typing import NamedTuple, TextIO
+
+PHASES = ("detect", "parse", "sort", "dump", "normalize", "fallback", "render")
+"""Phases in the order they run for one block.
+
+detect: the markdown-it block rule (format "none" when no block was found).
+parse: loading the content. sort: reordering keys (JSON and TOML sort while dumping).
+dump: serializing. normalize: cleaning up the output and adding delimiters.
+fallback: failed attempts that returned the original content (`FormatError`).
+render: the whole block, including cache lookups.
+"""
+
+_NOOP = nullcontext()
+
+
+class PhaseStats(NamedTuple):
+    """Number of times a phase ran and the cumulative time it took."""
+
+    calls: int
+    seconds: float
+
+
+class FrontMatterStats(NamedTuple):
+    """Snapshot of the collected statistics."""
+
+    phases: dict[str, dict[str, PhaseStats]]
+    """Per format ("yaml", "toml", "json", "none"), the stats of each phase."""
+    cache_hits: int
+    cache_misses: int
+    disk_cache_hits: int
+    disk_cache_misses: int
+
+
+class _Collector:
+    """Thread-safe accumulator, only consulted while collection is enabled."""
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.timings: dict[tuple[str, str], list[int]] = {}
+        self.counters: dict[str, int] = {}
+
+    def record(self, format_type: str, phase: str, elapsed_ns: int) -> None:
+        with self.lock:
+            entry = self.timings.setdefault((format_type, phase), [0, 0])
+            entry[0] += 1
+            entry[1] += elapsed_ns
+
+    def count(self, name: str) -> None:
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + 1
+
+
+_COLLECTOR = _Collector()
+_REPORT_REGISTERED = False
+
+
+class _PhaseTimer:
+    __slots__ = ("format_type", "phase", "start")
+
+    def __init__(self, format_type: str, phase: str) -> None:
+        self.format_type = format_type
+        self.phase = phase
+        self.start = 0
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter_ns()
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        elapsed = time.perf_counter_ns() - self.start
+        _COLLECTOR.record(self.format_type, self.phase, elapsed)
+
+
+def collecting() -> bool:
+    """Return True if statistics are being collected."""
+    return _COLLECTOR.enabled
+
+
+def phase(format_type: str, name: str) -> AbstractContextManager[None]:
+    """Time a phase of formatting a block, if collection is enabled.
+
+    Args:
+        format_type: Front matter format ("yaml", "toml", "json", "none").
+        name: One of `PHASES`.
+
+    Returns:
+        A context manager that records the time spent inside it, or a shared
+        no-op context manager when statistics are not being collected.
+    """
+    if not _COLLECTOR.enabled:
+        return _NOOP
+    return _PhaseTimer(format_type, name)
+
+
+def record(format_type: str, name: str, elapsed_ns: int) -> None:
+    """Record a phase that was timed by the caller."""
+    _COLLECTOR.record(format_type, name, elapsed_ns)
+
+
+def count(name: str) -> None:
+    """Increment a named counter, if collection is enabled."""
+    if _COLLECTOR.enabled:
+        _COLLECTOR.count(name)
+
+
+def enable_stats(enabled: bool = True) -> None:  # noqa: FBT002
+    """Start or stop collecting statistics.
+
+    Collection is off by default, and then each instrumented phase costs a
+    single attribute check.
+
+    Args:
+        enabled: Whether to collect statistics.
+    """
+    _COLLECTOR.enabled = enabled
+
+
+def report_at_exit() -> None:
+    """Enable collection and print a summary to stderr when Python exits."""
+    global _REPORT_REGISTERED  # noqa: PLW0603
+    enable_stats()
+    if not _REPORT_REGISTERED:
+        import atexit  # noqa: PLC0415
+
+        atexit.register(print_stats)
+        _REPORT_REGISTERED = True
+
+
+def get_stats() -> FrontMatterStats:
+    """Return a snapshot of the statistics collected so far.
+
+    Returns:
+        Phase timings per format and cache hit/miss counters.
+    """
+    from ._formatters import cache_info  # noqa: PLC0415
+
+    with _COLLECTOR.lock:
+        phases: dict[str, dict[str, PhaseStats]] = {}
+        for (format_type, name), (calls, elapsed) in sorted(_COLLECTOR.timings.items()):
+            phases.setdefault(format_type, {})[name] = PhaseStats(calls, elapsed / 1e9)
+        counters = dict(_COLLECTOR.counters)
+    info = cache_info()
+    return FrontMatterStats(
+        phases=phases,
+        cache_hits=info.hits,
+        cache_misses=info.misses,
+        disk_cache_hits=counters.get("disk_cache_hits", 0),
+        disk_cache_misses=counters.get("disk_cache_misses", 0),
+    )
+
+
+def reset_stats() -> None:
+    """Clear the collected statistics, leaving collection on or off."""
+    from ._formatters import _FORMAT_CACHE  # noqa: PLC0415
+
+    with _COLLECTOR.lock:
+        _COLLECTOR.timings.clear()
+        _COLLECTOR.counters.clear()
+    _FORMAT_CACHE.hits = _FORMAT_CACHE.misses = 0
+
+
+def format_stats(stats: FrontMatterStats) -> str:
+    """Render statistics as a text table.
+
+    Args:
+        stats: Snapshot from `get_stats`.
+
+    Returns:
+        One line per format and phase, then the cache counters.
+    """
+    lines = [f"{'format':<8} {'phase':<10} {'calls':>8} {'total ms':>10}"]
+    lines.extend(
+        f"{format_type:<8} {name:<10} {entry.calls:>8} {entry.seconds * 1e3:>10.2f}"
+        for format_type, phases in stats.phases.items()
+        for name in PHASES
+        if (entry := phases.get(name)) is not None
+    )
+    lines.extend(
+        (
+            f"cache: {stats.cache_hits} hits, {stats.cache_misses} misses",
+            f"disk cache: {stats.disk_cache_hits} hits, "
+            f"{stats.disk_cache_misses} misses",
+        )
+    )
+    return "\n".join(lines)
+
+
+def print_stats(file: TextIO | None = None) -> None:
+    """Print the current statistics (to stderr by default)."""
+    print(format_stats(get_stats()), file=file or sys.stderr)
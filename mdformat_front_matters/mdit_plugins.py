@@ -9,29 +9,164 @@ Supports:
 from __future__ import annotations
 
 import re
-from typing import TYPE_CHECKING, Any
+import time
+from bisect import bisect_right
+from collections.abc import Callable, Iterable, Mapping
+from functools import cache, partial
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from ._data import ENV_KEY, FrontMatterData
+from ._formatters import (
+    format_json_block,
+    format_toml_block,
+    format_yaml_block,
+    load_json_block,
+    load_toml_block,
+    load_yaml_block,
+)
+from ._stats import collecting, record
 
 if TYPE_CHECKING:
     from markdown_it import MarkdownIt
     from markdown_it.rules_block import StateBlock
     from markdown_it.token import Token
 
+    from ._settings import FrontMatterSettings
+
 # Regex patterns for detecting front matter delimiters
 YAML_DELIMITER_PATTERN = re.compile(r"^-{3,}(\s*)$")
 TOML_DELIMITER_PATTERN = re.compile(r"^\+{3,}(\s*)$")
 JSON_OPENING_PATTERN = re.compile(r"^\s*\{\s*$")
+_JSON_OPENING_PATTERN = re.compile(r"^\{\s*$")
+"""JSON opening line as the registry matches it, after its indentation."""
+
+
+class FrontMatterFormat(NamedTuple):
+    """How a front matter format is detected, delimited and formatted.
+
+    Attributes:
+        name: Format name, stored in `token.meta["format"]`.
+        opening: First character of the opening line, after its indentation.
+            The block rule looks it up before matching anything else, so a
+            document starting with any other character costs one lookup.
+        pattern: Matches the whole opening line.
+        find_closing: Called with the parser state, the opening delimiter,
+            the opening line and the line at which to stop; returns the
+            closing line, or None if the block is not closed.
+        format: Formats the content of a block with the resolved settings.
+        delimited: True if the content sits between an opening and a closing
+            delimiter line, False if the whole block is the content (JSON).
+        load: Parses the content of a block into a mapping for
+            `token.meta["data"]`, raising on invalid content. Blocks of
+            formats without one get no data.
+    """
+
+    name: str
+    opening: str
+    pattern: re.Pattern[str]
+    find_closing: Callable[[StateBlock, str, int, int], int | None]
+    format: Callable[[str, FrontMatterSettings], str]
+    delimited: bool = True
+    load: Callable[[str, FrontMatterSettings], Any] | None = None
+
+
+FORMATS: dict[str, FrontMatterFormat] = {}
+"""Registered formats by name, in registration order."""
+_OPENERS: dict[str, FrontMatterFormat] = {}
+"""Registered formats by the first character of their opening line."""
+
+_ENV_KEY = "front_matters_scan"
+"""Key in `state.env` of the source last scanned and its scans, by position
+and search window."""
+
+_LINE_INDENT = re.compile(r"\n[ \t]+")
+_CHUNK_SIZE = 1 << 16
+
+_JSON_ESCAPE = r"\\(?:[^\n]|(?:\n[ \t]*)+[^\n \t])"
+_JSON_SKIP = re.compile(
+    rf'(?:[^{{}}"\\]+|"[^"\\]*(?:{_JSON_ESCAPE}[^"\\]*)*"|{_JSON_ESCAPE}){{0,256}}'
+)
+"""Text before the next brace that is not inside a string or escaped.
+
+The repetition is bounded because the regex engine keeps state for every
+repetition until the match completes.
+"""
+
+
+class _Scan(NamedTuple):
+    """Front matter found at the start of a document."""
+
+    format_type: str
+    markup: str
+    closing_line: int
+    """Line of the closing delimiter (or brace, for JSON)."""
+
 
+def register_format(front_matter_format: FrontMatterFormat) -> None:
+    """Add a front matter format, or replace the registered one of that name.
 
-def front_matters_plugin(md: MarkdownIt) -> None:
+    Parsers set up afterwards recognize the format unless it is left out of
+    their `formats`.
+
+    Args:
+        front_matter_format: The format to register.
+
+    Raises:
+        ValueError: If the opening is not one character, or if another format
+            opens with the same character.
+    """
+    opening = front_matter_format.opening
+    if len(opening) != 1:
+        msg = f"Opening must be a single character, not {opening!r}"
+        raise ValueError(msg)
+    other = _OPENERS.get(opening)
+    if other is not None and other.name != front_matter_format.name:
+        msg = f"Format {other.name!r} already opens with {opening!r}"
+        raise ValueError(msg)
+    if (previous := FORMATS.get(front_matter_format.name)) is not None:
+        del _OPENERS[previous.opening]
+    FORMATS[front_matter_format.name] = front_matter_format
+    _OPENERS[opening] = front_matter_format
+
+
+def _openers(formats: Iterable[str] | None) -> Mapping[str, FrontMatterFormat]:
+    """Return the enabled formats by opening character (all if None)."""
+    if formats is None:
+        return _OPENERS
+    enabled = set(formats)
+    return {char: fmt for char, fmt in _OPENERS.items() if fmt.name in enabled}
+
+
+def front_matters_plugin(
+    md: MarkdownIt,
+    *,
+    max_lines: int | None = None,
+    formats: Iterable[str] | None = None,
+    data_settings: FrontMatterSettings | None = None,
+) -> None:
     """Plugin to parse YAML, TOML, and JSON front matter blocks.
 
     Args:
         md: The markdown-it parser instance to modify.
+        max_lines: Only search this many lines, including the delimiters, for
+            the end of a block. Documents that open with a thematic break (or
+            a `{` line) and have no front matter then cost the same whatever
+            their length, but longer blocks are not recognized.
+        formats: Names of the formats to recognize (default: all registered
+            formats). The others are not even looked for.
+        data_settings: If set, attach a `FrontMatterData` to each block, as
+            `token.meta["data"]` and `env["front_matters"]`, that parses the
+            block with these settings on first access.
     """
     md.block.ruler.before(
         "fence",
         "front_matter",
-        _front_matter_rule,
+        partial(
+            _front_matter_rule,
+            openers=_openers(formats),
+            max_lines=max_lines,
+            data_settings=data_settings,
+        ),
         {"alt": ["paragraph", "reference", "blockquote", "list"]},
     )
     # Add renderer for HTML output (front matter should not appear in HTML)
@@ -62,11 +197,15 @@ def _render_front_matter_html(
     return ""
 
 
-def _front_matter_rule(  # noqa: C901, PLR0914
+def _front_matter_rule(
     state: StateBlock,
     start_line: int,
     end_line: int,
     silent: bool,
+    *,
+    openers: Mapping[str, FrontMatterFormat] | None = None,
+    max_lines: int | None = None,
+    data_settings: FrontMatterSettings | None = None,
 ) -> bool:
     """Block rule to detect and parse front matter blocks.
 
@@ -75,6 +214,10 @@ def _front_matter_rule(  # noqa: C901, PLR0914
         start_line: Starting line number.
         end_line: Ending line number.
         silent: If True, only check if the rule matches without creating tokens.
+        openers: Enabled formats by opening character (default: all).
+        max_lines: Maximum length of a block in lines, if limited.
+        data_settings: Settings to parse blocks with on first access of their
+            data, or None to attach no data.
 
     Returns:
         True if front matter was found and parsed, False otherwise.
@@ -82,247 +225,327 @@ def _front_matter_rule(  # noqa: C901, PLR0914
     # Front matter must be at the start of the document
     if start_line != 0:
         return False
+    pos = state.bMarks[0] + state.tShift[0]
+    front_matter_format = (_OPENERS if openers is None else openers).get(
+        state.src[pos : pos + 1]
+    )
+    if front_matter_format is None:
+        if collecting():
+            record("none", "detect", 0)
+        return False
+    if not collecting():
+        return _match_front_matter(
+            state,
+            front_matter_format,
+            end_line,
+            silent,
+            max_lines=max_lines,
+            data_settings=data_settings,
+        )
+    start = time.perf_counter_ns()
+    found = _match_front_matter(
+        state,
+        front_matter_format,
+        end_line,
+        silent,
+        max_lines=max_lines,
+        data_settings=data_settings,
+    )
+    format_type = front_matter_format.name if found else "none"
+    record(format_type, "detect", time.perf_counter_ns() - start)
+    return found
 
-    pos = state.bMarks[start_line] + state.tShift[start_line]
-    maximum = state.eMarks[start_line]
 
-    # Get the first line content
-    first_line = state.src[pos:maximum]
+def _match_front_matter(
+    state: StateBlock,
+    front_matter_format: FrontMatterFormat,
+    end_line: int,
+    silent: bool,
+    *,
+    max_lines: int | None = None,
+    data_settings: FrontMatterSettings | None = None,
+) -> bool:
+    """Detect and parse a front matter block at the start of the document.
 
-    # Detect format based on opening delimiter
-    yaml_match = YAML_DELIMITER_PATTERN.match(first_line)
-    toml_match = TOML_DELIMITER_PATTERN.match(first_line)
-    json_match = JSON_OPENING_PATTERN.match(first_line)
+    The result of the scan is cached in `state.env`, so the rule costs O(1)
+    when it runs again at the same position (e.g. in silent mode).
 
-    # Check for minimum length (only for YAML/TOML)
-    if not json_match and pos + 3 > maximum:
-        return False
+    Args:
+        state: The current parser state.
+        front_matter_format: Format that opens with the first character.
+        end_line: Ending line number.
+        silent: If True, only check if the rule matches without creating tokens.
+        max_lines: Maximum length of a block in lines, if limited.
+        data_settings: Settings to parse the block with on first access of
+            its data, or None to attach no data.
 
-    if yaml_match:
-        markup = first_line.rstrip()
-        format_type = "yaml"
-    elif toml_match:
-        markup = first_line.rstrip()
-        format_type = "toml"
-    elif json_match:
-        return _parse_json_front_matter(state, start_line, end_line, silent)
+    Returns:
+        True if front matter was found and parsed, False otherwise.
+    """
+    if max_lines is not None:
+        end_line = min(end_line, max_lines)
+    pos = state.bMarks[0] + state.tShift[0]
+    src, scans = state.env.get(_ENV_KEY, (None, None))
+    if scans is None or src != state.src:  # The env may be reused across parses
+        scans = {}
+        state.env[_ENV_KEY] = (state.src, scans)
+    key = (pos, end_line, state.parentType)
+    if key in scans:
+        scan = scans[key]
     else:
+        scan = scans[key] = _scan_front_matter(state, front_matter_format, end_line)
+    if scan is None:
         return False
 
-    # Find closing delimiter for YAML/TOML
-    auto_closed = False
-    next_line = start_line + 1
+    if not silent:
+        token = state.push("front_matter", "", 0)
+        if front_matter_format.delimited:
+            # Extract content between delimiters (preserve indentation)
+            token.content = _extract_lines(state, 1, scan.closing_line - 1)
+        else:
+            token.content = _extract_lines(
+                state, 0, scan.closing_line, strip_indent=True
+            )
+        token.markup = scan.markup
+        token.map = [0, scan.closing_line + 1]
+        token.meta = {"format": scan.format_type}
+        if data_settings is not None and front_matter_format.load is not None:
+            # Parsed lazily, so documents whose data nobody reads cost nothing
+            token.meta["data"] = state.env[ENV_KEY] = FrontMatterData(
+                scan.format_type, token.content, front_matter_format.load, data_settings
+            )
+
+    state.line = scan.closing_line + 1
+    return True
 
-    # Search for the closing marker
-    while next_line < end_line:
-        pos = state.bMarks[next_line] + state.tShift[next_line]
-        maximum = state.eMarks[next_line]
 
-        if pos < maximum and state.sCount[next_line] < state.blkIndent:
-            # non-empty line with negative indent should stop the block
-            break
+def _scan_front_matter(
+    state: StateBlock, front_matter_format: FrontMatterFormat, end_line: int
+) -> _Scan | None:
+    """Find the opening and closing lines of a front matter block.
 
-        line_content = state.src[pos:maximum]
-        closing_match = re.match(
-            rf"^{re.escape(markup[0])}{{{len(markup)},}}(\s*)$",
-            line_content,
-        )
+    Args:
+        state: The current parser state.
+        front_matter_format: Format that opens with the first character.
+        end_line: Line at which to stop searching.
 
-        if closing_match:
-            auto_closed = True
-            break
+    Returns:
+        The format, delimiter and closing line, or None if there is no block.
+    """
+    first_line = state.src[state.bMarks[0] + state.tShift[0] : state.eMarks[0]]
+    if not front_matter_format.pattern.match(first_line):
+        return None
+    markup = first_line.rstrip() if front_matter_format.delimited else ""
+    closing_line = front_matter_format.find_closing(state, markup, 0, end_line)
+    if closing_line is None:
+        return None
+    return _Scan(front_matter_format.name, markup, closing_line)
+
+
+@cache
+def _closing_delimiter_patterns(char: str) -> tuple[re.Pattern[str], re.Pattern[str]]:
+    """Patterns of a closing delimiter line, alone and within the document.
+
+    Closing delimiters must be at least as long as the opening one, which is
+    checked separately.
+    """
+    char = re.escape(char)
+    return (
+        re.compile(rf"({char}{{3,}})\s*"),
+        re.compile(rf"^[ \t]*({char}{{3,}})[^\S\n]*$", re.MULTILINE),
+    )
 
-        next_line += 1
 
-    if not auto_closed:
-        return False
+def find_closing_delimiter(
+    state: StateBlock,
+    markup: str,
+    start_line: int,
+    end_line: int,
+) -> int | None:
+    """Find the line that closes a block delimited by `markup` lines.
 
-    old_line_max = state.lineMax
-    old_parent = state.parentType
-    state.parentType = "front_matter"
+    Without the shortest possible closing delimiter anywhere in the search
+    window, there is nothing to scan. At the document root, line marks index
+    `state.src` directly, so the closing delimiter is found with one
+    multiline search and mapped back to a line number. Nested containers
+    shift the line marks past their own markers, so there each line is
+    checked in turn, stopping at the first non-empty line indented less than
+    the block.
 
-    # Extract content between delimiters (preserve indentation)
-    content_lines = []
-    for line_num in range(start_line + 1, next_line):
-        pos = state.bMarks[line_num]
-        maximum = state.eMarks[line_num]
-        content_lines.append(state.src[pos:maximum])
+    Args:
+        state: The current parser state.
+        markup: Opening delimiter.
+        start_line: Line of the opening delimiter.
+        end_line: Ending line number.
 
-    content = "\n".join(content_lines)
+    Returns:
+        Line number of the closing delimiter, or None if the block is not closed.
+    """
+    end = state.eMarks[end_line - 1]
+    if (
+        start_line + 1 >= end_line
+        or state.src.find(markup, state.eMarks[start_line], end) == -1
+    ):
+        return None
+    line_pattern, search_pattern = _closing_delimiter_patterns(markup[0])
+    if state.parentType == "root":
+        for match in search_pattern.finditer(
+            state.src, state.bMarks[start_line + 1], end
+        ):
+            if len(match[1]) >= len(markup):
+                return (
+                    bisect_right(state.bMarks, match.start(), start_line, end_line) - 1
+                )
+        return None
 
-    if not silent:
-        token = state.push("front_matter", "", 0)
-        token.content = content
-        token.markup = markup
-        token.map = [start_line, next_line + 1]
-        token.meta = {"format": format_type}
+    for next_line in range(start_line + 1, end_line):
+        pos = state.bMarks[next_line] + state.tShift[next_line]
+        maximum = state.eMarks[next_line]
 
-    state.parentType = old_parent
-    state.lineMax = old_line_max
-    state.line = next_line + 1
+        if pos < maximum and state.sCount[next_line] < state.blkIndent:
+            # non-empty line with negative indent should stop the block
+            return None
 
-    return True
+        line_match = line_pattern.fullmatch(state.src, pos, maximum)
+        if line_match and len(line_match[1]) >= len(markup):
+            return next_line
+    return None
 
 
-def _parse_json_front_matter(
+def _find_json_closing_line(
     state: StateBlock,
+    _markup: str,
     start_line: int,
     end_line: int,
-    silent: bool,
-) -> bool:
-    """Parse JSON front matter block.
+) -> int | None:
+    """Find the line with the brace that closes a JSON block.
 
     Args:
         state: The current parser state.
-        start_line: Starting line number.
+        _markup: Opening delimiter (always empty for JSON).
+        start_line: Line of the opening brace.
         end_line: Ending line number.
-        silent: If True, only check if the rule matches without creating tokens.
 
     Returns:
-        True if JSON front matter was found and parsed, False otherwise.
+        Line number of the closing brace, or None if the object is not closed.
     """
-    # Find the closing brace
+    end = state.eMarks[end_line - 1]
+    if state.src.find("}", state.eMarks[start_line], end) == -1:
+        return None
     pos = state.bMarks[start_line] + state.tShift[start_line]
-    content_lines = []
-    brace_count = 0
-    next_line = start_line
-    in_string = False
-    escape_next = False
-
-    # Collect lines until we find the closing brace
-    while next_line < end_line:
-        pos = state.bMarks[next_line] + state.tShift[next_line]
-        maximum = state.eMarks[next_line]
-        line_content = state.src[pos:maximum]
-
-        content_lines.append(line_content)
-
-        # Count braces to find the closing one, respecting string context
-        if _found_closing_brace(line_content, brace_count, in_string, escape_next):
-            if not silent:
-                _create_front_matter_token(
-                    state,
-                    content_lines,
-                    start_line,
-                    next_line,
-                )
-
-            state.line = next_line + 1
-            return True
-
-        # Update state after processing the line
-        brace_count, in_string, escape_next = _update_json_parse_state(
-            line_content,
-            brace_count,
-            in_string,
-            escape_next,
-        )
+    closing = _find_json_closing_brace(state.src, pos, end)
+    if closing == -1:
+        return None
+    return bisect_right(state.bMarks, closing, start_line, end_line) - 1
 
-        next_line += 1
 
-    # No closing brace found
-    return False
+def _extract_lines(
+    state: StateBlock,
+    first_line: int,
+    last_line: int,
+    *,
+    strip_indent: bool = False,
+) -> str:
+    """Join a range of lines without copying each line separately.
 
-
-def _found_closing_brace(
-    line_content: str,
-    brace_count: int,
-    in_string: bool,
-    escape_next: bool,
-) -> bool:
-    """Check if the closing brace was found in the line.
+    At the document root the lines are contiguous in `state.src`, so the
+    block is a single slice. Indentation is stripped chunk by chunk so that
+    the regex substitution never holds a piece for every line of a large
+    block at once. Inside containers the line marks skip the container
+    markers, so the lines are joined.
 
     Args:
-        line_content: The line content to check.
-        brace_count: Current brace count.
-        in_string: Whether we're currently inside a string.
-        escape_next: Whether the next character should be escaped.
+        state: The current parser state.
+        first_line: First line to include.
+        last_line: Last line to include.
+        strip_indent: If True, drop the leading spaces and tabs of each line.
 
     Returns:
-        True if closing brace was found, False otherwise.
+        Lines joined with newlines.
     """
-    temp_count = brace_count
-    temp_in_string = in_string
-    temp_escape = escape_next
-
-    for char in line_content:
-        if temp_escape:
-            temp_escape = False
-            continue
-        if char == "\\":
-            temp_escape = True
-            continue
-        if char == '"':
-            temp_in_string = not temp_in_string
-            continue
-        if temp_in_string:
-            continue
-
-        if char == "{":
-            temp_count += 1
-        elif char == "}":
-            temp_count -= 1
-            if temp_count == 0:
-                return True
-
-    return False
-
-
-def _update_json_parse_state(
-    line_content: str,
-    brace_count: int,
-    in_string: bool,
-    escape_next: bool,
-) -> tuple[int, bool, bool]:
-    """Update the JSON parsing state after processing a line.
+    if first_line > last_line:
+        return ""
+    if state.parentType == "root":
+        start = state.bMarks[first_line]
+        end = state.eMarks[last_line]
+        if not strip_indent:
+            return state.src[start:end]
+        chunks = []
+        start += state.tShift[first_line]
+        while start < end:
+            # Cut before a newline so that no indent is split between chunks
+            cut = state.src.find("\n", min(start + _CHUNK_SIZE, end), end)
+            cut = end if cut == -1 else cut
+            chunks.append(_LINE_INDENT.sub("\n", state.src[start:cut]))
+            start = cut
+        return "".join(chunks)
+    lines = []
+    for line in range(first_line, last_line + 1):
+        start = state.bMarks[line] + (state.tShift[line] if strip_indent else 0)
+        lines.append(state.src[start : state.eMarks[line]])
+    return "\n".join(lines)
+
+
+def _find_json_closing_brace(src: str, pos: int, end: int) -> int:
+    """Find the brace that closes the JSON object opened at `pos`.
+
+    Strings, escapes and runs of other characters are skipped by a single
+    compiled regex, so the Python loop only runs once per brace. Braces inside
+    strings are ignored and a backslash escapes the next character; after a
+    line break, the escaped character is the first one past the indentation,
+    matching a scan of the stripped lines.
 
     Args:
-        line_content: The line content to process.
-        brace_count: Current brace count.
-        in_string: Whether we're currently inside a string.
-        escape_next: Whether the next character should be escaped.
+        src: Text to scan.
+        pos: Index of the opening brace (or of whitespace before it).
+        end: Index at which to stop scanning.
 
     Returns:
-        Tuple of (updated_brace_count, updated_in_string, updated_escape_next).
+        Index of the closing brace, or -1 if the object is not closed.
     """
-    for char in line_content:
-        if escape_next:
-            escape_next = False
-            continue
-        if char == "\\":
-            escape_next = True
-            continue
-        if char == '"':
-            in_string = not in_string
-            continue
-        if in_string:
-            continue
-
+    depth = 0
+    while (skipped := _JSON_SKIP.match(src, pos, end).end()) < end:  # type: ignore[union-attr]
+        char = src[skipped]
         if char == "{":
-            brace_count += 1
+            depth += 1
         elif char == "}":
-            brace_count -= 1
-
-    return brace_count, in_string, escape_next
-
-
-def _create_front_matter_token(
-    state: StateBlock,
-    content_lines: list[str],
-    start_line: int,
-    next_line: int,
-) -> None:
-    """Create a front matter token for JSON format.
-
-    Args:
-        state: The current parser state.
-        content_lines: Lines of content to include in the token.
-        start_line: Starting line number.
-        next_line: Current line number.
-    """
-    content = "\n".join(content_lines)
-    token = state.push("front_matter", "", 0)
-    token.content = content
-    token.markup = ""
-    token.map = [start_line, next_line + 1]
-    token.meta = {"format": "json"}
+            depth -= 1
+            if depth == 0:
+                return skipped
+        elif skipped == pos:
+            break  # Unterminated string or trailing escape
+        else:
+            pos = skipped  # Stopped at the repetition bound
+            continue
+        pos = skipped + 1
+    return -1
+
+
+for _format in (
+    FrontMatterFormat(
+        "yaml",
+        "-",
+        YAML_DELIMITER_PATTERN,
+        find_closing_delimiter,
+        format_yaml_block,
+        load=load_yaml_block,
+    ),
+    FrontMatterFormat(
+        "toml",
+        "+",
+        TOML_DELIMITER_PATTERN,
+        find_closing_delimiter,
+        format_toml_block,
+        load=load_toml_block,
+    ),
+    FrontMatterFormat(
+        "json",
+        "{",
+        _JSON_OPENING_PATTERN,
+        _find_json_closing_line,
+        format_json_block,
+        delimited=False,
+        load=load_json_block,
+    ),
+):
+    register_format(_format)
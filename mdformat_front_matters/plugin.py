@@ -9,9 +9,17 @@ from markdown_it import MarkdownIt
 from mdformat.renderer import RenderContext, RenderTreeNode
 from mdformat.renderer.typing import Postprocess, Render
 
-from ._formatters import format_json, format_toml, format_yaml
-from ._helpers import get_conf
-from .mdit_plugins import front_matters_plugin
+from ._data import front_matter_data
+from ._formatters import (
+    _FORMAT_CACHE,
+    DEFAULT_CACHE_SIZE,
+    DEFAULT_YAML_BUDGET,
+    _limit_fallback_count,
+    _reuse_data,
+)
+from ._settings import FrontMatterSettings, resolve_settings
+from ._stats import count, phase, report_at_exit
+from .mdit_plugins import FORMATS, front_matters_plugin
 
 
 def add_cli_argument_group(group: argparse._ArgumentGroup) -> None:
@@ -46,11 +54,116 @@ def add_cli_argument_group(group: argparse._ArgumentGroup) -> None:
             "Overrides --wrap. (Currently limited to YAML.)"
         ),
     )
+    group.add_argument(
+        "--front-matter-cache-size",
+        action="store",
+        type=int,
+        metavar="N",
+        help=(
+            "Keep up to N formatted front matter blocks in memory so repeated "
+            "blocks are only formatted once. Set to 0 to disable. "
+            f"(Default: {DEFAULT_CACHE_SIZE})"
+        ),
+    )
+    group.add_argument(
+        "--front-matter-cache-dir",
+        action="store",
+        metavar="DIR",
+        help=(
+            "Persist formatted front matter in DIR so that unchanged blocks are "
+            "not reformatted by later mdformat runs. Disabled by default."
+        ),
+    )
+    group.add_argument(
+        "--front-matter-stats",
+        action="store_true",
+        help=(
+            "Print the time spent in each front matter formatting phase, "
+            "fallback counts and cache hits to stderr at exit."
+        ),
+    )
+    group.add_argument(
+        "--front-matter-formats",
+        action="store",
+        metavar="NAMES",
+        help=(
+            "Only recognize front matter in these comma-separated formats, "
+            "e.g. 'yaml,toml' to leave '{' lines to Markdown. "
+            f"(Default: {','.join(FORMATS)})"
+        ),
+    )
+    group.add_argument(
+        "--front-matter-max-lines",
+        action="store",
+        type=int,
+        metavar="N",
+        help=(
+            "Only recognize front matter that closes within N lines, so that "
+            "documents opening with a thematic break are not searched to the "
+            "end. (Default: no limit)"
+        ),
+    )
+    group.add_argument(
+        "--front-matter-data",
+        action="store_true",
+        help=(
+            "Parse each front matter block at most once and share the data "
+            "with other plugins as token.meta['data'] and env['front_matters']."
+        ),
+    )
+    group.add_argument(
+        "--front-matter-max-bytes",
+        action="store",
+        type=int,
+        metavar="N",
+        help=(
+            "Leave front matter larger than N bytes unformatted without "
+            "parsing it (an error with --strict-front-matter)."
+        ),
+    )
+    group.add_argument(
+        "--front-matter-timeout",
+        action="store",
+        type=float,
+        metavar="SECONDS",
+        help=(
+            "Stop formatting a front matter block after SECONDS and keep it "
+            "unchanged (an error with --strict-front-matter)."
+        ),
+    )
+    for flag, metavar, limit, description in (
+        ("nodes", "N", DEFAULT_YAML_BUDGET.max_nodes, "nodes, counting aliases"),
+        ("aliases", "N", DEFAULT_YAML_BUDGET.max_aliases, "alias dereferences"),
+        ("depth", "N", DEFAULT_YAML_BUDGET.max_depth, "levels of nesting"),
+        ("output", "CHARS", DEFAULT_YAML_BUDGET.max_output_chars, "output"),
+    ):
+        group.add_argument(
+            f"--front-matter-max-{flag}",
+            action="store",
+            type=int,
+            metavar=metavar,
+            help=(
+                f"Leave YAML front matter with more than {metavar} {description} "
+                f"unformatted (an error with --strict-front-matter). "
+                f"(Default: {limit})"
+            ),
+        )
 
 
 def update_mdit(mdit: MarkdownIt) -> None:
     """Update the parser to recognize front matter blocks."""
-    mdit.use(front_matters_plugin)
+    if "mdformat" not in mdit.options:
+        mdit.use(front_matters_plugin)
+        return
+    settings = resolve_settings(mdit.options)
+    mdit.use(
+        front_matters_plugin,
+        max_lines=settings.max_lines,
+        formats=settings.formats,
+        data_settings=settings if settings.data else None,
+    )
+    if settings.stats:
+        report_at_exit()
 
 
 def _render_front_matter(node: RenderTreeNode, context: RenderContext) -> str:
@@ -66,48 +179,92 @@ def _render_front_matter(node: RenderTreeNode, context: RenderContext) -> str:
     """
     # Get the format type from node metadata
     format_type = node.meta.get("format", "yaml") if node.meta else "yaml"
-    content = node.content
-    markup = node.markup
-
-    # Check if strict mode is enabled
-    # Note: argparse converts hyphens to underscores, so --strict-front-matter
-    # is stored as "strict_front_matter" in the options dict
-    strict = bool(get_conf(context.options, "strict_front_matter"))
-    # Check if sorting is enabled
-    # Note: argparse converts hyphens to underscores, so --sort-front-matter
-    # is stored as "sort_front_matter" in the options dict
-    sort_keys = bool(get_conf(context.options, "sort_front_matter"))
-    # Pass on linewrap instructions
-    wrap = get_conf(context.options, "wrap_front_matter")
-    if not isinstance(wrap, int):
-        wrap = get_conf(context.options, "wrap")
-        if isinstance(wrap, str):
-            wrap = None
-
-    # Format the content based on type
-    if format_type == "yaml":
-        formatted_content = format_yaml(
-            content, strict=strict, sort_keys=sort_keys, wrap=wrap
+    # Formatting reuses the shared data instead of parsing the block again
+    with phase(format_type, "render"), _reuse_data(front_matter_data(node)):
+        return _render_block(
+            format_type, node.content, node.markup, resolve_settings(context.options)
         )
-    elif format_type == "toml":
-        formatted_content = format_toml(content, strict=strict, sort_keys=sort_keys)
-    elif format_type == "json":
-        formatted_content = format_json(content, strict=strict, sort_keys=sort_keys)
+
+
+def _render_block(
+    format_type: str, content: str, markup: str, settings: FrontMatterSettings
+) -> str:
+    """Render front matter content with the configured caches.
+
+    Args:
+        format_type: Front matter format ("yaml", "toml", "json").
+        content: Raw front matter content (without delimiters).
+        markup: Opening and closing delimiter for YAML and TOML.
+        settings: Resolved plugin options.
+
+    Returns:
+        Formatted front matter block with appropriate delimiters.
+
+    """
+    # Resize the shared cache of formatted blocks
+    _FORMAT_CACHE.resize(settings.cache_size)
+
+    # Reuse output persisted by earlier runs, if enabled
+    if settings.cache_dir is None:
+        return _format_front_matter(format_type, content, markup, settings)
+    from ._disk_cache import get_disk_cache  # noqa: PLC0415
+
+    disk_cache = get_disk_cache(settings.cache_dir)
+    key = disk_cache.make_key(
+        format_type,
+        content,
+        markup,
+        settings.strict,
+        settings.sort_keys,
+        settings.wrap,
+        *settings.yaml_budget,
+        *settings.limits,
+    )
+    if (rendered := disk_cache.get(key)) is None:
+        count("disk_cache_misses")
+        limit_fallbacks = _limit_fallback_count()
+        rendered = _format_front_matter(format_type, content, markup, settings)
+        if _limit_fallback_count() == limit_fallbacks:  # Limits may pass next run
+            disk_cache.set(key, rendered)
     else:
+        count("disk_cache_hits")
+    return rendered
+
+
+def _format_front_matter(
+    format_type: str, content: str, markup: str, settings: FrontMatterSettings
+) -> str:
+    """Format front matter content and wrap it in its delimiters.
+
+    Args:
+        format_type: Front matter format ("yaml", "toml", "json").
+        content: Raw front matter content (without delimiters).
+        markup: Opening and closing delimiter for YAML and TOML.
+        settings: Resolved plugin options (strict mode, sorting and wrapping).
+
+    Returns:
+        Formatted front matter block with appropriate delimiters.
+
+    """
+    front_matter_format = FORMATS.get(format_type)
+    if front_matter_format is None:
         # Unknown format, return as-is
         formatted_content = content
+    else:
+        formatted_content = front_matter_format.format(content, settings)
+
+    with phase(format_type, "normalize"):
+        # Ensure content ends with newline
+        if formatted_content and not formatted_content.endswith("\n"):
+            formatted_content += "\n"
 
-    # Ensure content ends with newline
-    if formatted_content and not formatted_content.endswith("\n"):
-        formatted_content += "\n"
-
-    # Build the output based on format
-    if format_type == "json":
-        # JSON front matter has no delimiters
-        # Return with single newline; mdformat will add separator
-        return formatted_content.rstrip("\n")
-    # YAML and TOML have delimiters
-    return f"{markup}\n{formatted_content}{markup}"
+        # Build the output based on format
+        if front_matter_format is not None and not front_matter_format.delimited:
+            # JSON front matter has no delimiters
+            # Return with single newline; mdformat will add separator
+            return formatted_content.rstrip("\n")
+        # YAML and TOML have delimiters
+        return f"{markup}\n{formatted_content}{markup}"
 
 
 # A mapping from syntax tree node type to a function that renders it.
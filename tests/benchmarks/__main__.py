@@ -0,0 +1,100 @@
+"""Benchmark the formatters: `python -m tests.benchmarks {run,compare,load,tree}`."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import tempfile
+from collections.abc import Sequence
+from pathlib import Path
+
+from mdformat_front_matters import AsyncFormatter
+
+from .load import format_load, run_load
+from .runner import (
+    BASELINE_PATH,
+    DEFAULT_REPEAT,
+    DEFAULT_TOLERANCE,
+    compare,
+    dump_results,
+    format_table,
+    read_results,
+    run_benchmarks,
+)
+from .tree import format_tree, run_tree, write_tree
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Run the benchmarks or compare results against the baseline.
+
+    Args:
+        argv: Command line arguments (default: `sys.argv[1:]`).
+
+    Returns:
+        Exit code: 1 if `compare` found a regression.
+    """
+    parser = argparse.ArgumentParser(prog="python -m tests.benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run the benchmarks and write results")
+    run.add_argument("--output", type=Path, help="results file (default: stdout)")
+    run.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    run.add_argument("-k", "--select", default="", help="substring of case names")
+    run.add_argument("--seed", type=int, default=0)
+
+    check = commands.add_parser("compare", help="flag regressions in results")
+    check.add_argument("results", type=Path, help="results from 'run'")
+    check.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    check.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+
+    load = commands.add_parser("load", help="measure latency of the asyncio API")
+    load.add_argument("--clients", type=int, default=16)
+    load.add_argument("--requests", type=int, default=400)
+    load.add_argument("--workers", type=int, help="executor workers")
+    load.add_argument("--processes", action="store_true", help="use processes")
+    load.add_argument("--max-in-flight", type=int)
+
+    tree = commands.add_parser("tree", help="time the front matter check mode")
+    tree.add_argument("--files", type=int, default=500)
+    tree.add_argument("--workers", type=int, help="worker processes")
+
+    args = parser.parse_args(argv)
+    if args.command == "tree":
+        with tempfile.TemporaryDirectory() as directory:
+            root = Path(directory)
+            write_tree(root, args.files)
+            timings = run_tree(root, workers=args.workers)
+        print(f"{timings.files} files")  # noqa: T201
+        print(format_tree(timings))  # noqa: T201
+        return 0
+    if args.command == "load":
+        formatter = AsyncFormatter(
+            workers=args.workers,
+            processes=args.processes,
+            max_in_flight=args.max_in_flight,
+        )
+        with formatter.executor:
+            for label in ("cold", "warm"):
+                result = asyncio.run(
+                    run_load(formatter, clients=args.clients, requests=args.requests)
+                )
+                print(f"{label}: {format_load(result)}")  # noqa: T201
+        return 0
+    if args.command == "run":
+        results = run_benchmarks(repeat=args.repeat, select=args.select, seed=args.seed)
+        if args.output is None:
+            sys.stdout.write(dump_results(results))
+        else:
+            args.output.write_text(dump_results(results), encoding="utf-8")
+        return 0
+
+    comparisons = compare(
+        read_results(args.baseline), read_results(args.results), args.tolerance
+    )
+    print(format_table(comparisons))  # noqa: T201
+    return int(any(item.regression for item in comparisons))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
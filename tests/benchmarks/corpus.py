@@ -0,0 +1,275 @@
+"""Deterministic synthetic front matter resembling Hugo and Jekyll pages."""
+
+from __future__ import annotations
+
+import json
+import random
+from typing import Any, NamedTuple
+
+FORMATS = ("yaml", "toml", "json")
+SHAPES = ("flat", "nested", "wide-arrays", "comments")
+SIZES = {"small": 1, "large": 25}
+"""Multiplier applied to the number of keys, items and sections per block."""
+DOCUMENTS = {"small": 10, "large": 2}
+"""Number of blocks formatted in one run of a case."""
+DETECT_LINES = {"small": 200, "large": 20_000}
+"""Number of lines of the documents searched for front matter."""
+DETECT_MAX_LINES = 100
+EMPTY_DOCUMENT = "# Just a heading\n\nNo front matter here.\n"
+"""Document of `test_empty_document_performance`, which has no front matter."""
+EMPTY_ITERATIONS = 1000
+ENGINE_BLOCKS = 20
+"""Number of blocks formatted in one run of the `engine/` cases."""
+
+_MARKUP = {"yaml": "---", "toml": "+++", "json": ""}
+_WORDS = (
+    "alpha",
+    "bravo",
+    "charlie",
+    "delta",
+    "echo",
+    "foxtrot",
+    "golf",
+    "hotel",
+    "india",
+    "juliet",
+    "kilo",
+    "lima",
+    "mike",
+    "november",
+    "oscar",
+    "papa",
+    "quebec",
+    "romeo",
+    "sierra",
+    "tango",
+    "uniform",
+    "victor",
+)
+
+
+class Case(NamedTuple):
+    """A named set of front matter blocks formatted together."""
+
+    name: str
+    format: str
+    markup: str
+    blocks: list[str]
+    sort_keys: bool
+
+
+class DetectCase(NamedTuple):
+    """A document without front matter that the block rule has to reject."""
+
+    name: str
+    text: str
+    max_lines: int | None
+
+
+def _words(rng: random.Random, count: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(count)).capitalize()
+
+
+def _date(rng: random.Random) -> str:
+    return f"20{rng.randint(10, 25)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+
+
+def _page(rng: random.Random, shape: str, scale: int) -> dict[str, Any]:
+    """Build the data of one page, with keys in an arbitrary order."""
+    page: dict[str, Any] = {
+        "title": _words(rng, 4),
+        "date": _date(rng),
+        "draft": rng.random() < 0.2,  # noqa: PLR2004
+        "description": _words(rng, 12),
+        "slug": "-".join(rng.choice(_WORDS) for _ in range(3)),
+        "weight": rng.randint(1, 100),
+        "author": _words(rng, 2),
+        "tags": [rng.choice(_WORDS) for _ in range(3)],
+    }
+    for index in range(8 * scale - 8):
+        page[f"param_{index:03d}"] = _words(rng, 3)
+    if shape == "nested":
+        for index in range(2 * scale):
+            page[f"section_{index:02d}"] = {
+                "menu": {"parent": rng.choice(_WORDS), "weight": rng.randint(1, 9)},
+                "seo": {
+                    "canonical": f"https://example.com/{rng.choice(_WORDS)}/",
+                    "robots": {"index": True, "follow": rng.random() < 0.5},  # noqa: PLR2004
+                },
+                "summary": _words(rng, 6),
+            }
+    elif shape == "wide-arrays":
+        page["tags"] = [rng.choice(_WORDS) for _ in range(20 * scale)]
+        page["categories"] = [_words(rng, 2) for _ in range(10 * scale)]
+        page["aliases"] = [f"/old/{index}/" for index in range(10 * scale)]
+    items = list(page.items())
+    rng.shuffle(items)
+    return dict(items)
+
+
+def _yaml_scalar(value: object) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def _yaml_lines(
+    data: dict[str, Any], rng: random.Random, indent: str, *, comments: bool
+) -> list[str]:
+    """Write YAML with uneven spacing so that blocks need formatting."""
+    lines = []
+    for key, value in data.items():
+        if comments and rng.random() < 0.3:  # noqa: PLR2004
+            lines.append(f"{indent}# {_words(rng, 3)}")
+        if isinstance(value, dict):
+            lines.append(f"{indent}{key}:")
+            lines.extend(_yaml_lines(value, rng, indent + "  ", comments=comments))
+        elif isinstance(value, list) and len(value) > 5:  # noqa: PLR2004
+            lines.append(f"{indent}{key}:")
+            lines.extend(f"{indent}  -   {_yaml_scalar(item)}" for item in value)
+        elif isinstance(value, list):
+            lines.append(f"{indent}{key}: [{', '.join(map(_yaml_scalar, value))}]")
+        else:
+            trailing = f"  # {rng.choice(_WORDS)}" if comments else ""
+            lines.append(f"{indent}{key}:   {_yaml_scalar(value)}{trailing}")
+    return lines
+
+
+def _toml_value(value: object) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, list):
+        return "[ " + ",".join(map(_toml_value, value)) + ", ]"
+    return json.dumps(value)
+
+
+def _toml_lines(
+    data: dict[str, Any], rng: random.Random, prefix: str, *, comments: bool
+) -> list[str]:
+    """Write TOML with uneven spacing, tables after the plain keys."""
+    lines = []
+    tables = {key: value for key, value in data.items() if isinstance(value, dict)}
+    for key, value in data.items():
+        if key in tables:
+            continue
+        if comments and rng.random() < 0.3:  # noqa: PLR2004
+            lines.append(f"# {_words(rng, 3)}")
+        lines.append(f"{key}  =  {_toml_value(value)}")
+    for key, value in tables.items():
+        name = f"{prefix}{key}"
+        lines.extend(["", f"[{name}]"])
+        lines.extend(_toml_lines(value, rng, f"{name}.", comments=comments))
+    return lines
+
+
+def _block(
+    format_type: str, data: dict[str, Any], rng: random.Random, shape: str
+) -> str:
+    comments = shape == "comments"
+    if format_type == "yaml":
+        return "\n".join(_yaml_lines(data, rng, "", comments=comments))
+    if format_type == "toml":
+        return "\n".join(_toml_lines(data, rng, "", comments=comments))
+    return json.dumps(data, indent=2)
+
+
+def generate_corpus(seed: int = 0) -> list[Case]:
+    """Generate every benchmark case.
+
+    Cases cover each format, shape and size class, formatted both with and
+    without sorting. JSON has no comment syntax, so it has no comments shape.
+    The same seed always produces the same blocks.
+
+    Args:
+        seed: Seed for the random generator.
+
+    Returns:
+        Cases named `<format>/<shape>/<size>/<sorted|unsorted>`.
+    """
+    cases = []
+    for format_type in FORMATS:
+        for shape in SHAPES:
+            if format_type == "json" and shape == "comments":
+                continue
+            for size, scale in SIZES.items():
+                rng = random.Random(f"{seed}/{format_type}/{shape}/{size}")  # noqa: S311
+                blocks = [
+                    _block(format_type, _page(rng, shape, scale), rng, shape)
+                    for _ in range(DOCUMENTS[size])
+                ]
+                for sort_keys in (False, True):
+                    order = "sorted" if sort_keys else "unsorted"
+                    cases.append(
+                        Case(
+                            name=f"{format_type}/{shape}/{size}/{order}",
+                            format=format_type,
+                            markup=_MARKUP[format_type],
+                            blocks=blocks,
+                            sort_keys=sort_keys,
+                        )
+                    )
+    return cases
+
+
+def _prose(rng: random.Random, lines: int) -> list[str]:
+    """Paragraphs of Markdown, with blank lines between them."""
+    return [_words(rng, 8) if index % 4 else "" for index in range(lines)]
+
+
+def generate_detect_corpus(seed: int = 0) -> list[DetectCase]:
+    """Generate documents that open like front matter but have none.
+
+    Shapes: a thematic break with no later delimiter line (`open-break`), a
+    thematic break with another one at the end (`closed-break`, which is
+    front matter unless the search is limited), and a `{` line from a
+    template with a brace at the end (`template-brace`). Each is searched
+    without a limit and with `DETECT_MAX_LINES`.
+
+    Args:
+        seed: Seed for the random generator.
+
+    Returns:
+        Cases named `detect/<shape>/<size>/<unlimited|max-lines>`.
+    """
+    cases: list[DetectCase] = []
+    for size, lines in DETECT_LINES.items():
+        rng = random.Random(f"{seed}/detect/{size}")  # noqa: S311
+        prose = _prose(rng, lines)
+        documents = {
+            "open-break": ["---", *prose],
+            "closed-break": ["---", *prose, "---", ""],
+            "template-brace": ["{", *prose, "}", ""],
+        }
+        cases.extend(
+            DetectCase(
+                name=f"detect/{shape}/{size}/{'max-lines' if limit else 'unlimited'}",
+                text="\n".join(document),
+                max_lines=limit,
+            )
+            for shape, document in documents.items()
+            for limit in (None, DETECT_MAX_LINES)
+        )
+    return cases
+
+
+def generate_engine_blocks() -> list[str]:
+    """Generate plain YAML blocks that the libyaml loader can format.
+
+    Every value is an unquoted string, so round-trip mode would preserve
+    nothing that the C loader drops.
+
+    Returns:
+        Blocks of 30 keys in reverse order and a short list of tags.
+    """
+    return [
+        "\n".join(
+            [
+                *(f"key_{k:02d}: Plain value {i} {k}" for k in range(30, 0, -1)),
+                "tags:",
+                *(f"  - tag {k}" for k in range(5)),
+            ]
+        )
+        for i in range(ENGINE_BLOCKS)
+    ]
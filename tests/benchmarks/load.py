@@ -0,0 +1,107 @@
+"""Drive the asyncio API with concurrent clients and report latency."""
+
+from __future__ import annotations
+
+import asyncio
+import statistics
+import time
+from typing import TYPE_CHECKING, NamedTuple
+
+from .corpus import generate_corpus
+
+if TYPE_CHECKING:
+    from mdformat_front_matters import AsyncFormatter
+
+LAG_INTERVAL = 0.005
+"""Seconds between the event loop responsiveness probes."""
+
+
+class LoadResult(NamedTuple):
+    """Latencies of the requests of one load run, in milliseconds."""
+
+    requests: int
+    p50_ms: float
+    p99_ms: float
+    max_loop_lag_ms: float
+    """Largest delay of a probe scheduled on the event loop (blocking shows here)."""
+    seconds: float
+
+
+def load_documents(seed: int = 0) -> list[str]:
+    """Build small Markdown pages from the benchmark corpus."""
+    return [
+        f"{case.markup}\n{block}\n{case.markup}\n# Page\n\nSome  *text*.\n"
+        for case in generate_corpus(seed)
+        if "/small/" in case.name and case.sort_keys
+        for block in case.blocks
+    ]
+
+
+async def _probe_lag(stop: asyncio.Event) -> float:
+    """Measure how late sleeps on the event loop wake up until stopped."""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(LAG_INTERVAL)
+        worst = max(worst, time.perf_counter() - start - LAG_INTERVAL)
+    return worst
+
+
+async def _client(
+    formatter: AsyncFormatter, documents: list[str], latencies: list[float]
+) -> None:
+    for text in documents:
+        start = time.perf_counter()
+        await formatter.format_text(text)
+        latencies.append(time.perf_counter() - start)
+
+
+async def run_load(
+    formatter: AsyncFormatter, *, clients: int = 16, requests: int = 400, seed: int = 0
+) -> LoadResult:
+    """Send requests from concurrent clients and measure their latencies.
+
+    Each client sends its share of the requests one after another, so up to
+    `clients` requests wait on the formatter at once.
+
+    Args:
+        formatter: Formatter under test, already warmed up or not.
+        clients: Number of concurrent clients.
+        requests: Total number of requests.
+        seed: Seed for the corpus generator.
+
+    Returns:
+        Latency percentiles and the worst event loop delay.
+    """
+    documents = load_documents(seed)
+    schedule = [documents[index % len(documents)] for index in range(requests)]
+    latencies: list[float] = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_probe_lag(stop))
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            _client(formatter, schedule[index::clients], latencies)
+            for index in range(clients)
+        )
+    )
+    elapsed = time.perf_counter() - start
+    stop.set()
+    lag = await probe
+    percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return LoadResult(
+        requests=len(latencies),
+        p50_ms=percentiles[49] * 1e3,
+        p99_ms=percentiles[98] * 1e3,
+        max_loop_lag_ms=lag * 1e3,
+        seconds=elapsed,
+    )
+
+
+def format_load(result: LoadResult) -> str:
+    """Render a load result as one line."""
+    return (
+        f"{result.requests} requests in {result.seconds:.2f}s: "
+        f"p50 {result.p50_ms:.2f}ms, p99 {result.p99_ms:.2f}ms, "
+        f"max loop lag {result.max_loop_lag_ms:.2f}ms"
+    )
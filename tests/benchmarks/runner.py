@@ -0,0 +1,552 @@
+"""Run the benchmark cases and compare results against a baseline."""
+
+from __future__ import annotations
+
+import json
+import platform
+import random
+import re
+import statistics
+import subprocess  # noqa: S404
+import sys
+import time
+from collections.abc import Callable, Iterable, Mapping
+from functools import partial
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import mdformat
+from markdown_it import MarkdownIt
+from markdown_it.rules_block import StateBlock
+from mdformat.renderer import RenderContext, RenderTreeNode
+
+from mdformat_front_matters import (
+    FrontMatterSettings,
+    __version__,
+    enable_stats,
+    front_matter_data,
+    reset_stats,
+)
+from mdformat_front_matters._formatters import (
+    _FORMAT_CACHE,
+    _YAML_ENGINES,
+    _format_json,
+    _format_toml,
+    _format_with_handler,
+    _format_yaml,
+    _get_toml_engine,
+    _has_libyaml,
+    _LegacyTOMLEngine,
+    _SortingTOMLHandler,
+    _TOMLEngine,
+    _TomllibTOMLEngine,
+    _TOMLWriter,
+    _UnicodePreservingYAMLHandler,
+    _yaml_engine,
+    format_json,
+    format_toml,
+    format_yaml,
+)
+from mdformat_front_matters.mdit_plugins import (
+    FORMATS,
+    _front_matter_rule,
+    front_matters_plugin,
+)
+from mdformat_front_matters.plugin import (
+    RENDERERS,
+    _format_front_matter,
+    _render_front_matter,
+)
+
+from .corpus import (
+    EMPTY_DOCUMENT,
+    EMPTY_ITERATIONS,
+    Case,
+    DetectCase,
+    generate_corpus,
+    generate_detect_corpus,
+    generate_engine_blocks,
+)
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+DEFAULT_REPEAT = 7
+DEFAULT_TOLERANCE = 0.25
+"""Allowed slowdown of the median, as a fraction of the baseline median."""
+PIPELINE_CONSUMERS = 3
+"""Tools that read each page's front matter after mdformat, e.g. a link
+checker, an SEO validator and a site indexer."""
+
+
+class Stats(NamedTuple):
+    """Summary of the timed runs of one benchmark, in nanoseconds."""
+
+    median_ns: int
+    iqr_ns: int
+    runs: int
+
+
+class Comparison(NamedTuple):
+    """Change of one benchmark against the baseline."""
+
+    name: str
+    baseline_ns: int
+    current_ns: int
+    regression: bool
+
+    @property
+    def ratio(self) -> float:
+        """Current median divided by the baseline median."""
+        return self.current_ns / max(self.baseline_ns, 1)
+
+
+def measure(func: Callable[[], object], *, repeat: int, warmup: int = 1) -> Stats:
+    """Time repeated calls of a function.
+
+    Args:
+        func: Function to time.
+        repeat: Number of timed calls.
+        warmup: Number of untimed calls made first to fill lazy caches.
+
+    Returns:
+        Median and interquartile range of the timed calls.
+    """
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        func()
+        samples.append(time.perf_counter_ns() - start)
+    if len(samples) > 1:
+        lower, _, upper = statistics.quantiles(samples, n=4, method="inclusive")
+    else:
+        lower = upper = samples[0]
+    return Stats(int(statistics.median(samples)), int(upper - lower), repeat)
+
+
+def _format_case(case: Case) -> None:
+    for block in case.blocks:
+        _format_front_matter(
+            case.format,
+            block,
+            case.markup,
+            FrontMatterSettings(strict=True, sort_keys=case.sort_keys),
+        )
+
+
+def _detect_case(case: DetectCase, state: StateBlock) -> None:
+    state.env = {}  # Drop the scan cached by the previous run
+    _front_matter_rule(state, 0, state.lineMax, silent=True, max_lines=case.max_lines)
+
+
+def _detect_benchmark(case: DetectCase) -> Callable[[], None]:
+    """Build the parser state up front, so only the block rule is timed."""
+    state = StateBlock(case.text, MarkdownIt("commonmark"), {}, [])
+    return partial(_detect_case, case, state)
+
+
+def _detect_empty(state: StateBlock) -> None:
+    for _ in range(EMPTY_ITERATIONS):
+        _front_matter_rule(state, 0, state.lineMax, silent=True)
+
+
+def _format_empty() -> None:
+    for _ in range(EMPTY_ITERATIONS):
+        mdformat.text(EMPTY_DOCUMENT, extensions={"front_matters"})
+
+
+def _empty_benchmarks() -> dict[str, Callable[[], None]]:
+    """Time the document without front matter, with the rule alone and in full."""
+    state = StateBlock(EMPTY_DOCUMENT, MarkdownIt("commonmark"), {}, [])
+    return {
+        "empty/detect": partial(_detect_empty, state),
+        "empty/mdformat": _format_empty,
+    }
+
+
+def _dump_toml(tables: list[dict[str, Any]]) -> None:
+    for table in tables:
+        _TOMLWriter().dumps(table)
+
+
+def _dump_toml_regex(tables: list[dict[str, Any]]) -> None:
+    """Serialize like the plugin did before `_TOMLWriter`: `toml.dumps` + regexes."""
+    import toml  # type: ignore[import-untyped]  # noqa: PLC0415
+
+    for table in tables:
+        output = re.sub(r"\n\n+(\[(?!\[))", r"\n\1", toml.dumps(table))
+        output = re.sub(r",\s*]", "]", output)
+        re.sub(r"\n\n+$", "\n", output)
+
+
+def _dump_benchmarks(seed: int) -> dict[str, Callable[[], None]]:
+    """Time the TOML writer alone on the parsed blocks of the large cases.
+
+    The `dump/toml-regex/` cases time the `toml.dumps` and regex cleanup the
+    writer replaced, on the same tables.
+    """
+    engine = _get_toml_engine()
+    benchmarks: dict[str, Callable[[], None]] = {}
+    for case in generate_corpus(seed):
+        if case.format == "toml" and case.name.endswith("/large/unsorted"):
+            tables = [engine.loads(block) for block in case.blocks]
+            name = case.name.removeprefix("toml/").removesuffix("/unsorted")
+            benchmarks[f"dump/toml/{name}"] = partial(_dump_toml, tables)
+            benchmarks[f"dump/toml-regex/{name}"] = partial(_dump_toml_regex, tables)
+    return benchmarks
+
+
+def _format_yaml_blocks(blocks: list[str]) -> None:
+    for block in blocks:
+        _format_yaml(block, strict=True)
+
+
+def _format_yaml_blocks_rebuilt(blocks: list[str]) -> None:
+    for block in blocks:
+        _YAML_ENGINES.engines = {}  # Build the engine again for every block
+        _format_yaml(block, strict=True)
+
+
+def _format_toml_blocks(engine: _TOMLEngine, blocks: list[str]) -> None:
+    handler = _SortingTOMLHandler(engine)
+    for block in blocks:
+        _format_with_handler(block, handler, engine.loads, sort_keys=False)
+
+
+def _engine_benchmarks(seed: int) -> dict[str, Callable[[], None]]:
+    """Time the same blocks through each YAML and TOML engine.
+
+    Plain YAML blocks go through libyaml, and through round-trip mode with a
+    trailing comment, which only round-trip mode preserves, either reusing
+    the engine or building it for each block (`rebuilt`). The large flat
+    TOML blocks go through the `toml` package and, on Python 3.11+, tomllib.
+    """
+    blocks = generate_engine_blocks()
+    round_trip_blocks = [f"{block}\n# Round-trip" for block in blocks]
+    benchmarks: dict[str, Callable[[], None]] = {
+        "engine/yaml/libyaml": partial(_format_yaml_blocks, blocks),
+        "engine/yaml/round-trip": partial(_format_yaml_blocks, round_trip_blocks),
+        "engine/yaml/rebuilt": partial(_format_yaml_blocks_rebuilt, round_trip_blocks),
+    }
+    toml_blocks = next(
+        case.blocks
+        for case in generate_corpus(seed)
+        if case.name == "toml/flat/large/unsorted"
+    )
+    engines: list[_TOMLEngine] = [_LegacyTOMLEngine()]
+    if sys.version_info >= (3, 11):
+        engines.append(_TomllibTOMLEngine())
+    for engine in engines:
+        benchmarks[f"engine/toml/{engine.name}"] = partial(
+            _format_toml_blocks, engine, toml_blocks
+        )
+    return benchmarks
+
+
+SORT_KEYS = {"1k": 1_000, "10k": 10_000, "100k": 100_000}
+"""Number of keys of the mappings of the `sort/` cases."""
+
+
+def _sort_mapping(keys: list[str]) -> None:
+    from ruamel.yaml.comments import CommentedMap  # noqa: PLC0415
+
+    data = CommentedMap((key, key) for key in keys)
+    with _yaml_engine(None) as yaml:
+        _UnicodePreservingYAMLHandler(yaml)._sort_mappings_in_place(data)  # noqa: SLF001
+
+
+def _sort_benchmarks() -> dict[str, Callable[[], None]]:
+    """Time sorting shuffled YAML mappings, including building each mapping."""
+    benchmarks: dict[str, Callable[[], None]] = {}
+    for name, count in SORT_KEYS.items():
+        keys = [f"key_{i:06d}" for i in range(count)]
+        random.Random(count).shuffle(keys)  # noqa: S311
+        benchmarks[f"sort/yaml/{name}"] = partial(_sort_mapping, keys)
+    return benchmarks
+
+
+_IMPORT_MDFORMAT = "import markdown_it, mdformat, mdformat.renderer"
+
+
+def _run_python(code: str) -> None:
+    subprocess.run([sys.executable, "-c", code], check=True)  # noqa: S603
+
+
+def _import_benchmarks() -> dict[str, Callable[[], None]]:
+    """Time a fresh interpreter importing mdformat, without and with the plugin.
+
+    The difference between the two cases is the import time of the plugin.
+    """
+    return {
+        "import/mdformat": partial(_run_python, _IMPORT_MDFORMAT),
+        "import/plugin": partial(
+            _run_python, f"{_IMPORT_MDFORMAT}; import mdformat_front_matters"
+        ),
+    }
+
+
+def _pipeline(
+    md: MarkdownIt, documents: list[str], settings: FrontMatterSettings
+) -> None:
+    """Render the front matter of each page, then read it in every consumer."""
+    options = {"mdformat": {"front_matter_cache_size": 0}}  # Render every block
+    for text in documents:
+        env: dict[str, Any] = {}
+        node = RenderTreeNode(md.parse(text, env)).children[0]
+        _render_front_matter(node, RenderContext(RENDERERS, {}, options, env))
+        for _ in range(PIPELINE_CONSUMERS):
+            if (shared := front_matter_data(env)) is not None:
+                data = shared.data
+            else:
+                load = FORMATS[node.meta["format"]].load
+                data = load(node.content, settings)  # type: ignore[misc]
+            data["title"]  # type: ignore[index]
+
+
+def _pipeline_benchmarks(seed: int) -> dict[str, Callable[[], None]]:
+    """Time a page pipeline that parses the front matter in each step, or once."""
+    settings = FrontMatterSettings(cache_size=0)
+    benchmarks: dict[str, Callable[[], None]] = {}
+    for case in generate_corpus(seed):
+        if not case.name.endswith("/nested/small/unsorted"):
+            continue
+        documents = [
+            f"{case.markup}\n{block}\n{case.markup}\n\n# Page\n"
+            if case.markup
+            else f"{block}\n\n# Page\n"
+            for block in case.blocks
+        ]
+        for mode, data_settings in (("reparse", None), ("shared", settings)):
+            md = MarkdownIt("commonmark").use(
+                front_matters_plugin, data_settings=data_settings
+            )
+            benchmarks[f"pipeline/{case.format}/{mode}"] = partial(
+                _pipeline, md, documents, settings
+            )
+    return benchmarks
+
+
+def _format_yaml_blocks_collecting(blocks: list[str]) -> None:
+    enable_stats()
+    try:
+        _format_yaml_blocks(blocks)
+    finally:
+        enable_stats(enabled=False)
+        reset_stats()
+
+
+def _stats_benchmarks() -> dict[str, Callable[[], None]]:
+    """Time the same YAML blocks with statistics collection off and on."""
+    blocks = generate_engine_blocks()
+    return {
+        "stats/yaml/disabled": partial(_format_yaml_blocks, blocks),
+        "stats/yaml/enabled": partial(_format_yaml_blocks_collecting, blocks),
+    }
+
+
+CANONICAL_TEMPLATES = {
+    "yaml": (
+        format_yaml,
+        _format_yaml,
+        "date: 2024-01-{i:02d}\ndraft: false\ntags:\n  - tag1\n  - tag2\n"
+        "title: Document {i}",
+    ),
+    "toml": (
+        format_toml,
+        _format_toml,
+        'date = 2024-01-{i:02d}\ndraft = false\ntags = [ "tag1", "tag2"]\n'
+        'title = "Document {i}"',
+    ),
+    "json": (
+        format_json,
+        _format_json,
+        '{{\n    "date": "2024-01-{i:02d}",\n    "draft": false,\n'
+        '    "title": "Document {i}"\n}}',
+    ),
+}
+"""Per format: the public formatter, the formatter without the fast path, and
+a template of blocks that are already formatted."""
+
+
+def _format_blocks(format_func: Callable[[str], str], blocks: list[str]) -> None:
+    for block in blocks:
+        format_func(block)
+
+
+def _canonical_benchmarks() -> dict[str, Callable[[], None]]:
+    """Time already formatted blocks with and without the canonical fast path."""
+    benchmarks: dict[str, Callable[[], None]] = {}
+    for name, (format_func, full_format_func, template) in CANONICAL_TEMPLATES.items():
+        blocks = [template.format(i=i) for i in range(1, 29)]
+        benchmarks[f"canonical/{name}/fast"] = partial(
+            _format_blocks, format_func, blocks
+        )
+        benchmarks[f"canonical/{name}/full"] = partial(
+            _format_blocks, full_format_func, blocks
+        )
+    return benchmarks
+
+
+def case_names(seed: int = 0) -> list[str]:
+    """Return the names of all benchmark cases."""
+    names = [case.name for case in generate_corpus(seed)]
+    names.extend(case.name for case in generate_detect_corpus(seed))
+    names.extend(_empty_benchmarks())
+    names.extend(_dump_benchmarks(seed))
+    names.extend(_engine_benchmarks(seed))
+    names.extend(_sort_benchmarks())
+    names.extend(_import_benchmarks())
+    names.extend(_pipeline_benchmarks(seed))
+    names.extend(_stats_benchmarks())
+    names.extend(_canonical_benchmarks())
+    return names
+
+
+def run_benchmarks(
+    *, repeat: int = DEFAULT_REPEAT, select: str = "", seed: int = 0
+) -> dict[str, Any]:
+    """Format every corpus case repeatedly with the result cache disabled.
+
+    The detection cases time the block rule on documents without front matter,
+    the `empty/` cases repeat `test_empty_document_performance`, the `dump/`
+    cases time the TOML writer alone on already parsed blocks, the `engine/`
+    cases time the same blocks through each YAML and TOML engine, the `sort/`
+    cases sort shuffled YAML mappings of growing size, the `import/`
+    cases time a fresh interpreter importing the plugin, the `pipeline/`
+    cases render and read front matter with and without sharing the parsed
+    data, the `stats/` cases format YAML with statistics off and on, and the
+    `canonical/` cases format already formatted blocks with and without the
+    fast path.
+
+    Args:
+        repeat: Number of timed runs per case.
+        select: Only run cases whose name contains this text.
+        seed: Seed for the corpus generator.
+
+    Returns:
+        JSON-serializable results with the environment and per-case stats.
+    """
+    previous_size = _FORMAT_CACHE.maxsize
+    _FORMAT_CACHE.resize(0)
+    try:
+        benchmarks = {
+            case.name: measure(partial(_format_case, case), repeat=repeat)
+            for case in generate_corpus(seed)
+            if select in case.name
+        }
+        benchmarks.update(
+            (case.name, measure(_detect_benchmark(case), repeat=repeat))
+            for case in generate_detect_corpus(seed)
+            if select in case.name
+        )
+        benchmarks.update(
+            (name, measure(benchmark, repeat=repeat))
+            for name, benchmark in _empty_benchmarks().items()
+            if select in name
+        )
+        benchmarks.update(
+            (name, measure(benchmark, repeat=repeat))
+            for name, benchmark in _dump_benchmarks(seed).items()
+            if select in name
+        )
+        benchmarks.update(
+            (name, measure(benchmark, repeat=repeat))
+            for name, benchmark in _engine_benchmarks(seed).items()
+            if select in name
+        )
+        benchmarks.update(
+            (name, measure(benchmark, repeat=repeat))
+            for name, benchmark in _sort_benchmarks().items()
+            if select in name
+        )
+        benchmarks.update(
+            (name, measure(benchmark, repeat=repeat))
+            for name, benchmark in _import_benchmarks().items()
+            if select in name
+        )
+        benchmarks.update(
+            (name, measure(benchmark, repeat=repeat))
+            for name, benchmark in _pipeline_benchmarks(seed).items()
+            if select in name
+        )
+        benchmarks.update(
+            (name, measure(benchmark, repeat=repeat))
+            for name, benchmark in _stats_benchmarks().items()
+            if select in name
+        )
+        benchmarks.update(
+            (name, measure(benchmark, repeat=repeat))
+            for name, benchmark in _canonical_benchmarks().items()
+            if select in name
+        )
+    finally:
+        _FORMAT_CACHE.resize(previous_size)
+    return {
+        "environment": {
+            "version": __version__,
+            "python": platform.python_version(),
+            "implementation": sys.implementation.name,
+            "platform": platform.platform(),
+            "libyaml": _has_libyaml(),
+            "seed": seed,
+        },
+        "benchmarks": {name: stats._asdict() for name, stats in benchmarks.items()},
+    }
+
+
+def compare(
+    baseline: Mapping[str, Any],
+    current: Mapping[str, Any],
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> list[Comparison]:
+    """Compare the benchmarks present in both results.
+
+    A benchmark regresses when its median grows by more than the tolerance
+    and the growth also exceeds the combined interquartile ranges, so that
+    noisy runs are not reported as regressions.
+
+    Args:
+        baseline: Results from `run_benchmarks`, e.g. the committed baseline.
+        current: Results from `run_benchmarks` to check.
+        tolerance: Allowed slowdown as a fraction of the baseline median.
+
+    Returns:
+        One comparison per benchmark, in baseline order.
+    """
+    comparisons = []
+    for name, before in baseline["benchmarks"].items():
+        if (after := current["benchmarks"].get(name)) is None:
+            continue
+        growth = after["median_ns"] - before["median_ns"]
+        noise = before["iqr_ns"] + after["iqr_ns"]
+        comparisons.append(
+            Comparison(
+                name,
+                before["median_ns"],
+                after["median_ns"],
+                regression=growth > before["median_ns"] * tolerance and growth > noise,
+            )
+        )
+    return comparisons
+
+
+def format_table(comparisons: Iterable[Comparison]) -> str:
+    """Render comparisons as an aligned text table."""
+    lines = [f"{'benchmark':<36} {'baseline':>10} {'current':>10} {'ratio':>7}"]
+    for item in comparisons:
+        flag = "  REGRESSION" if item.regression else ""
+        lines.append(
+            f"{item.name:<36} {item.baseline_ns / 1e6:>8.2f}ms "
+            f"{item.current_ns / 1e6:>8.2f}ms {item.ratio:>6.2f}x{flag}"
+        )
+    return "\n".join(lines)
+
+
+def dump_results(results: Mapping[str, Any]) -> str:
+    """Serialize results as indented JSON with stable key order."""
+    return json.dumps(results, indent=2, sort_keys=True) + "\n"
+
+
+def read_results(path: Path) -> dict[str, Any]:
+    """Read results serialized by `dump_results`."""
+    return json.loads(path.read_text(encoding="utf-8"))
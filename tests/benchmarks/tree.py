@@ -0,0 +1,85 @@
+"""Compare the front matter check with `mdformat --check` on a tree of files."""
+
+from __future__ import annotations
+
+import random
+import subprocess  # noqa: S404
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import NamedTuple
+
+from mdformat_front_matters import check_files, format_files
+
+from .corpus import _prose
+from .load import load_documents
+
+
+class TreeResult(NamedTuple):
+    """Wall-clock time of each way to check a tree, in seconds."""
+
+    files: int
+    check_front_matter: float
+    format_files_check: float
+    """`format_files(..., check=True)`: a full render, across the same workers."""
+    mdformat_check: float
+    """The `mdformat --check` command, which renders every file in one process."""
+
+
+def write_tree(root: Path, files: int, *, body_lines: int = 200, seed: int = 0) -> None:
+    """Write formatted pages with long bodies into nested directories.
+
+    Args:
+        root: Directory to write to.
+        files: Number of pages.
+        body_lines: Lines of prose after the front matter of each page.
+        seed: Seed for the corpus generator.
+    """
+    rng = random.Random(f"{seed}/tree")  # noqa: S311
+    documents = load_documents(seed)
+    for index in range(files):
+        directory = root / f"section{index % 10}"
+        directory.mkdir(parents=True, exist_ok=True)
+        body = "\n".join(_prose(rng, body_lines))
+        text = f"{documents[index % len(documents)]}\n{body}\n"
+        (directory / f"page{index}.md").write_text(text, encoding="utf-8")
+    for _ in format_files([root]):
+        pass  # Both checks then pass, and have to read every file
+
+
+def _time(func: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def run_tree(root: Path, *, workers: int | None = None) -> TreeResult:
+    """Check a formatted tree in three ways.
+
+    Args:
+        root: Tree written by `write_tree`.
+        workers: Number of worker processes (default: the CPU count).
+
+    Returns:
+        The time taken by each way.
+    """
+    files = sum(1 for _ in root.glob("**/*.md"))
+    command = [sys.executable, "-m", "mdformat", "--check", str(root)]
+    return TreeResult(
+        files=files,
+        check_front_matter=_time(lambda: list(check_files([root], workers=workers))),
+        format_files_check=_time(
+            lambda: list(format_files([root], workers=workers, check=True))
+        ),
+        mdformat_check=_time(lambda: subprocess.run(command, check=True)),  # noqa: S603
+    )
+
+
+def format_tree(result: TreeResult) -> str:
+    """Render a tree result as one line per way of checking."""
+    return "\n".join(
+        f"{name:<20} {seconds:>8.2f}s"
+        for name, seconds in result._asdict().items()
+        if name != "files"
+    )
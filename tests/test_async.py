@@ -0,0 +1,154 @@
+"""Tests for the asyncio API."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from mdformat_front_matters import AsyncFormatter, aformat_many, aformat_text
+from mdformat_front_matters._async import _format_text
+
+from .benchmarks.load import run_load
+
+UNFORMATTED = "---\nb:   1\na: 2\n---\n# Title\n"
+FORMATTED = "---\nb: 1\na: 2\n---\n\n# Title\n"
+SORTED = "---\na: 2\nb: 1\n---\n\n# Title\n"
+
+
+class _GatedExecutor(ThreadPoolExecutor):
+    """Executor whose tasks wait for a gate, recording the peak of queued tasks."""
+
+    def __init__(self) -> None:
+        super().__init__(1)
+        self.gate = threading.Event()
+        self.started: list[str] = []
+        self.outstanding = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def run(self, text, *args):
+        self.started.append(text)
+        self.gate.wait(5)
+        return _format_text(text, *args)
+
+    def submit(self, _fn, /, *args, **kwargs):
+        with self.lock:
+            self.outstanding += 1
+            self.peak = max(self.peak, self.outstanding)
+        future = super().submit(self.run, *args, **kwargs)
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, _):
+        with self.lock:
+            self.outstanding -= 1
+
+
+def test_aformat_text_and_many():
+    """Test the module-level functions and that results keep input order."""
+
+    async def main():
+        options = {"plugin": {"front_matters": {"sort_front_matter": True}}}
+        single = await aformat_text(UNFORMATTED)
+        many = await aformat_many([UNFORMATTED, FORMATTED, "# Other\n"] * 5)
+        only = await aformat_text("---\nb:   1\n---\n*  body\n", front_matter_only=True)
+        return single, many, only, await aformat_text(UNFORMATTED, options=options)
+
+    single, many, only, sorted_text = asyncio.run(main())
+    assert single == FORMATTED
+    assert many == [FORMATTED, FORMATTED, "# Other\n"] * 5
+    assert only == "---\nb: 1\n---\n*  body\n"
+    assert sorted_text == SORTED
+    # A second event loop reuses the shared formatter
+    assert asyncio.run(aformat_text(UNFORMATTED)) == FORMATTED
+
+
+def test_backpressure():
+    """Test that no more than `max_in_flight` documents reach the executor."""
+    executor = _GatedExecutor()
+    formatter = AsyncFormatter(executor=executor, max_in_flight=3)
+    consumed = []
+
+    def texts():
+        for index in range(10):
+            consumed.append(index)
+            yield UNFORMATTED
+
+    async def main():
+        task = asyncio.create_task(formatter.format_many(texts()))
+        await asyncio.sleep(0.05)
+        assert len(consumed) == 4  # noqa: PLR2004  # Three submitted, one waiting for a slot
+        executor.gate.set()
+        return await task
+
+    with executor:
+        assert asyncio.run(main()) == [FORMATTED] * 10
+    assert executor.peak == 3  # noqa: PLR2004
+
+
+def test_cancellation():
+    """Test that cancelled documents that have not started never run."""
+    executor = _GatedExecutor()
+    formatter = AsyncFormatter(executor=executor, max_in_flight=2)
+
+    async def main():
+        running = asyncio.create_task(formatter.format_text("# Running\n"))
+        queued = asyncio.create_task(formatter.format_text("# Queued\n"))
+        waiting = asyncio.create_task(formatter.format_text("# Waiting\n"))
+        await asyncio.sleep(0.05)
+        queued.cancel()
+        waiting.cancel()
+        await asyncio.sleep(0.05)  # Cancellation reaches the executor via the loop
+        executor.gate.set()
+        assert await running == "# Running\n"
+        for task in (queued, waiting):
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        # All slots are free again
+        assert await formatter.format_many(["# A\n", "# B\n"]) == ["# A\n", "# B\n"]
+
+    with executor:
+        asyncio.run(main())
+    assert executor.started == ["# Running\n", "# A\n", "# B\n"]
+
+
+def test_errors_propagate():
+    """Test that strict mode errors reach the caller and cancel the rest."""
+    options = {"plugin": {"front_matters": {"strict_front_matter": True}}}
+
+    async def main():
+        async with AsyncFormatter(workers=1, options=options) as formatter:
+            with pytest.raises(TypeError, match="key-value"):
+                await formatter.format_many(["---\n- a\n---\n", UNFORMATTED])
+            return await formatter.format_text(UNFORMATTED)
+
+    assert asyncio.run(main()) == FORMATTED
+
+
+def test_process_executor():
+    """Test formatting in worker processes."""
+
+    async def main():
+        async with AsyncFormatter(workers=1, processes=True) as formatter:
+            return await formatter.format_many([UNFORMATTED] * 3)
+
+    assert asyncio.run(main()) == [FORMATTED] * 3
+
+
+def test_load_latency():
+    """Test that latency stays stable under concurrency once warmed up."""
+
+    async def main():
+        async with AsyncFormatter(workers=2) as formatter:
+            await run_load(formatter, clients=8, requests=40)  # Warm up
+            return await run_load(formatter, clients=8, requests=200)
+
+    result = asyncio.run(main())
+    assert result.requests == 200  # noqa: PLR2004
+    # Requests queue fairly behind the bounded in-flight window
+    assert result.p99_ms < 20 * result.p50_ms
+    # The event loop keeps running while documents are formatted
+    assert result.max_loop_lag_ms < 250  # noqa: PLR2004
@@ -0,0 +1,210 @@
+"""Tests for the parallel batch formatter."""
+
+from __future__ import annotations
+
+import json
+import time
+
+import pytest
+
+from mdformat_front_matters import (
+    FileResult,
+    FrontMatterIssue,
+    check_files,
+    format_files,
+)
+from mdformat_front_matters.__main__ import main
+
+UNFORMATTED = "---\nb:   1\na: 2\n---\n# Title\n"
+FORMATTED = "---\nb: 1\na: 2\n---\n\n# Title\n"
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    """Write a directory of formatted and unformatted files."""
+    for index in range(20):
+        nested = tmp_path / "docs" / f"section{index % 3}"
+        nested.mkdir(parents=True, exist_ok=True)
+        text = UNFORMATTED if index % 2 else FORMATTED
+        (nested / f"page{index}.md").write_text(text)
+    (tmp_path / "docs" / "notes.txt").write_text(UNFORMATTED)
+    return tmp_path
+
+
+@pytest.mark.parametrize("serial_files", [64, 0])
+def test_format_files(corpus, monkeypatch, serial_files):
+    """Test that files are formatted in place, serially or in a pool."""
+    monkeypatch.setattr("mdformat_front_matters._batch.SERIAL_FILES", serial_files)
+    monkeypatch.setattr("mdformat_front_matters._batch.CHUNK_FILES", 3)
+    results = list(format_files([corpus / "docs"], workers=2))
+    assert len(results) == 20  # noqa: PLR2004
+    assert sum(result.changed for result in results) == 10  # noqa: PLR2004
+    assert all(result.error is None for result in results)
+    pages = sorted((corpus / "docs").glob("**/*.md"))
+    assert {page.read_text() for page in pages} == {FORMATTED}
+    assert (corpus / "docs" / "notes.txt").read_text() == UNFORMATTED
+
+
+def test_format_files_check_and_options(corpus):
+    """Test that check mode leaves files untouched and options are applied."""
+    pattern = str(corpus / "docs" / "section1" / "*.md")
+    options = {"plugin": {"front_matters": {"sort_front_matter": True}}}
+    results = list(format_files([pattern], options=options, check=True))
+    assert results
+    assert all(result.changed for result in results)
+    assert all(
+        (corpus / "docs" / "section1" / name).read_text() in {UNFORMATTED, FORMATTED}
+        for name in ("page1.md", "page4.md")
+    )
+
+
+def test_format_files_reports_errors(tmp_path):
+    """Test that unreadable files are reported without stopping the batch."""
+    (tmp_path / "bad.md").write_bytes(b"\xff\xfe")
+    (tmp_path / "good.md").write_text(UNFORMATTED)
+    results = sorted(
+        format_files(
+            [tmp_path / "bad.md", tmp_path / "missing.md", tmp_path / "good.md"]
+        )
+    )
+    assert [result.path for result in results] == [
+        str(tmp_path / name) for name in ("bad.md", "good.md", "missing.md")
+    ]
+    assert str(results[0].error).startswith("UnicodeDecodeError")
+    assert results[1] == FileResult(str(tmp_path / "good.md"), changed=True)
+    assert str(results[2].error).startswith("FileNotFoundError")
+
+
+def test_main(corpus, capsys):
+    """Test the command line entry point."""
+    docs = str(corpus / "docs")
+    assert main([docs, "--check", "--workers", "1"]) == 1
+    assert "is not formatted" in capsys.readouterr().err
+    assert main([docs, "--sort-front-matter"]) == 0
+    assert main([docs, "--check", "--sort-front-matter"]) == 0
+    page = corpus / "docs" / "section1" / "page1.md"
+    assert page.read_text() == "---\na: 2\nb: 1\n---\n\n# Title\n"
+
+
+def test_format_files_front_matter_only(corpus):
+    """Test that only the front matter is rewritten in front-matter-only mode."""
+    results = list(format_files([corpus / "docs"], front_matter_only=True))
+    assert sum(result.changed for result in results) == 10  # noqa: PLR2004
+    page = corpus / "docs" / "section1" / "page1.md"
+    assert page.read_text() == "---\nb: 1\na: 2\n---\n# Title\n"
+    assert main([str(page), "--front-matter-only", "--sort-front-matter"]) == 0
+    assert page.read_text() == "---\na: 2\nb: 1\n---\n# Title\n"
+
+
+@pytest.mark.parametrize(
+    ("text", "end_of_line", "expected"),
+    [
+        ("---\r\nb:   1\r\n---\r\n# Title\r\n", None, "---\nb: 1\n---\n# Title\n"),
+        ("---\nb:   1\n---\n# Title\n", "crlf", "---\r\nb: 1\r\n---\r\n# Title\r\n"),
+        (
+            "---\r\nb:   1\r\n---\r\n# Title\n",
+            "keep",
+            "---\r\nb: 1\r\n---\r\n# Title\r\n",
+        ),
+    ],
+    ids=["lf", "crlf", "keep"],
+)
+def test_format_files_front_matter_only_end_of_line(
+    tmp_path, text, end_of_line, expected
+):
+    """Test that front-matter-only mode applies the line ending option."""
+    page = tmp_path / "page.md"
+    page.write_bytes(text.encode())
+    options = {} if end_of_line is None else {"end_of_line": end_of_line}
+    results = list(format_files([page], options=options, front_matter_only=True))
+    assert results == [FileResult(str(page), changed=True)]
+    assert page.read_bytes().decode() == expected
+
+
+def test_format_files_validates_html(tmp_path, monkeypatch, capsys):
+    """Test that a file whose rendered HTML would change is not written."""
+    page = tmp_path / "page.md"
+    page.write_text(UNFORMATTED)
+    monkeypatch.setattr("mdformat.text", lambda *_args, **_kwargs: "# Other\n")
+    [result] = format_files([page])
+    assert not result.changed
+    assert "different HTML" in (result.error or "")
+    assert page.read_text() == UNFORMATTED
+    assert main([str(page)]) == 1
+    assert "different HTML" in capsys.readouterr().err
+
+    assert main([str(page), "--no-validate"]) == 0
+    assert page.read_text() == "# Other\n"
+
+
+@pytest.mark.parametrize("serial_files", [64, 0])
+def test_check_files(corpus, monkeypatch, serial_files):
+    """Test that unformatted front matter is reported without writing files."""
+    monkeypatch.setattr("mdformat_front_matters._batch.SERIAL_FILES", serial_files)
+    monkeypatch.setattr("mdformat_front_matters._batch.CHUNK_FILES", 3)
+    before = {page: page.read_text() for page in corpus.glob("**/*.md")}
+    issues = sorted(check_files([corpus / "docs"], workers=2))
+    assert [issue.path for issue in issues] == sorted(
+        str(page) for page, text in before.items() if text == UNFORMATTED
+    )
+    assert {(issue.start_byte, issue.end_byte, issue.error) for issue in issues} == {
+        (0, 20, None)
+    }
+    assert {page: page.read_text() for page in before} == before
+
+    options = {"plugin": {"front_matters": {"sort_front_matter": True}}}
+    assert len(list(check_files([corpus / "docs"], options=options))) == 20  # noqa: PLR2004
+
+
+@pytest.mark.parametrize("serial_files", [64, 0])
+def test_check_files_fail_fast(corpus, monkeypatch, serial_files):
+    """Test that the run stops at the first unformatted file."""
+    monkeypatch.setattr("mdformat_front_matters._batch.SERIAL_FILES", serial_files)
+    monkeypatch.setattr("mdformat_front_matters._batch.CHUNK_FILES", 1)
+    issues = list(check_files([corpus / "docs"], workers=2, fail_fast=True))
+    assert len(issues) == 1
+    assert issues[0].error is None
+
+
+def test_check_files_reports_errors(tmp_path):
+    """Test that unreadable files and strict mode errors are reported."""
+    (tmp_path / "bad.md").write_bytes(b"\xff\xfe")
+    (tmp_path / "invalid.md").write_text("---\n- a\n---\n")
+    (tmp_path / "good.md").write_text(FORMATTED)
+    options = {"plugin": {"front_matters": {"strict_front_matter": True}}}
+    issues = sorted(check_files([tmp_path], options=options))
+    assert [issue.path for issue in issues] == [
+        str(tmp_path / name) for name in ("bad.md", "invalid.md")
+    ]
+    assert str(issues[0].error).startswith("UnicodeDecodeError")
+    assert str(issues[1].error).startswith("TypeError")
+
+
+def test_main_check_front_matter(corpus, capsys):
+    """Test the check mode of the command line entry point."""
+    docs = str(corpus / "docs")
+    assert main([docs, "--check-front-matter", "--workers", "1"]) == 1
+    assert "is not formatted (bytes 0-20)" in capsys.readouterr().err
+    assert main([docs, "--check-front-matter", "--fail-fast", "--json"]) == 1
+    (issue,) = json.loads(capsys.readouterr().out)
+    assert FrontMatterIssue(**issue).end_byte == 20  # noqa: PLR2004
+    assert main([docs, "--front-matter-only"]) == 0
+    assert main([docs, "--check-front-matter", "--json"]) == 0
+    assert json.loads(capsys.readouterr().out) == []
+
+
+def test_check_is_faster_than_format(tmp_path):
+    """Test that checking skips the body that a full check has to render."""
+    body = "\n".join(f"Paragraph {i} with *some*   text.\n" for i in range(200))
+    for index in range(20):
+        (tmp_path / f"page{index}.md").write_text(f"{FORMATTED}\n{body}")
+
+    def elapsed(run):
+        start = time.perf_counter()
+        results = list(run())
+        return time.perf_counter() - start, results
+
+    check_time, issues = elapsed(lambda: check_files([tmp_path], workers=1))
+    format_time, _ = elapsed(lambda: format_files([tmp_path], workers=1, check=True))
+    assert not issues
+    assert check_time * 5 < format_time
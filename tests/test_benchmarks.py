@@ -0,0 +1,122 @@
+"""Tests for the benchmark corpus, statistics and baseline comparison."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from mdformat_front_matters import FrontMatterSettings
+from mdformat_front_matters.plugin import _format_front_matter
+from tests.benchmarks.__main__ import main
+from tests.benchmarks.corpus import generate_corpus
+from tests.benchmarks.runner import (
+    BASELINE_PATH,
+    case_names,
+    compare,
+    measure,
+    read_results,
+    run_benchmarks,
+)
+
+
+def _results(**medians: tuple[int, int]) -> dict[str, object]:
+    return {
+        "benchmarks": {
+            name: {"median_ns": median, "iqr_ns": iqr, "runs": 5}
+            for name, (median, iqr) in medians.items()
+        }
+    }
+
+
+def test_corpus_is_deterministic():
+    """Test that a seed always produces the same blocks."""
+    assert generate_corpus() == generate_corpus()
+    assert generate_corpus(seed=1) != generate_corpus()
+
+
+def test_corpus_needs_formatting():
+    """Test that every block parses and is not already in canonical form."""
+    cases = generate_corpus()
+    names = {case.name for case in cases}
+    assert len(names) == len(cases) == 44  # noqa: PLR2004
+    assert {"yaml/comments/large/sorted", "json/wide-arrays/small/unsorted"} <= names
+    for case in cases:
+        if case.name.endswith("/large/sorted"):
+            continue  # Same blocks as the unsorted case
+        for block in case.blocks:
+            rendered = _format_front_matter(
+                case.format,
+                block,
+                case.markup,
+                FrontMatterSettings(strict=True, sort_keys=case.sort_keys),
+            )
+            assert block not in rendered, case.name
+
+
+def test_measure():
+    """Test that the median and interquartile range come from every run."""
+    calls = []
+    stats = measure(lambda: calls.append(1), repeat=5, warmup=2)
+    assert len(calls) == 7  # noqa: PLR2004
+    assert stats.runs == 5  # noqa: PLR2004
+    assert stats.median_ns >= 0
+    assert stats.iqr_ns >= 0
+
+
+@pytest.mark.parametrize(
+    ("current", "regression"),
+    [
+        ((1_200_000, 50_000), False),  # Within tolerance
+        ((2_000_000, 50_000), True),  # 2x slower
+        ((2_000_000, 2_000_000), False),  # Too noisy to tell
+        ((500_000, 50_000), False),  # Faster
+    ],
+)
+def test_compare(current, regression):
+    """Test that only slowdowns beyond the tolerance and the noise are flagged."""
+    baseline = _results(case=(1_000_000, 50_000), removed=(10, 1))
+    (comparison,) = compare(baseline, _results(case=current, added=(10, 1)), 0.25)
+    assert comparison.name == "case"
+    assert comparison.regression is regression
+
+
+def test_baseline_covers_corpus():
+    """Test that the committed baseline has an entry for every case."""
+    baseline = read_results(BASELINE_PATH)
+    assert set(baseline["benchmarks"]) == set(case_names())
+
+
+def test_run_and_compare(tmp_path, capsys):
+    """Test the command line entry point on a subset of cases."""
+    results = run_benchmarks(repeat=1, select="json/flat/small")
+    assert set(results["benchmarks"]) == {
+        "json/flat/small/sorted",
+        "json/flat/small/unsorted",
+    }
+
+    output = tmp_path / "results.json"
+    assert (
+        main(["run", "--repeat", "2", "-k", "toml/flat", "--output", str(output)]) == 0
+    )
+    # Formatting with and without sorting, both sizes, and the writer alone
+    assert len(json.loads(output.read_text())["benchmarks"]) == 5  # noqa: PLR2004
+    assert main(["compare", str(output), "--baseline", str(output)]) == 0
+    assert "toml/flat/large/sorted" in capsys.readouterr().out
+
+    slower = read_results(output)
+    for stats in slower["benchmarks"].values():
+        stats.update(median_ns=stats["median_ns"] * 3, iqr_ns=0)
+    current = tmp_path / "slower.json"
+    current.write_text(json.dumps(slower))
+    assert main(["compare", str(current), "--baseline", str(output)]) == 1
+    assert "REGRESSION" in capsys.readouterr().out
+
+
+def test_tree(capsys):
+    """Test that the check mode is timed against a full check on a small tree."""
+    assert main(["tree", "--files", "5", "--workers", "1"]) == 0
+    output = capsys.readouterr().out
+    assert output.startswith("5 files\n")
+    assert "check_front_matter" in output
+    assert "mdformat_check" in output
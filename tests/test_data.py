@@ -0,0 +1,184 @@
+"""Tests for the front matter data shared on tokens and `env`."""
+
+from __future__ import annotations
+
+import datetime
+from pathlib import Path
+
+import mdformat
+import pytest
+from markdown_it import MarkdownIt
+from markdown_it.utils import read_fixture_file
+from mdformat.renderer import RenderContext, RenderTreeNode
+
+from mdformat_front_matters import (
+    BlockLimits,
+    FrontMatterData,
+    FrontMatterSettings,
+    front_matter_data,
+)
+from mdformat_front_matters._formatters import BudgetExceededError, cache_clear
+from mdformat_front_matters.mdit_plugins import _OPENERS, front_matters_plugin
+from mdformat_front_matters.plugin import RENDERERS, _render_front_matter
+
+_MD = MarkdownIt("commonmark").use(
+    front_matters_plugin, data_settings=FrontMatterSettings()
+)
+
+
+def _data(text: str, md: MarkdownIt = _MD) -> FrontMatterData | None:
+    env: dict[str, object] = {}
+    tokens = md.parse(text, env)
+    data = front_matter_data(env)
+    assert data is (front_matter_data(tokens[0]) if tokens else None)
+    return data
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        (
+            "---\ntitle: Post  # comment\ntags: [a, b]\ndate: 2024-01-02\n---\n",
+            {"title": "Post", "tags": ["a", "b"], "date": datetime.date(2024, 1, 2)},
+        ),
+        (
+            '+++\ntitle = "Post"\n[extra]\nweight = 2\n+++\n',
+            {"title": "Post", "extra": {"weight": 2}},
+        ),
+        ('{\n"title": "Post",\n"tags": ["a"]\n}\n', {"title": "Post", "tags": ["a"]}),
+        ("---\n---\n", {}),
+    ],
+    ids=["yaml", "toml", "json", "empty"],
+)
+def test_data(text, expected):
+    data = _data(text)
+    assert data is not None
+    before = (data.parsed, data.parse_ns)
+    assert data.data == expected
+    assert data.error is None
+    assert before == (False, 0)  # Parsed on first access
+    assert data.parsed
+    assert data.parse_ns > 0
+    assert data.load() is data.data  # Parsed once, then shared
+
+
+@pytest.mark.parametrize(
+    ("text", "error"),
+    [
+        ("---\ntitle: [unclosed\n---\n", Exception),
+        ("---\n- a\n- b\n---\n", TypeError),
+        ("---\n# only a comment\n---\n", TypeError),
+        ("+++\ntitle = \n+++\n", ValueError),
+    ],
+    ids=["yaml", "list", "comment", "toml"],
+)
+def test_invalid_data(text, error):
+    data = _data(text)
+    assert data is not None
+    assert data.data is None
+    assert isinstance(data.error, error)
+    with pytest.raises(error):
+        data.load()
+
+
+def test_data_limits():
+    md = MarkdownIt().use(
+        front_matters_plugin,
+        data_settings=FrontMatterSettings(limits=BlockLimits(max_bytes=8)),
+    )
+    data = _data('+++\ntitle = "A long title"\n+++\n', md)
+    assert data is not None
+    assert isinstance(data.error, BudgetExceededError)
+
+
+def test_data_is_opt_in(monkeypatch):
+    """Test that data is only attached when enabled, for formats with a loader."""
+    assert _data("---\na: 1\n---\n", MarkdownIt().use(front_matters_plugin)) is None
+    assert front_matter_data({}) is None
+    monkeypatch.setitem(_OPENERS, "+", _OPENERS["+"]._replace(load=None))
+    md = MarkdownIt().use(front_matters_plugin, data_settings=FrontMatterSettings())
+    assert _data("+++\na = 1\n+++\n", md) is None
+
+
+def _counting_load(monkeypatch, opening: str) -> list[str]:
+    """Count the calls of a format's loader."""
+    calls: list[str] = []
+    front_matter_format = _OPENERS[opening]
+
+    def load(content: str, settings: FrontMatterSettings) -> object:
+        calls.append(content)
+        return front_matter_format.load(content, settings)  # type: ignore[misc]
+
+    monkeypatch.setitem(_OPENERS, opening, front_matter_format._replace(load=load))
+    return calls
+
+
+@pytest.mark.parametrize("sort_keys", [False, True])
+def test_renderer_reuses_data(monkeypatch, sort_keys):
+    """Test that mdformat formats the shared data instead of parsing again."""
+    text = "---\nb: 1\na: [1, 2]  # comment\n---\n\n# Title\n"
+    options = {"sort_front_matter": sort_keys}
+    cache_clear()
+    expected = mdformat.text(text, options=options, extensions={"front_matters"})
+    calls = _counting_load(monkeypatch, "-")
+    cache_clear()
+    formatted = mdformat.text(
+        text,
+        options={**options, "front_matter_data": True},
+        extensions={"front_matters"},
+    )
+    cache_clear()
+    assert formatted == expected
+    # mdformat parses the output again to check it, without reading the data
+    assert calls == ["b: 1\na: [1, 2]  # comment"]
+
+
+@pytest.mark.parametrize("read_first", [False, True])
+def test_readers_do_not_change_output(read_first):
+    """Test that changes to the shared data reach neither output nor caches."""
+    text = "---\nb: 1\na: 2\n---\n"
+    env: dict[str, object] = {}
+    node = RenderTreeNode(_MD.parse(text, env)).children[0]
+    shared = front_matter_data(env)
+    assert shared is not None
+    if read_first:
+        shared.load()["injected"] = "by a consumer"
+    options = {"mdformat": {"sort_front_matter": True}}
+    cache_clear()
+    rendered = _render_front_matter(node, RenderContext(RENDERERS, {}, options, env))
+    if not read_first:
+        shared.load()["injected"] = "by a consumer"
+    assert rendered == "---\na: 2\nb: 1\n---"
+    assert list(shared.load()) == ["b", "a", "injected"]  # Not sorted in place
+    # A later, unrelated call formats the block from scratch or from the cache
+    output = mdformat.text(
+        text, options={"sort_front_matter": True}, extensions={"front_matters"}
+    )
+    cache_clear()
+    assert output == "---\na: 2\nb: 1\n---\n"
+
+
+_FIXTURES = [
+    fixture
+    for path in sorted((Path(__file__).parent / "format" / "fixtures").glob("*.md"))
+    for fixture in read_fixture_file(path)
+]
+
+
+@pytest.mark.parametrize(
+    ("line", "title", "text", "expected"),
+    _FIXTURES,
+    ids=[f"{fixture[0]}-{fixture[1]}" for fixture in _FIXTURES],
+)
+@pytest.mark.parametrize("sort_keys", [False, True])
+def test_reuse_matches_fixtures(line, title, text, expected, sort_keys):
+    """Test that formatting the shared data gives the same output."""
+    outputs = []
+    for data in (False, True):
+        cache_clear()
+        options = {"sort_front_matter": sort_keys, "front_matter_data": data}
+        outputs.append(
+            mdformat.text(text, options=options, extensions={"front_matters"})
+        )
+    cache_clear()
+    assert outputs[0] == outputs[1]
@@ -0,0 +1,149 @@
+"""Tests for the persistent front matter cache."""
+
+from __future__ import annotations
+
+import itertools
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+from functools import partial
+
+import mdformat
+import pytest
+
+from mdformat_front_matters import _disk_cache
+from mdformat_front_matters._disk_cache import DiskCache
+
+TEXT = """---
+title: Test
+tags: [a, b]
+---
+# Content
+"""
+OPTIONS = ("---", False, False, None)
+"""Markup, strict, sort_keys and wrap, as resolved by the plugin."""
+
+
+def _write_entries(cache_dir: str, worker: int) -> int:
+    cache = DiskCache(cache_dir)
+    for i in range(50):
+        key = cache.make_key("yaml", f"key_{i}: {worker}")
+        cache.set(key, f"value {worker} {i}")
+        assert cache.get(key) == f"value {worker} {i}"
+    cache.close()
+    return worker
+
+
+def test_disk_cache_persists_across_instances(tmp_path):
+    """Test that a new cache instance (e.g. a later run) sees stored values."""
+    key = DiskCache.make_key("yaml", "title: Test", *OPTIONS)
+    first = DiskCache(tmp_path)
+    first.set(key, "---\ntitle: Test\n---")
+    first.close()
+    assert DiskCache(tmp_path).get(key) == "---\ntitle: Test\n---"
+
+
+def test_disk_cache_key_covers_options_and_versions(monkeypatch):
+    """Test that options and dependency versions change the key."""
+    key = DiskCache.make_key("yaml", "a: 1", *OPTIONS)
+    assert key != DiskCache.make_key("yaml", "a: 1", "+++", *OPTIONS[1:])
+    assert key != DiskCache.make_key("toml", "a: 1", *OPTIONS)
+    monkeypatch.setattr(
+        _disk_cache, "_dependency_versions", lambda: ("0", "0", "0", "0")
+    )
+    assert key != DiskCache.make_key("yaml", "a: 1", *OPTIONS)
+
+
+def test_disk_cache_prunes_least_recently_used(tmp_path):
+    """Test that pruning keeps the most recently used entries under the cap."""
+    cache = DiskCache(tmp_path, max_bytes=20)
+    for name in ("a", "b", "c"):
+        cache.set(name, name * 10)
+    assert cache.get("a") == "a" * 10  # Mark as recently used
+    cache.prune()
+    assert cache.get("a") == "a" * 10
+    assert cache.get("b") is None
+
+
+def test_disk_cache_concurrent_writers(tmp_path):
+    """Test that parallel processes can share one cache directory."""
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        workers = list(pool.map(_write_entries, [str(tmp_path)] * 4, range(4)))
+    assert workers == [0, 1, 2, 3]
+    cache = DiskCache(tmp_path)
+    assert cache.get(cache.make_key("yaml", "key_49: 3")) == "value 3 49"
+
+
+def test_disk_cache_errors_are_misses(tmp_path):
+    """Test that an unreadable database never breaks formatting."""
+    (tmp_path / "front_matters.sqlite3").write_text("not a database")
+    cache = DiskCache(tmp_path)
+    cache.set("key", "value")
+    assert cache.get("key") is None
+
+
+def test_disk_cache_unwritable_directory_disables_cache(tmp_path):
+    """Test that a cache directory that cannot be created disables the cache."""
+    (tmp_path / "file").write_text("")
+    cache = DiskCache(tmp_path / "file" / "cache")
+    cache.set("key", "value")  # mkdir raises NotADirectoryError
+    assert cache.get("key") is None
+    (tmp_path / "file").unlink()
+    cache.set("key", "value")
+    assert cache.get("key") is None
+    assert not (tmp_path / "file").exists()
+
+
+def test_disk_cache_batches_access_times(tmp_path, monkeypatch):
+    """Test that hits record their access time on close, not on every read."""
+    monkeypatch.setattr(
+        "mdformat_front_matters._disk_cache.time.time",
+        partial(next, itertools.count(1)),
+    )
+    cache = DiskCache(tmp_path)
+    cache.set("key", "value")
+
+    def accessed() -> float:
+        with closing(sqlite3.connect(tmp_path / "front_matters.sqlite3")) as connection:
+            return connection.execute("SELECT accessed FROM entries").fetchone()[0]
+
+    stored = accessed()
+    for _ in range(3):
+        assert cache.get("key") == "value"
+    assert accessed() == stored
+    cache.close()
+    assert accessed() > stored
+
+
+def test_disk_cache_skips_fallback(tmp_path, monkeypatch):
+    """Test that a block that timed out once is not persisted unformatted."""
+    text = "---\nb: 1\na: [1, 2]\n---\n"
+    options = {
+        "sort_front_matter": True,
+        "front_matter_cache_size": 0,
+        "front_matter_cache_dir": str(tmp_path),
+        "front_matter_timeout": 0.5,
+    }
+    with monkeypatch.context() as patch:
+        patch.setattr(  # A slow machine: each step takes ten seconds
+            "mdformat_front_matters._formatters.time.perf_counter",
+            partial(next, itertools.count(0, 10)),
+        )
+        assert mdformat.text(text, extensions={"front_matters"}, options=options) == (
+            text
+        )
+    result = mdformat.text(text, extensions={"front_matters"}, options=options)
+    assert result == "---\na: [1, 2]\nb: 1\n---\n"
+
+
+def test_front_matter_cache_dir_option(tmp_path, monkeypatch):
+    """Test that rendered blocks are reused from the disk cache."""
+    options = {"plugin": {"front_matters": {"front_matter_cache_dir": str(tmp_path)}}}
+    expected = mdformat.text(TEXT, extensions={"front_matters"}, options=options)
+
+    def fail(*_args, **_kwargs):
+        pytest.fail("Front matter should have been read from the disk cache")
+
+    monkeypatch.setattr("mdformat_front_matters.plugin._format_front_matter", fail)
+    result = mdformat.text(TEXT, extensions={"front_matters"}, options=options)
+    assert result == expected
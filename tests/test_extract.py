@@ -0,0 +1,127 @@
+"""Tests for head-only front matter extraction."""
+
+from __future__ import annotations
+
+import io
+import random
+
+import pytest
+from typing_extensions import Buffer
+
+from mdformat_front_matters import FrontMatterBlock, extract
+from tests.test_mdit_plugins import _MD, _random_json_document
+
+
+def _expected_block(text: str) -> FrontMatterBlock | None:
+    tokens = _MD.parse(text)
+    if not tokens or tokens[0].type != "front_matter":
+        return None
+    token = tokens[0]
+    assert token.map is not None
+    end_line = token.map[1]
+    body = "".join(text.splitlines(keepends=True)[end_line:])
+    return FrontMatterBlock(
+        format=token.meta["format"],
+        content=token.content,
+        markup=token.markup,
+        end_line=end_line,
+        end_byte=len(text.encode()) - len(body.encode()),
+    )
+
+
+def _random_delimited_document(rng: random.Random) -> str:
+    pieces = ["---", "----", "+++", "  ---", "\t+++", "a: 1", "", "é ✓", "-- -"]
+    opening = rng.choice(["---", "+++", "----", " ---", "    ---", "\t---", "x"])
+    return "\n".join([opening, *rng.choices(pieces, k=rng.randint(0, 6)), "# Body"])
+
+
+def test_extract_matches_parser():
+    """Test that extraction finds the same block as the markdown-it rule."""
+    found = 0
+    for seed in range(1500):
+        rng = random.Random(seed)  # noqa: S311
+        for text in (_random_delimited_document(rng), _random_json_document(rng)):
+            expected = _expected_block(text)
+            assert extract(text) == expected, text
+            found += expected is not None
+    assert found > 500  # noqa: PLR2004
+
+
+@pytest.mark.parametrize(
+    ("text", "content", "body"),
+    [
+        ("---\r\ntitle: é\r\n\r\n---\r\n# Body\r\n", "title: é\n", "# Body\r\n"),
+        ("+++\ntitle = 'x'\n+++", "title = 'x'", ""),
+        ('{\n    "a": {\n        "b": "}"\n    }\n}\nBody\n', None, "Body\n"),
+        ("---\n---\n", "", ""),
+    ],
+)
+def test_extract_from_file(tmp_path, text, content, body):
+    """Test that a file gives the same block as its text, with byte offsets."""
+    path = tmp_path / "doc.md"
+    path.write_bytes(text.encode())
+    block = extract(path)
+    assert block is not None
+    assert block == extract(text)
+    expected = _expected_block(text.replace("\r\n", "\n"))
+    assert expected is not None
+    fields = ("format", "content", "markup", "end_line")
+    assert [getattr(block, f) for f in fields] == [getattr(expected, f) for f in fields]
+    if content is not None:
+        assert block.content == content
+    assert text.encode()[block.end_byte :] == body.encode()
+
+
+def test_extract_offsets():
+    """Test the content, markup and offsets of a block."""
+    text = "----\ntitle: ✓\n----\n# Body\n"
+    assert extract(text) == FrontMatterBlock(
+        format="yaml",
+        content="title: ✓",
+        markup="----",
+        end_line=3,
+        end_byte=len("----\ntitle: ✓\n----\n".encode()),
+    )
+    assert extract("# Body\n---\na: 1\n---\n") is None
+    assert extract("") is None
+
+
+class _CountingFileIO(io.FileIO):
+    """File that counts the bytes read from disk."""
+
+    bytes_read = 0
+
+    def readinto(self, buffer: Buffer) -> int | None:
+        count = super().readinto(buffer)
+        self.bytes_read += count or 0
+        return count
+
+
+@pytest.mark.parametrize(
+    ("format_type", "head"),
+    [
+        ("yaml", "---\ntitle: Large\ntags:\n  - a\n---\n"),
+        ("toml", '+++\ntitle = "Large"\n+++\n'),
+        ("json", '{\n    "title": "Large"\n}\n'),
+    ],
+)
+def test_extract_reads_only_the_head(tmp_path, monkeypatch, format_type, head):
+    """Test that extracting from a file stops reading after the front matter."""
+    path = tmp_path / "large.md"
+    path.write_bytes(head.encode() + b"Lorem ipsum dolor sit amet.\n" * 40_000)
+    files: list[_CountingFileIO] = []
+
+    def counting_open(file: str, mode: str) -> io.BufferedReader:
+        assert mode == "rb"
+        files.append(_CountingFileIO(file))
+        return io.BufferedReader(files[-1])
+
+    monkeypatch.setattr(
+        "mdformat_front_matters._extract.open", counting_open, raising=False
+    )
+    block = extract(path)
+    assert block is not None
+    assert block.format == format_type
+    assert "Large" in block.content
+    # One buffer of the 1 MB file
+    assert files[0].bytes_read <= io.DEFAULT_BUFFER_SIZE
@@ -0,0 +1,539 @@
+"""Tests for formatter internals."""
+
+from __future__ import annotations
+
+import datetime
+import itertools
+import json
+import random
+import re
+import sys
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+import mdformat
+import pytest
+from markdown_it.utils import read_fixture_file
+
+from mdformat_front_matters._formatters import (
+    _FORMAT_CACHE,
+    _YAML_LIBYAML,
+    _YAML_LIBYAML_LOADER,
+    _YAML_ROUND_TRIP,
+    DEFAULT_CACHE_SIZE,
+    BlockLimits,
+    YAMLBudget,
+    _format_json,
+    _format_toml,
+    _format_with_handler,
+    _format_yaml,
+    _FormatCache,
+    _has_libyaml,
+    _is_canonical_json,
+    _is_canonical_toml,
+    _is_canonical_yaml,
+    _LegacyTOMLEngine,
+    _load_yaml,
+    _select_yaml_engine,
+    _TOMLEngine,
+    _TomllibTOMLEngine,
+    _TOMLWriter,
+    _UnicodePreservingYAMLHandler,
+    _yaml_engine,
+    cache_clear,
+    cache_info,
+    format_json,
+    format_toml,
+    format_yaml,
+)
+
+
+@pytest.fixture
+def empty_cache():
+    """Start from an empty, default-sized format cache."""
+    cache_clear()
+    yield _FORMAT_CACHE
+    cache_clear()
+
+
+def test_yaml_engine_reused_per_configuration():
+    """Test that the YAML engine is built once per effective configuration."""
+    with _yaml_engine(None) as first, _yaml_engine(None) as second:
+        assert first is second
+    wrap = 40
+    with _yaml_engine(wrap) as wrapped:
+        assert wrapped is not first
+        assert wrapped.width == wrap
+
+
+def test_yaml_engine_discarded_after_error():
+    """Test that an engine which raised is not handed to the next block."""
+    with _yaml_engine(None) as before:
+        pass
+    assert _format_yaml("] invalid") == "] invalid"
+    with _yaml_engine(None) as after:
+        assert after is not before
+    assert _format_yaml("b: 1\na: 2", sort_keys=False) == "b: 1\na: 2"
+
+
+@pytest.mark.parametrize("wrap", [None, 20])
+def test_yaml_engine_output_stable_across_blocks(wrap):
+    """Test that reusing an engine does not leak state between blocks."""
+    content = "title: A long title that may wrap somewhere\ntags:\n  - a\n  - b"
+    first = _format_yaml(content, wrap=wrap)
+    _format_yaml("other: &anchor value\nref: *anchor", wrap=wrap)
+    assert _format_yaml(content, wrap=wrap) == first
+
+
+@pytest.mark.parametrize(
+    ("format_func", "content"),
+    [
+        (format_yaml, "b:   1\na: 2"),
+        (format_toml, 'b =   1\na = "x"'),
+        (format_json, '{"b": 1, "a": 2}'),
+    ],
+)
+def test_format_cache_hits_and_misses(empty_cache, format_func, content):
+    """Test that identical blocks are formatted once per set of options."""
+    first = format_func(content)
+    assert format_func(content) == first
+    format_func(content, sort_keys=False)
+    info = cache_info()
+    assert (info.hits, info.misses, info.currsize) == (1, 2, 2)
+
+
+def test_format_cache_keys_on_format_type(empty_cache):
+    """Test that the same text is cached separately per format."""
+    content = '{"a": 1}'
+    assert format_json(content) == '{\n    "a": 1\n}'
+    assert format_yaml(content) == content
+    assert cache_info().misses == 2  # noqa: PLR2004
+
+
+def test_format_cache_stores_fallback(empty_cache, monkeypatch):
+    """Test that invalid blocks only pay for a failed parse once."""
+    calls = []
+
+    def counting_load(*args: Any) -> Any:  # noqa: ANN401
+        calls.append(args[-1])
+        return _load_yaml(*args)
+
+    monkeypatch.setattr("mdformat_front_matters._formatters._load_yaml", counting_load)
+    assert format_yaml("] invalid") == "] invalid"
+    assert format_yaml("] invalid") == "] invalid"
+    assert calls == ["] invalid"]
+
+
+def test_format_cache_skips_budget(empty_cache):
+    """Test that blocks kept as-is for exceeding their budget are not cached."""
+    content = "\n".join(f"k{i}: v" for i in range(10))
+    budget = YAMLBudget(max_nodes=5)
+    assert format_yaml(content, budget=budget) == content
+    assert format_yaml(content, budget=budget) == content
+    assert cache_info().currsize == 0
+
+
+def test_format_cache_skips_timeout(empty_cache, monkeypatch):
+    """Test that a block that timed out once is formatted by the next call."""
+    content = "b: 1\na: [1, 2]"
+    limits = BlockLimits(timeout=0.5)
+    with monkeypatch.context() as patch:
+        patch.setattr(  # A slow machine: each step takes ten seconds
+            "mdformat_front_matters._formatters.time.perf_counter",
+            partial(next, itertools.count(0, 10)),
+        )
+        assert format_yaml(content, limits=limits) == content
+    assert format_yaml(content, limits=limits) == "a: [1, 2]\nb: 1"
+
+
+def test_format_cache_skips_strict_errors(empty_cache):
+    """Test that exceptions raised in strict mode are not cached."""
+    for _ in range(2):
+        with pytest.raises(Exception, match=r".*"):
+            format_yaml("] invalid", strict=True)
+    assert cache_info().currsize == 0
+
+
+def test_format_cache_evicts_least_recently_used():
+    """Test that the cache is bounded and evicts in LRU order."""
+    cache = _FormatCache(maxsize=2)
+    for content in ("a", "b", "a", "c"):
+        cache.get_or_format(("test",), content, partial(str, content))
+    assert cache.info() == (1, 3, 2, 2)
+    cache.get_or_format(("test",), "b", lambda: "recomputed")
+    assert cache.info().misses == 4  # noqa: PLR2004
+
+
+def test_format_cache_resize_to_zero_disables():
+    """Test that a size of zero empties the cache and bypasses it."""
+    cache = _FormatCache(maxsize=4)
+    cache.get_or_format(("test",), "a", lambda: "a")
+    cache.resize(0)
+    cache.get_or_format(("test",), "a", lambda: "a")
+    assert cache.info() == (0, 1, 0, 0)
+
+
+def test_front_matter_cache_size_option(empty_cache):
+    """Test that the plugin option resizes the shared cache."""
+    text = "---\ntitle: Test\n---\n# Content\n"
+    mdformat.text(
+        text,
+        extensions={"front_matters"},
+        options={"plugin": {"front_matters": {"front_matter_cache_size": 3}}},
+    )
+    assert cache_info().maxsize == 3  # noqa: PLR2004
+    mdformat.text(text, extensions={"front_matters"})
+    assert cache_info().maxsize == DEFAULT_CACHE_SIZE
+
+
+_FUZZ_VALUES = [
+    "value",
+    "Hello, World",
+    "It's fine",
+    "a/b (c)",
+    "x+y",
+    "émoji ✓",
+    "true",
+    "True",
+    "null",
+    "~",
+    "0",
+    "-1",
+    "1.50",
+    "007",
+    "-0",
+    "-0.0",
+    "-0.5",
+    "0.0",
+    "10",
+    "+1",
+    "2024-01-01",
+    "a: b",
+    "a #b",
+    "",
+]
+
+
+def _fuzz_documents(seed: int) -> list[tuple[str, str, str]]:
+    rng = random.Random(seed)  # noqa: S311
+    keys = ["a", "b", "title", "tags", "key_1", "a b", "null", "x.y"]
+    documents = []
+    for _ in range(300):
+        names = rng.sample(keys, rng.randint(1, 4))
+        yaml_lines, toml_lines, json_lines = [], [], []
+        for name in names:
+            value = rng.choice(_FUZZ_VALUES)
+            if rng.random() < 0.2:  # noqa: PLR2004
+                items = rng.sample(_FUZZ_VALUES, 2)
+                yaml_lines.extend([f"{name}:", *(f"  - {item}" for item in items)])
+                toml_lines.append(f"{name} = [ {', '.join(map(json.dumps, items))}]")
+            else:
+                yaml_lines.append(f"{name}: {value}".rstrip())
+                literal = value if rng.random() < 0.3 else json.dumps(value)  # noqa: PLR2004
+                toml_lines.append(f"{name} = {literal}")
+            literal = value if rng.random() < 0.3 else json.dumps(value)  # noqa: PLR2004
+            json_lines.append(f"    {json.dumps(name)}: {literal},")
+        json_lines[-1] = json_lines[-1].rstrip(",")
+        documents.append(
+            (
+                "\n".join(yaml_lines),
+                "\n".join(toml_lines),
+                "\n".join(["{", *json_lines, "}"]),
+            )
+        )
+    return documents
+
+
+@pytest.mark.parametrize("sort_keys", [True, False])
+@pytest.mark.parametrize("wrap", [None, 12])
+def test_canonical_fast_path_matches_full_format(sort_keys, wrap):
+    """Test that content accepted by the fast path is left unchanged anyway."""
+    accepted = 0
+    for yaml_text, toml_text, json_text in _fuzz_documents(seed=wrap or 0):
+        for is_canonical, format_func, content, kwargs in (
+            (_is_canonical_yaml, _format_yaml, yaml_text, {"wrap": wrap}),
+            (_is_canonical_toml, _format_toml, toml_text, {}),
+            (_is_canonical_json, _format_json, json_text, {}),
+        ):
+            if is_canonical(content, sort_keys=sort_keys, **kwargs):
+                accepted += 1
+                formatted = format_func(
+                    content, strict=True, sort_keys=sort_keys, **kwargs
+                )
+                assert formatted == content
+    assert accepted > 50  # noqa: PLR2004
+
+
+@pytest.mark.parametrize(
+    ("is_canonical", "content"),
+    [
+        (partial(_is_canonical_yaml, wrap=None), "b: 1\na: 2"),
+        (partial(_is_canonical_yaml, wrap=None), "a: 1\na: 2"),
+        (partial(_is_canonical_yaml, wrap=None), "tags:\n- a"),
+        (partial(_is_canonical_yaml, wrap=None), "# comment\na: 1"),
+        (partial(_is_canonical_yaml, wrap=None), "date: 2023-13-45"),
+        (partial(_is_canonical_yaml, wrap=None), "tags:\n  - 2023-02-30"),
+        (_is_canonical_toml, 'a = "x"\n\n[table]\nb = 1'),
+        (_is_canonical_toml, 'tags = ["a", "b"]'),
+        (_is_canonical_json, '{"a": 1}'),
+        (_is_canonical_json, '{\n    "a": 1,\n}'),
+        (_is_canonical_json, '{\n    "a b": 1,\n    "a": 2\n}'),
+    ],
+)
+def test_canonical_fast_path_rejects(is_canonical, content):
+    """Test that content needing changes takes the full formatting path."""
+    assert not is_canonical(content, sort_keys=True)
+
+
+@pytest.mark.parametrize("content", ["date: 2023-13-45", "d: 2023-02-30"])
+def test_impossible_date_strict(empty_cache, content):
+    """Test that the fast path does not accept dates that fail to parse."""
+    with pytest.raises(ValueError, match=r"must be in|out of range"):
+        format_yaml(content, strict=True)
+    assert format_yaml(content) == content
+    assert format_yaml("d: 2024-02-29", strict=True) == "d: 2024-02-29"
+
+
+_TOML_FIXTURES = [
+    fixture
+    for path in sorted((Path(__file__).parent / "format" / "fixtures").glob("*.md"))
+    for fixture in read_fixture_file(path)
+    if fixture[2].startswith("+++")
+]
+
+
+def _random_toml_value(rng: random.Random, depth: int) -> object:
+    kind = rng.randrange(10)
+    if kind < 3 or depth > 2:  # noqa: PLR2004
+        return "".join(rng.choice("ab c'\"\\\té✓[]{}=.#\u200b") for _ in range(5))
+    if kind == 3:  # noqa: PLR2004
+        return rng.choice([rng.randint(-100, 100), rng.random() * 1e-20, True])
+    if kind == 4:  # noqa: PLR2004
+        return datetime.date(2024, 1, rng.randint(1, 28))
+    if kind == 5:  # noqa: PLR2004
+        return [rng.randint(0, 9) for _ in range(rng.randint(0, 3))]
+    if kind < 8:  # noqa: PLR2004
+        return _random_toml_table(rng, depth + 1)
+    return [_random_toml_table(rng, depth + 1) for _ in range(rng.randint(1, 2))]
+
+
+def _random_toml_table(rng: random.Random, depth: int) -> dict[str, object]:
+    keys = ["a", "b", "c-d", "e_f", "g h", "ï", "1"]
+    return {
+        f"{rng.choice(keys)}{i}": _random_toml_value(rng, depth)
+        for i in range(rng.randint(1, 4))
+    }
+
+
+@pytest.mark.skipif(sys.version_info < (3, 11), reason="Requires tomllib")
+@pytest.mark.parametrize(
+    ("line", "title", "text", "expected"),
+    _TOML_FIXTURES,
+    ids=[fixture[1] for fixture in _TOML_FIXTURES],
+)
+def test_toml_engine_parity_on_fixtures(monkeypatch, line, title, text, expected):
+    """Test that the tomllib engine matches the legacy `toml` engine."""
+    outputs = []
+    for engine in (_LegacyTOMLEngine(), _TomllibTOMLEngine()):
+        cache_clear()
+        monkeypatch.setattr(
+            "mdformat_front_matters._formatters._get_toml_engine", lambda e=engine: e
+        )
+        outputs.append(mdformat.text(text, extensions={"front_matters"}))
+    cache_clear()
+    assert outputs[0] == outputs[1]
+
+
+def test_toml_engine_requires_loads():
+    """Test that an engine without a parser cannot be created."""
+
+    class Incomplete(_TOMLEngine):
+        name = "incomplete"
+
+    with pytest.raises(TypeError, match="abstract"):
+        Incomplete()  # type: ignore[abstract]
+
+
+def _legacy_toml_dumps(data: dict[str, object]) -> str:
+    """Serialize like the plugin did before `_TOMLWriter`: `toml.dumps` + regexes."""
+    import toml  # type: ignore[import-untyped]  # noqa: PLC0415
+
+    output = re.sub(r"\n\n+(\[(?!\[))", r"\n\1", toml.dumps(data))
+    output = re.sub(r",\s*]", "]", output)
+    return re.sub(r"\n\n+$", "\n", output)
+
+
+def test_toml_writer_parity_with_legacy_dumps():
+    """Test that the writer matches `toml.dumps` plus regex normalization."""
+    compared = 0
+    for seed in range(300):
+        data = _random_toml_table(random.Random(seed), 0)  # noqa: S311
+        try:
+            legacy = _legacy_toml_dumps(data)
+        except IndexError:
+            continue  # `toml.dumps` fails on some escaped control characters
+        assert _TOMLWriter().dumps(data).strip() == legacy.strip()
+        compared += 1
+    assert compared > 200  # noqa: PLR2004
+
+
+def test_toml_writer_sorts_nested_tables():
+    data = {
+        "z": 1,
+        "b": {"y": 1, "x": {"q": 2, "p": 1}},
+        "a": [{"d": 1, "c": {"f": 1, "e": 2}}],
+    }
+    assert _TOMLWriter(sort_keys=True).dumps(data) == (
+        "z = 1\n[[a]]\nd = 1\n[a.c]\ne = 2\nf = 1\n[b]\ny = 1\n[b.x]\np = 1\nq = 2\n"
+    )
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        'a = "x, ]"',
+        'a = [ "x, ]", "y"]',
+        'a = "one\\n\\n[table]"\n[table]\nb = 1',
+    ],
+)
+def test_toml_strings_preserved(content):
+    """Test that text resembling TOML syntax inside strings is kept."""
+    assert _format_toml(content, strict=True) == content
+
+
+@pytest.mark.parametrize("sort_keys", [False, True])
+def test_toml_round_trip_fuzz(sort_keys):
+    """Test that formatting never changes the parsed TOML document."""
+    import toml  # noqa: PLC0415
+
+    tomllib = pytest.importorskip("tomllib")
+
+    rng = random.Random(sort_keys)  # noqa: S311
+    compared = 0
+    for _ in range(300):
+        data = _random_toml_table(rng, 0)
+        data["s"] = rng.choice(["x, ]", "a,\n\n[b]", "[c, ]", ", ] ,"])
+        try:
+            text = toml.dumps(data)
+            expected = tomllib.loads(text)
+        except (IndexError, tomllib.TOMLDecodeError):
+            continue  # `toml.dumps` fails on or mangles some control characters
+        formatted = _format_toml(text, strict=True, sort_keys=sort_keys)
+        assert tomllib.loads(formatted) == expected
+        compared += 1
+    assert compared > 200  # noqa: PLR2004
+
+    # Empty tables, which only their header defines
+    for text in (
+        "[a]",
+        "[[a]]\nx = 1\n[a.b]",
+        "[[a]]\n[a.b]\n[a.b.c]",
+        "[[a]]\nx = 1\n[[a]]\n[a.b]\ny = 2\n[a.b.c]",
+    ):
+        formatted = _format_toml(text, strict=True, sort_keys=sort_keys)
+        assert tomllib.loads(formatted) == tomllib.loads(text)
+
+
+requires_libyaml = pytest.mark.skipif(
+    not _has_libyaml(), reason="Requires ruamel.yaml.clib"
+)
+
+_YAML_FIXTURE_BLOCKS = [
+    match[1]
+    for path in sorted((Path(__file__).parent).glob("*/fixtures/*.md"))
+    for _, _, text, _ in read_fixture_file(path)
+    if (match := re.match(r"---\n(.*?)\n---", text, re.DOTALL))
+]
+
+
+def _format_yaml_with_engine(
+    kind: str, content: str, *, sort_keys: bool, wrap: int | None
+) -> str:
+    try:
+        with _yaml_engine(wrap, kind) as yaml:
+            return _format_with_handler(
+                content,
+                _UnicodePreservingYAMLHandler(yaml),
+                yaml.load,
+                sort_keys=sort_keys,
+                wrap=wrap,
+            )
+    except Exception as e:
+        return type(e).__name__
+
+
+_PLAIN_WORDS = ["value", "Hello, World", "It's fine", "a/b (c)", "Über straße", "yes"]
+_PLAIN_WORDS += ["true", "false", "0", "-1", "2024-01-01", "a - b", "word " * 8 + "end"]
+
+
+def _random_plain_mapping(rng: random.Random, indent: int, depth: int) -> list[str]:
+    lines = []
+    for key in rng.sample(["a", "b", "title", "tags", "key_1", "x.y", "Z"], 3):
+        if depth > 1 or rng.random() < 0.6:  # noqa: PLR2004
+            lines.append(f"{' ' * indent}{key}: {rng.choice(_PLAIN_WORDS)}".rstrip())
+            continue
+        lines.append(f"{' ' * indent}{key}:")
+        if rng.random() < 0.5:  # noqa: PLR2004
+            lines.extend(_random_plain_mapping(rng, indent + 2, depth + 1))
+            continue
+        item_indent = indent + rng.choice([0, 2, 4])
+        for _ in range(rng.randint(1, 3)):
+            if rng.random() < 0.3:  # noqa: PLR2004
+                child = _random_plain_mapping(rng, item_indent + 2, depth + 1)
+                lines.append(f"{' ' * item_indent}- {child[0].lstrip()}")
+                lines.extend(child[1:])
+            else:
+                lines.append(f"{' ' * item_indent}- {rng.choice(_PLAIN_WORDS)}")
+    return lines
+
+
+@requires_libyaml
+@pytest.mark.parametrize("sort_keys", [True, False])
+@pytest.mark.parametrize("wrap", [None, 12])
+def test_libyaml_engine_matches_round_trip(sort_keys, wrap):
+    """Test that blocks routed to libyaml format exactly as in round-trip mode."""
+    blocks = _YAML_FIXTURE_BLOCKS + [
+        "\n".join(_random_plain_mapping(random.Random(seed), 0, 0))  # noqa: S311
+        for seed in range(150)
+    ]
+    routed = 0
+    for content in blocks:
+        kind = _select_yaml_engine(content, wrap)
+        if kind == _YAML_ROUND_TRIP:
+            continue
+        routed += 1
+        expected = _format_yaml_with_engine(
+            _YAML_ROUND_TRIP, content, sort_keys=sort_keys, wrap=wrap
+        )
+        assert (
+            _format_yaml_with_engine(kind, content, sort_keys=sort_keys, wrap=wrap)
+            == expected
+        ), content
+    assert routed > 100  # noqa: PLR2004
+
+
+@requires_libyaml
+@pytest.mark.parametrize(
+    ("content", "wrap", "kind"),
+    [
+        ("title: Hello\ndate: 2024-01-01\ncount: 3", None, _YAML_LIBYAML),
+        ("a:\n  b: true", None, _YAML_LIBYAML),
+        ("a: 1", 80, _YAML_LIBYAML_LOADER),
+        ("tags:\n- a\n- b", None, _YAML_LIBYAML_LOADER),
+        ("a: 1 # comment", None, _YAML_ROUND_TRIP),
+        ("a: 'quoted'", None, _YAML_ROUND_TRIP),
+        ("a: &x 1\nb: *x", None, _YAML_ROUND_TRIP),
+        ("a: [1, 2]", None, _YAML_ROUND_TRIP),
+        ("a: 1.50", None, _YAML_ROUND_TRIP),
+        ("a: 007", None, _YAML_ROUND_TRIP),
+        ("a: ~", None, _YAML_ROUND_TRIP),
+        ("a:\nb: 1", None, _YAML_ROUND_TRIP),
+        ("a: True", None, _YAML_ROUND_TRIP),
+        ("a: 1\n\nb: 2", None, _YAML_ROUND_TRIP),
+        ("text: |\n  block", None, _YAML_ROUND_TRIP),
+    ],
+)
+def test_select_yaml_engine(content, wrap, kind):
+    """Test that only blocks without round-trip state use libyaml."""
+    assert _select_yaml_engine(content, wrap) == kind
@@ -0,0 +1,390 @@
+"""Tests for the markdown-it front matter block rule."""
+
+from __future__ import annotations
+
+import random
+import re
+import time
+import tracemalloc
+
+import mdformat
+import pytest
+from markdown_it import MarkdownIt
+from markdown_it.rules_block import StateBlock
+
+from mdformat_front_matters import (
+    FrontMatterFormat,
+    format_front_matter,
+    mdit_plugins,
+    register_format,
+)
+from mdformat_front_matters.mdit_plugins import (
+    _find_json_closing_brace,
+    _front_matter_rule,
+    find_closing_delimiter,
+    front_matters_plugin,
+)
+from tests.benchmarks.runner import measure
+
+_MD = MarkdownIt("commonmark").use(front_matters_plugin)
+
+
+def _parse_front_matter(text: str):
+    tokens = _MD.parse(text)
+    if tokens and tokens[0].type == "front_matter":
+        return tokens[0]
+    return None
+
+
+def _reference_delimited_block(text: str) -> tuple[str, int] | None:
+    """Line-by-line regex check of each line, as the rule once did."""
+    lines = text.split("\n")
+    first_line = lines[0].lstrip(" \t")
+    if not re.fullmatch(r"(-{3,}|\+{3,})\s*", first_line):
+        return None
+    markup = first_line.rstrip()
+    closing = re.compile(rf"{re.escape(markup[0])}{{{len(markup)},}}\s*")
+    for index, line in enumerate(lines[1:], start=1):
+        if closing.fullmatch(line.lstrip(" \t")):
+            return "\n".join(lines[1:index]), index + 1
+    return None
+
+
+def _reference_json_block(text: str) -> tuple[str, int] | None:  # noqa: C901
+    """Character-by-character scan over stripped lines, as the rule once did."""
+    lines = text.split("\n")
+    if lines[0].strip() != "{":
+        return None
+    depth = 0
+    in_string = escape_next = False
+    for index, line in enumerate(lines):
+        for char in line.lstrip(" \t"):
+            if escape_next:
+                escape_next = False
+            elif char == "\\":
+                escape_next = True
+            elif char == '"':
+                in_string = not in_string
+            elif in_string:
+                pass
+            elif char == "{":
+                depth += 1
+            elif char == "}":
+                depth -= 1
+                if depth == 0:
+                    content = "\n".join(ln.lstrip(" \t") for ln in lines[: index + 1])
+                    return content, index + 1
+    return None
+
+
+def _random_json_document(rng: random.Random) -> str:
+    pieces = ["{", "}", '"', "\\", "\n", "\n  ", "a", " ", ":", "{}", '"}"', "\\\n"]
+    body = "".join(rng.choice(pieces) for _ in range(rng.randint(1, 30)))
+    return f"{{\n{body}\n\nText"
+
+
+def test_closing_delimiter_matches_reference():
+    """Test that the bulk search closes blocks where a line-by-line check does."""
+    pieces = ["---", "----", "+++", "++++", "  ---", " --- ", "\t+++", "a: 1", ""]
+    pieces += ["x", "--- x", "-- -", "---\u00a0", "+++++"]
+    found = 0
+    for seed in range(2000):
+        rng = random.Random(seed)  # noqa: S311
+        opening = rng.choice(["---", "+++", "----", " ---", "x"])
+        text = "\n".join([opening, *rng.choices(pieces, k=rng.randint(1, 8))])
+        expected = _reference_delimited_block(text)
+        token = _parse_front_matter(text)
+        if expected is None:
+            assert token is None or token.meta["format"] == "json", text
+            continue
+        found += 1
+        assert token is not None, text
+        assert (token.content, token.map) == (expected[0], [0, expected[1]]), text
+    assert found > 200  # noqa: PLR2004
+
+
+@pytest.mark.parametrize(
+    ("text", "content"),
+    [
+        ("> ---\n> a: 1\n> ---\n", "a: 1"),
+        (">  +++\n> a = 1\n>  +++\n", "a = 1"),
+        ("> ---\n> a: 1\n---\n", None),
+    ],
+)
+def test_closing_delimiter_in_container(text, content):
+    """Test that line marks shifted by a container are honored."""
+    tokens = _MD.parse(text)
+    front_matter = [token for token in tokens if token.type == "front_matter"]
+    assert [token.content for token in front_matter] == ([content] if content else [])
+
+
+def test_json_scanner_matches_reference():
+    """Test that the JSON scanner closes blocks exactly where a char scan does."""
+    found = 0
+    for seed in range(2000):
+        text = _random_json_document(random.Random(seed))  # noqa: S311
+        expected = _reference_json_block(text)
+        token = _parse_front_matter(text)
+        if expected is None:
+            assert token is None, text
+            continue
+        found += 1
+        assert token is not None, text
+        assert (token.content, token.map) == (expected[0], [0, expected[1]]), text
+    assert found > 200  # noqa: PLR2004
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ('{"a": 1}', 7),
+        ('{"a": "}"}', 9),
+        ('{"a": "\\"}"}', 11),
+        ("{\\}}", 3),
+        ("{{}}", 3),
+        ("{", -1),
+        ('{"a": "}', -1),
+    ],
+)
+def test_find_json_closing_brace(text, expected):
+    """Test that braces in strings and escaped braces are skipped."""
+    assert _find_json_closing_brace(text, 0, len(text)) == expected
+
+
+def test_json_scanner_single_long_line():
+    """Test that a 10 MB minified JSON line is scanned without a char loop."""
+    value = "x" * 10_000_000
+    text = f'{{\n"a": "{value}", "b": {{"c": [1, 2]}}, "d": "{value}"\n}}\n'
+    start = time.perf_counter()
+    closing = _find_json_closing_brace(text, 0, len(text))
+    elapsed = time.perf_counter() - start
+    assert closing == len(text) - 2
+    assert elapsed < 0.5, f"Scan took {elapsed:.2f}s"  # noqa: PLR2004
+
+
+@pytest.mark.parametrize(
+    "line",
+    ['"k": {"v": "x"},', "x" * 1000, '"quoted { brace",'],
+    ids=["nested", "long-lines", "quoted"],
+)
+def test_json_scanner_unterminated(line):
+    """Test that an unclosed brace scans a 10 MB document in linear time."""
+    text = "{\n" + f"{line}\n" * (10_000_000 // len(line))
+    start = time.perf_counter()
+    closing = _find_json_closing_brace(text, 0, len(text))
+    elapsed = time.perf_counter() - start
+    assert closing == -1
+    assert elapsed < 3, f"Scan took {elapsed:.2f}s"  # noqa: PLR2004
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "---\n" + "key: value\n" * 300_000 + "---\nbody\n",
+        "{\n" + '    "key": "value",\n' * 200_000 + '    "end": 0\n}\nbody\n',
+    ],
+    ids=["yaml", "json"],
+)
+def test_extraction_copies_block_once(text):
+    """Test that a multi-megabyte block is not copied line by line."""
+    state = StateBlock(text, MarkdownIt(), {}, [])
+    tracemalloc.start()
+    try:
+        assert _front_matter_rule(state, 0, state.lineMax, silent=False)
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    content = state.tokens[0].content
+    assert len(content) > 3_000_000  # noqa: PLR2004
+    allocations = sum(stat.count for stat in snapshot.statistics("filename"))
+    assert allocations < 50  # noqa: PLR2004
+    # The block itself plus the slice it was normalized from, if any
+    assert peak < 2 * len(content) + 100_000
+
+
+@pytest.mark.parametrize(
+    ("text", "max_lines", "found"),
+    [
+        ("---\na: 1\n---\nbody\n", 3, True),
+        ("---\na: 1\n---\nbody\n", 2, False),
+        ('{\n"a": 1\n}\nbody\n', 3, True),
+        ('{\n"a": 1\n}\nbody\n', 2, False),
+        ("---\n" + "prose\n" * 1000 + "---\n", 100, False),
+    ],
+)
+def test_max_lines(text, max_lines, found):
+    """Test that blocks are only searched for within the configured window."""
+    md = MarkdownIt("commonmark").use(front_matters_plugin, max_lines=max_lines)
+    tokens = md.parse(text)
+    assert (tokens[0].type == "front_matter") is found
+
+
+def test_max_lines_bounds_search():
+    """Test that the search stops growing with the length of the document."""
+
+    def rule_time(lines: int) -> int:
+        text = "---\n" + "Some prose.\n" * lines + "---\n"
+        state = StateBlock(text, _MD, {}, [])
+
+        def detect():
+            state.env = {}
+            _front_matter_rule(state, 0, state.lineMax, silent=True, max_lines=50)
+
+        return measure(detect, repeat=15).median_ns
+
+    assert rule_time(100_000) < 10 * rule_time(100)
+
+
+def test_scan_is_cached(monkeypatch):
+    """Test that repeated calls at the start of the document reuse the scan."""
+    calls = []
+    scan = mdit_plugins._scan_front_matter  # noqa: SLF001
+
+    def counting(*args):
+        calls.append(args)
+        return scan(*args)
+
+    monkeypatch.setattr(mdit_plugins, "_scan_front_matter", counting)
+    for text, found in (("---\na: 1\n---\n", True), ("---\nprose\n", False)):
+        calls.clear()
+        state = StateBlock(text, _MD, {}, [])
+        assert _front_matter_rule(state, 0, state.lineMax, silent=True) is found
+        assert _front_matter_rule(state, 0, state.lineMax, silent=False) is found
+        assert len(calls) == 1
+        assert [token.type for token in state.tokens] == ["front_matter"] * found
+
+
+def test_scan_cache_env_reuse():
+    """Test that reusing one env across parses does not reuse stale scans."""
+    env: dict[str, object] = {}
+    # Same number of lines, so the same position and search window
+    texts = ("---\na: 1\n---\nText\n", "---\nb: 2\nc: 3\n---\n", "---\nText\n\n\n")
+    contents = [
+        [
+            token.content
+            for token in _MD.parse(text, env)
+            if token.type == "front_matter"
+        ]
+        for text in texts
+    ]
+    assert contents == [["a: 1"], ["b: 2\nc: 3"], []]
+    # The scans of the previous source are dropped
+    assert len(env["front_matters_scan"][1]) == 1  # type: ignore[index]
+
+
+def test_max_lines_option():
+    """Test the mdformat option, with and without rendering the body."""
+    text = "---\nb:   1\na: 2\n---\n"
+    options = {"plugin": {"front_matters": {"front_matter_max_lines": 3}}}
+    result = mdformat.text(text, extensions={"front_matters"}, options=options)
+    assert not result.startswith("---")
+    assert format_front_matter(text * 1000, options=options) == text * 1000
+    options["plugin"]["front_matters"]["front_matter_max_lines"] = 4
+    assert mdformat.text(text, extensions={"front_matters"}, options=options) == (
+        "---\nb: 1\na: 2\n---\n"
+    )
+
+
+@pytest.mark.parametrize(
+    ("formats", "found"),
+    [
+        (None, ["yaml", "toml", "json"]),
+        (["yaml", "toml"], ["yaml", "toml", None]),
+        ([], [None, None, None]),
+    ],
+)
+def test_formats(formats, found):
+    """Test that disabled formats are not recognized."""
+    md = MarkdownIt("commonmark").use(front_matters_plugin, formats=formats)
+    for text, format_type in zip(
+        ("---\na: 1\n---\n", "+++\na = 1\n+++\n", '{\n"a": 1\n}\n'), found, strict=True
+    ):
+        tokens = md.parse(text)
+        assert (tokens[0].meta or {}).get("format") == format_type, text
+
+
+def test_formats_option():
+    """Test the mdformat option through the plugin and the splice path."""
+    text = '{\n"b": 1, "a": 2\n}\n'
+    options = {"plugin": {"front_matters": {"front_matter_formats": "yaml,toml"}}}
+    assert mdformat.text(text, extensions={"front_matters"}, options=options) == (
+        '{\n"b": 1, "a": 2\n}\n'
+    )
+    assert format_front_matter(text, options=options) == text
+    assert format_front_matter(text) == '{\n    "b": 1,\n    "a": 2\n}\n'
+
+
+def test_public_patterns():
+    """Test that the public delimiter patterns keep matching indented lines."""
+    assert mdit_plugins.JSON_OPENING_PATTERN.match("  {  ")
+    assert mdit_plugins.JSON_OPENING_PATTERN.match("{")
+    assert not mdit_plugins.JSON_OPENING_PATTERN.match("{}")
+    assert mdit_plugins.YAML_DELIMITER_PATTERN.match("---  ")
+    assert mdit_plugins.TOML_DELIMITER_PATTERN.match("+++")
+
+
+def test_dispatch_on_first_character(monkeypatch):
+    """Test that documents starting with other characters skip every detector."""
+
+    class Rejecting:
+        @staticmethod
+        def match(_line: str) -> None:
+            pytest.fail("Opening pattern should not run")
+
+    for front_matter_format in mdit_plugins.FORMATS.values():
+        monkeypatch.setitem(
+            mdit_plugins._OPENERS,  # noqa: SLF001
+            front_matter_format.opening,
+            front_matter_format._replace(pattern=Rejecting()),  # type: ignore[arg-type]
+        )
+    for text in ("# Title\n", "Text\n", "\n", "*\n"):
+        state = StateBlock(text, _MD, {}, [])
+        assert not _front_matter_rule(state, 0, state.lineMax, silent=True)
+
+
+@pytest.fixture
+def registry():
+    """Restore the format registry, which other modules share, after the test."""
+    formats = dict(mdit_plugins.FORMATS)
+    openers = dict(mdit_plugins._OPENERS)  # noqa: SLF001
+    yield
+    mdit_plugins.FORMATS.clear()
+    mdit_plugins.FORMATS.update(formats)
+    mdit_plugins._OPENERS.clear()  # noqa: SLF001
+    mdit_plugins._OPENERS.update(openers)  # noqa: SLF001
+
+
+@pytest.mark.usefixtures("registry")
+def test_register_format():
+    """Test that a registered format is detected, delimited and formatted."""
+    register_format(
+        FrontMatterFormat(
+            "ini",
+            "=",
+            re.compile(r"^={3,}\s*$"),
+            find_closing_delimiter,
+            lambda content, _settings: content.replace(" = ", "="),
+        )
+    )
+    token = _MD.parse("===\na = 1\n====\n# Title\n")[0]
+    assert (token.meta, token.markup, token.content) == (
+        {"format": "ini"},
+        "===",
+        "a = 1",
+    )
+    assert format_front_matter("===\na = 1\n===\n") == "===\na=1\n===\n"
+    assert mdformat.text("===\na = 1\n===\n", extensions={"front_matters"}) == (
+        "===\na=1\n===\n"
+    )
+
+
+@pytest.mark.usefixtures("registry")
+@pytest.mark.parametrize("opening", ["-", "=="])
+def test_register_format_conflict(opening):
+    """Test that a format needs a single, unused opening character."""
+    front_matter_format = mdit_plugins.FORMATS["toml"]._replace(
+        name="other", opening=opening
+    )
+    with pytest.raises(ValueError, match=r"already opens|single character"):
+        register_format(front_matter_format)
@@ -1,25 +1,74 @@
-"""Performance tests to ensure reasonable execution speed."""
+"""Performance tests to ensure reasonable execution speed.
+
+Absolute time limits here are generous ceilings that catch pathological
+slowdowns. Relative comparisons use the median of repeated runs. Smaller
+regressions are tracked by the benchmark suite: `python -m tests.benchmarks`.
+"""
 
 from __future__ import annotations
 
+import json
+import math
+import random
+import re
+import subprocess  # noqa: S404
+import sys
 import time
+from typing import Any, NamedTuple
 
 import mdformat
 import pytest
+from markdown_it import MarkdownIt
+from markdown_it.rules_block import StateBlock
+from ruamel.yaml.comments import CommentedMap
+from ruamel.yaml.error import CommentMark
+from ruamel.yaml.tokens import CommentToken
 from typing_extensions import Self
 
+import mdformat_front_matters
+from mdformat_front_matters import (
+    FrontMatterSettings,
+    YAMLBudget,
+    enable_stats,
+    front_matter_data,
+    get_stats,
+    reset_stats,
+)
+from mdformat_front_matters._formatters import (
+    _YAML_ENGINES,
+    _YAML_LIBYAML_LOADER,
+    _YAML_ROUND_TRIP,
+    _build_yaml_engine,
+    _format_with_handler,
+    _format_yaml,
+    _get_toml_engine,
+    _has_libyaml,
+    _LegacyTOMLEngine,
+    _load_yaml,
+    _select_yaml_engine,
+    _SortingTOMLHandler,
+    _TomllibTOMLEngine,
+    _TOMLWriter,
+    _UnicodePreservingYAMLHandler,
+    _yaml_engine,
+)
+from mdformat_front_matters._stats import _NOOP, _PhaseTimer, phase
+from mdformat_front_matters.mdit_plugins import _front_matter_rule, front_matters_plugin
+from tests.benchmarks.corpus import generate_engine_blocks
+from tests.benchmarks.runner import CANONICAL_TEMPLATES
+
 
 class Timer:
     """Context manager for timing operations with assertion method."""
 
     def __enter__(self) -> Self:
         """Start timer."""
-        self.start = time.time()
+        self.start = time.perf_counter_ns()
         return self
 
     def __exit__(self, *args) -> None:
         """End timer."""
-        self.elapsed = time.time() - self.start
+        self.elapsed = (time.perf_counter_ns() - self.start) / 1e9
 
     def assert_(self, max_time: float) -> None:
         """Assert that elapsed time is less than max_time."""
@@ -77,6 +126,78 @@ def deeply_nested_yaml():
 """
 
 
+_HEAVY_MODULES = (
+    "ruamel.yaml",
+    "toml",
+    "tomllib",
+    "sqlite3",
+    "asyncio",
+    "multiprocessing",
+)
+"""Modules that are slow to import and only needed by some documents or APIs."""
+
+_IMPORT_PROBE = """
+import json, sys
+import mdformat  # Loads tomllib itself, for its configuration file
+heavy = [name for name in sys.argv[2].split() if name not in sys.modules]
+import mdformat_front_matters
+imported = [name for name in heavy if name in sys.modules]
+mdformat.text(sys.argv[1], extensions={"front_matters"})
+backends = [name for name in heavy if name in sys.modules]
+print(json.dumps({"imported": imported, "backends": backends}))
+"""
+
+
+class _ImportProbe(NamedTuple):
+    imported: list[str]
+    """Heavy modules loaded by the plugin import."""
+    backends: list[str]
+    """Heavy modules loaded once the text was formatted."""
+
+
+def _probe_import(text: str) -> _ImportProbe:
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", _IMPORT_PROBE, text, " ".join(_HEAVY_MODULES)],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return _ImportProbe(**json.loads(result.stdout))
+
+
+@pytest.mark.parametrize(
+    ("text", "expected_backends"),
+    [
+        ("# No front matter\n", []),
+        ('{\n    "title": "JSON"\n}\n# Content\n', []),
+        (
+            '+++\ntitle =  "TOML"\n+++\n# Content\n',
+            [] if sys.version_info >= (3, 11) else ["toml"],  # tomllib engine
+        ),
+        ("---\ntitle:  YAML\n---\n# Content\n", ["ruamel.yaml"]),
+    ],
+)
+def test_plugin_import_time(text, expected_backends):
+    """Test that heavy modules are only imported once a block needs them.
+
+    The import time itself is tracked by the `import/` benchmarks.
+    """
+    probe = _probe_import(text)
+
+    assert probe.imported == []
+    assert probe.backends == expected_backends
+
+
+def test_lazy_exports():
+    """Test that the APIs imported on first access are exported as usual."""
+    from mdformat_front_matters import _batch  # noqa: PLC0415
+
+    assert set(mdformat_front_matters.__all__) <= set(dir(mdformat_front_matters))
+    assert mdformat_front_matters.format_files is _batch.format_files
+    with pytest.raises(AttributeError, match="no attribute 'missing'"):
+        mdformat_front_matters.missing  # noqa: B018
+
+
 def test_large_yaml_performance(large_yaml_document):
     """Test that large YAML documents are formatted in reasonable time."""
     with Timer() as timer:
@@ -100,6 +221,65 @@ def test_large_toml_performance(large_toml_document):
     timer.assert_(2.0)  # noqa: PT009
 
 
+@pytest.mark.skipif(sys.version_info < (3, 11), reason="Requires tomllib")
+def test_toml_engine_selected(large_toml_document):
+    """Test that tomllib is used when available, with the `toml` output.
+
+    The speedup is tracked by the `engine/toml/` benchmarks.
+    """
+    assert isinstance(_get_toml_engine(), _TomllibTOMLEngine)
+    content = large_toml_document.split("+++")[1].strip().replace(" = ", " =  ")
+    outputs = [
+        _format_with_handler(
+            content, _SortingTOMLHandler(engine), engine.loads, sort_keys=False
+        )
+        for engine in (_LegacyTOMLEngine(), _TomllibTOMLEngine())
+    ]
+    assert outputs[0] == outputs[1] != content
+
+
+def _regex_normalized_toml_dumps(data: dict[str, Any]) -> str:
+    import toml  # type: ignore[import-untyped]  # noqa: PLC0415
+
+    output = re.sub(r"\n\n+(\[(?!\[))", r"\n\1", toml.dumps(data))
+    output = re.sub(r",\s*]", "]", output)
+    return re.sub(r"\n\n+$", "\n", output)
+
+
+def test_toml_writer_matches_regex_cleanup():
+    """Test that the one-pass writer emits what `toml.dumps` plus regexes did.
+
+    The speedup is tracked by the `dump/` benchmarks.
+    """
+    data = {
+        f"section_{i}": {
+            "title": f"Section {i}",
+            "tags": ["a", "b", "c"],
+            "items": [{"name": f"item {j}", "weight": j} for j in range(3)],
+        }
+        for i in range(100)
+    }
+    assert _TOMLWriter().dumps(data) == _regex_normalized_toml_dumps(data)
+
+
+@pytest.mark.parametrize(
+    ("text", "found"),
+    [
+        ("---\n" + "key: value\n" * 200_000 + "---\nbody\n", True),
+        ("+++\n" + 'key = "value"\n' * 200_000 + "+++\nbody\n", True),
+        ("---\n" + "key: value\n" * 200_000, False),
+        ("---\n" + "-- not a delimiter\n" * 200_000, False),
+    ],
+    ids=["yaml", "toml", "unclosed", "unclosed-dashes"],
+)
+def test_closing_delimiter_search_performance(text, found):
+    """Test that finding the closing delimiter does not loop over lines."""
+    state = StateBlock(text, MarkdownIt(), {}, [])
+    with Timer() as timer:
+        assert _front_matter_rule(state, 0, state.lineMax, silent=True) is found
+    timer.assert_(0.25)  # noqa: PT009
+
+
 def test_deeply_nested_yaml_performance(deeply_nested_yaml):
     """Test that deeply nested YAML is formatted in reasonable time."""
     with Timer() as timer:
@@ -135,6 +315,149 @@ tags:
     timer.assert_(3.0)  # noqa: PT009
 
 
+def test_yaml_engine_reuse(monkeypatch):
+    """Test that each engine configuration is built once and then reused.
+
+    The time saved is tracked by the `engine/yaml/rebuilt` benchmark.
+    """
+    blocks = [
+        f"title: Document {i}\ndate: 2024-01-{i % 28 + 1:02d}\ntags:\n  - tag1\n  - tag2"
+        for i in range(1, 101)
+    ]
+    builds: list[tuple[int, str]] = []
+
+    def counting_build(width: int, kind: str = _YAML_ROUND_TRIP) -> Any:  # noqa: ANN401
+        builds.append((width, kind))
+        return _build_yaml_engine(width, kind)
+
+    monkeypatch.setattr(
+        "mdformat_front_matters._formatters._build_yaml_engine", counting_build
+    )
+    monkeypatch.setattr(_YAML_ENGINES, "engines", {}, raising=False)
+    for block in blocks:
+        _format_yaml(block)
+        _format_yaml(f"{block}\n# Round-trip")
+    assert len(builds) == len(set(builds)) == 2  # noqa: PLR2004
+    with _yaml_engine(None) as first, _yaml_engine(None) as second:
+        assert first is second
+
+
+@pytest.mark.parametrize(
+    ("format_func", "full_format_func", "template"),
+    CANONICAL_TEMPLATES.values(),
+    ids=CANONICAL_TEMPLATES.keys(),
+)
+def test_canonical_fast_path(monkeypatch, format_func, full_format_func, template):
+    """Test that already formatted front matter skips the parse/dump round-trip.
+
+    The time saved is tracked by the `canonical/` benchmarks.
+    """
+    import toml  # noqa: PLC0415
+
+    blocks = [template.format(i=i) for i in range(1, 29)]
+    parsed: list[str] = []
+
+    def spy(loads: Any) -> Any:  # noqa: ANN401
+        def counting_loads(*args: Any) -> Any:  # noqa: ANN401
+            parsed.append(args[-1])
+            return loads(*args)
+
+        return counting_loads
+
+    monkeypatch.setattr(
+        "mdformat_front_matters._formatters._load_yaml", spy(_load_yaml)
+    )
+    monkeypatch.setattr(toml, "loads", spy(toml.loads))
+    monkeypatch.setattr(json, "loads", spy(json.loads))
+    if sys.version_info >= (3, 11):
+        import tomllib  # noqa: PLC0415
+
+        monkeypatch.setattr(tomllib, "loads", spy(tomllib.loads))
+
+    assert all(format_func(block) == block for block in blocks)
+    assert not parsed
+    assert all(full_format_func(block) == block for block in blocks)
+    assert len(parsed) == len(blocks)
+
+
+class _CountingKey(str):  # noqa: FURB189  # Mapping keys are str
+    """Key that counts the comparisons and hashes made while sorting."""
+
+    __slots__ = ()
+    operations = 0
+
+    def __lt__(self, other: str) -> bool:
+        _CountingKey.operations += 1
+        return str.__lt__(self, other)
+
+    def __eq__(self, other: object) -> bool:
+        _CountingKey.operations += 1
+        return str.__eq__(self, other)
+
+    def __hash__(self) -> int:
+        _CountingKey.operations += 1
+        return str.__hash__(self)
+
+
+def _shuffled_commented_map(count: int, key_type: type[str] = str) -> CommentedMap:
+    keys = [key_type(f"key_{i:06d}") for i in range(count)]
+    random.Random(count).shuffle(keys)  # noqa: S311
+    data = CommentedMap((key, key) for key in keys)
+    for key in keys[::10]:
+        # Set directly: yaml_add_eol_comment() is O(n) per call
+        data.ca.items[key] = [
+            None,
+            None,
+            CommentToken(f"# {key}\n", CommentMark(1)),
+            None,
+        ]
+    return data
+
+
+@pytest.mark.skipif(not _has_libyaml(), reason="Requires ruamel.yaml.clib")
+def test_libyaml_engine_selected(monkeypatch):
+    """Test that plain blocks go through libyaml, with the round-trip output.
+
+    The speedup is tracked by the `engine/` benchmarks.
+    """
+    blocks = generate_engine_blocks()
+    assert {_select_yaml_engine(block, None) for block in blocks} == {
+        _YAML_LIBYAML_LOADER
+    }
+    fast = [_format_yaml(block) for block in blocks]
+    monkeypatch.setattr(
+        "mdformat_front_matters._formatters._select_yaml_engine",
+        lambda *_: _YAML_ROUND_TRIP,
+    )
+    assert [_format_yaml(block) for block in blocks] == fast
+
+
+@pytest.mark.parametrize("count", [1_000, 10_000])
+def test_sort_scaling_with_key_count(count):
+    """Test that sorting a mapping makes O(n log n) key operations.
+
+    A lookup by position or a list scan per key would make O(n^2) of them.
+    The time taken is tracked by the `sort/` benchmarks.
+    """
+    data = _shuffled_commented_map(count, _CountingKey)
+    _CountingKey.operations = 0
+    with _yaml_engine(None) as yaml:
+        _UnicodePreservingYAMLHandler(yaml)._sort_mappings_in_place(data)  # noqa: SLF001
+    operations = _CountingKey.operations
+    assert list(data) == sorted(data)
+    # About 1.2 n log2(n) comparisons and hashes are made in practice
+    assert operations < 2 * count * math.log2(count), operations
+
+
+def test_sort_keeps_comments_with_keys():
+    """Test that sorting carries each key's comment along with it."""
+    data = _shuffled_commented_map(1_000)
+    commented = {key: data.ca.items[key][2].value for key in data.ca.items}
+    with _yaml_engine(None) as yaml:
+        _UnicodePreservingYAMLHandler(yaml)._sort_mappings_in_place(data)  # noqa: SLF001
+    assert {key: data.ca.items[key][2].value for key in data.ca.items} == commented
+
+
 @pytest.mark.parametrize("count", [10, 100, 500])
 def test_scalability_with_array_size(count):
     """Test that performance scales reasonably with array size."""
@@ -181,3 +504,64 @@ def test_empty_document_performance():
 
     # 1000 iterations should complete in under 2 seconds
     timer.assert_(2.0)  # noqa: PT009
+
+
+def test_stats_disabled_records_nothing(monkeypatch):
+    """Test that disabled phase hooks share one no-op and start no timers.
+
+    The remaining cost is tracked by the `stats/yaml/disabled` and
+    `stats/yaml/enabled` benchmarks.
+    """
+    blocks = [
+        f"title:   Document {i}\ndate: 2024-01-{i:02d}\nb: 1\na: 2"
+        for i in range(1, 21)
+    ]
+    timers: list[tuple[str, str]] = []
+
+    class CountingTimer(_PhaseTimer):
+        __slots__ = ()
+
+        def __init__(self, format_type: str, phase: str) -> None:
+            timers.append((format_type, phase))
+            super().__init__(format_type, phase)
+
+    monkeypatch.setattr("mdformat_front_matters._stats._PhaseTimer", CountingTimer)
+    reset_stats()
+    enable_stats(enabled=False)
+    assert phase("yaml", "parse") is phase("toml", "dump") is _NOOP
+    for block in blocks:
+        _format_yaml(block)
+    assert not timers
+    assert not get_stats().phases
+
+    enable_stats()
+    try:
+        for block in blocks:
+            _format_yaml(f"{block}\nc: 3")
+        assert timers
+        assert get_stats().phases["yaml"]["parse"].calls == len(blocks)
+    finally:
+        enable_stats(enabled=False)
+        reset_stats()
+
+
+def test_shared_data_parsed_once(monkeypatch):
+    """Test that readers of the shared data do not parse the block again.
+
+    The time saved is tracked by the `pipeline/` benchmarks.
+    """
+    text = "---\n" + "\n".join(f"key_{i}: value {i}" for i in range(200)) + "\n---\n"
+    loads: list[str] = []
+
+    def counting_load(yaml: Any, budget: YAMLBudget, content: str) -> Any:  # noqa: ANN401
+        loads.append(content)
+        return _load_yaml(yaml, budget, content)
+
+    monkeypatch.setattr("mdformat_front_matters._formatters._load_yaml", counting_load)
+    md = MarkdownIt().use(front_matters_plugin, data_settings=FrontMatterSettings())
+    env: dict[str, object] = {}
+    md.parse(text, env)
+    assert not loads  # Parsed on first access
+    for _ in range(3):
+        assert front_matter_data(env).data["key_199"] == "value 199"  # type: ignore[union-attr,index]
+    assert len(loads) == 1
@@ -2,9 +2,21 @@
 
 from __future__ import annotations
 
+import time
+import tracemalloc
+
 import mdformat
 import pytest
 
+from mdformat_front_matters import BlockLimits, YAMLBudget
+from mdformat_front_matters._formatters import (
+    _DEADLINE,
+    BudgetExceededError,
+    format_json,
+    format_toml,
+    format_yaml,
+)
+
 
 @pytest.mark.parametrize(
     ("test_name", "text"),
@@ -252,3 +264,159 @@ def test_performance_with_nested_structure(deeply_nested_structure):
     result = mdformat.text(deeply_nested_structure, extensions={"front_matters"})
     assert result is not None
     assert "# Content" in result
+
+
+def _billion_laughs(levels: int = 9) -> str:
+    lines = ['lol1: &lol1 ["lol","lol","lol","lol","lol","lol","lol","lol","lol"]']
+    lines.extend(
+        f"lol{level}: &lol{level} [{','.join([f'*lol{level - 1}'] * 9)}]"
+        for level in range(2, levels + 1)
+    )
+    return "\n".join(lines)
+
+
+@pytest.mark.parametrize(
+    ("content", "budget", "match"),
+    [
+        (_billion_laughs(), YAMLBudget(), "nodes"),
+        (
+            "a: &a [1, 2]\n" + "\n".join(f"k{i}: *a" for i in range(20)),
+            YAMLBudget(max_aliases=10),
+            "aliases",
+        ),
+        ("a: " + "[" * 500 + "]" * 500, YAMLBudget(), "nested"),
+        (
+            "a:\n"
+            + "".join(f"{'  ' * i}k:\n" for i in range(1, 30))
+            + "  " * 30
+            + "k: v",
+            YAMLBudget(max_depth=20),
+            "nested",
+        ),
+        (
+            "\n".join(f"k{i}:   v" for i in range(100)),
+            YAMLBudget(max_nodes=50),
+            "nodes",
+        ),
+        ("a:   " + "x" * 1000, YAMLBudget(max_output_chars=100), "output"),
+    ],
+    ids=["billion-laughs", "aliases", "flow-depth", "block-depth", "nodes", "output"],
+)
+def test_yaml_budget(content, budget, match):
+    """Test that blocks over budget are kept as-is, or rejected in strict mode."""
+    assert format_yaml(content, budget=budget) == content
+    with pytest.raises(BudgetExceededError, match=match):
+        format_yaml(content, strict=True, budget=budget)
+
+
+def test_yaml_budget_bounds_time_and_memory():
+    """Test that alias expansion is rejected before it costs time or memory."""
+    text = f"---\n{_billion_laughs()}\n---\n\n# Content\n"
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = mdformat.text(text, extensions={"front_matters"})
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert time.perf_counter() - start < 2  # noqa: PLR2004
+    assert peak < 16 * 1024 * 1024
+    assert result == text
+
+
+def test_yaml_budget_allows_aliases_within_limits():
+    """Test that anchors and aliases within the budget are still formatted."""
+    content = "b:   &x [1, 2]\na: *x\n"
+    budget = YAMLBudget(max_aliases=1)
+    assert format_yaml(content, sort_keys=False, budget=budget) == (
+        "b: &x [1, 2]\na: *x"
+    )
+
+
+def test_yaml_budget_options():
+    """Test that the budget is read from the plugin options."""
+    text = "---\na:   &a [1]\nb: *a\nc: *a\n---\n"
+    options = {"plugin": {"front_matters": {"front_matter_max_aliases": 1}}}
+    assert mdformat.text(text, extensions={"front_matters"}, options=options) == text
+    options["plugin"]["front_matters"]["strict_front_matter"] = True
+    with pytest.raises(BudgetExceededError):
+        mdformat.text(text, extensions={"front_matters"}, options=options)
+
+
+@pytest.mark.parametrize(
+    ("format_func", "content"),
+    [
+        (format_yaml, "b:   1\na: " + "x" * 100),
+        (format_toml, 'b  = 1\na = "' + "x" * 100 + '"'),
+        (format_json, '{"b": 1, "a": "' + "x" * 100 + '"}'),
+        (format_yaml, "b:   1\na: " + "é" * 40),  # 80 bytes in UTF-8
+    ],
+    ids=["yaml", "toml", "json", "multibyte"],
+)
+def test_max_bytes(format_func, content):
+    """Test that blocks over the size limit are kept as-is without parsing."""
+    limits = BlockLimits(max_bytes=50)
+    assert format_func(content, limits=limits) == content
+    with pytest.raises(BudgetExceededError, match="larger than 50 bytes"):
+        format_func(content, strict=True, limits=limits)
+    assert format_func(content, limits=BlockLimits(max_bytes=1000)) != content
+
+
+@pytest.mark.parametrize(
+    ("format_func", "content"),
+    [
+        (format_yaml, "title: A long enough title"),
+        (format_toml, 'title = "A long enough title"'),
+        (format_json, '{\n    "title": "A long enough title"\n}'),
+    ],
+    ids=["yaml", "toml", "json"],
+)
+def test_max_bytes_formatted(format_func, content):
+    """Test that the size limit also applies to blocks already formatted."""
+    assert format_func(content) == content  # Canonical, and now cached
+    limits = BlockLimits(max_bytes=10)
+    assert format_func(content, limits=limits) == content
+    with pytest.raises(BudgetExceededError, match="larger than 10 bytes"):
+        format_func(content, strict=True, limits=limits)
+
+
+def test_max_bytes_skips_parsing(monkeypatch):
+    """Test that the size check runs before the parser."""
+
+    def fail(*_):
+        raise AssertionError
+
+    monkeypatch.setattr("mdformat_front_matters._formatters._load_yaml", fail)
+    content = "b:   1\na: 2\n" * 100
+    assert format_yaml(content, limits=BlockLimits(max_bytes=100)) == content
+
+
+@pytest.mark.parametrize(
+    ("format_func", "content"),
+    [
+        (format_yaml, "\n".join(f"k{i}:   [{i}, {{x: 1}}]  # c" for i in range(2000))),
+        (format_toml, "\n".join(f"[t{i}]\nk  = {i}" for i in range(2000))),
+    ],
+    ids=["yaml", "toml"],
+)
+def test_timeout(format_func, content):
+    """Test that formatting past the time limit stops and keeps the content."""
+    limits = BlockLimits(timeout=1e-6)
+    start = time.perf_counter()
+    assert format_func(content, limits=limits) == content
+    assert time.perf_counter() - start < 1
+    with pytest.raises(BudgetExceededError, match="longer than"):
+        format_func(content, strict=True, limits=limits)
+    assert _DEADLINE.at is None
+    assert format_func(content, limits=BlockLimits(timeout=60)) != content
+
+
+def test_block_limit_options():
+    """Test that the limits are read from the plugin options."""
+    text = "---\nb:   1\na: 2\n---\n"
+    options = {"plugin": {"front_matters": {"front_matter_max_bytes": 5}}}
+    assert mdformat.text(text, extensions={"front_matters"}, options=options) == text
+    options["plugin"]["front_matters"] = {"front_matter_timeout": 60}
+    assert mdformat.text(text, extensions={"front_matters"}, options=options) == (
+        "---\nb: 1\na: 2\n---\n"
+    )
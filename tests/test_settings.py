@@ -0,0 +1,168 @@
+"""Tests for resolving the plugin options."""
+
+from __future__ import annotations
+
+import mdformat
+import pytest
+
+from mdformat_front_matters import BlockLimits, FrontMatterSettings, YAMLBudget
+from mdformat_front_matters._formatters import DEFAULT_CACHE_SIZE
+from mdformat_front_matters._settings import resolve_settings
+
+
+def _options(**api: object) -> dict[str, object]:
+    return {"mdformat": api}
+
+
+@pytest.mark.parametrize(
+    ("options", "expected"),
+    [
+        (_options(), FrontMatterSettings()),
+        (
+            _options(
+                wrap=80,
+                plugin={
+                    "front_matters": {
+                        "strict_front_matter": True,
+                        "sort_front_matter": True,
+                        "front_matter_cache_size": 0,
+                        "front_matter_cache_dir": ".cache",
+                        "front_matter_stats": True,
+                        "front_matter_max_aliases": 0,
+                        "front_matter_max_depth": 50,
+                        "front_matter_max_bytes": 4096,
+                        "front_matter_timeout": 2,
+                        "front_matter_max_lines": 100,
+                        "front_matter_formats": ["yaml", "toml"],
+                        "front_matter_data": True,
+                    }
+                },
+            ),
+            FrontMatterSettings(
+                strict=True,
+                sort_keys=True,
+                wrap=80,
+                cache_size=0,
+                cache_dir=".cache",
+                stats=True,
+                yaml_budget=YAMLBudget(max_aliases=0, max_depth=50),
+                limits=BlockLimits(max_bytes=4096, timeout=2.0),
+                max_lines=100,
+                formats=frozenset({"yaml", "toml"}),
+                data=True,
+            ),
+        ),
+        (
+            _options(wrap="keep", plugin={"front_matters": {"wrap_front_matter": 40}}),
+            FrontMatterSettings(wrap=40),
+        ),
+        (
+            _options(wrap_front_matter=0, wrap=80),
+            FrontMatterSettings(wrap=0),
+        ),
+        (
+            _options(
+                sort_front_matter=False,
+                wrap="no",
+                plugin={
+                    "front_matters": {
+                        "sort_front_matter": True,
+                        "front_matter_cache_size": True,
+                        "front_matter_cache_dir": "",
+                        "front_matter_max_nodes": -1,
+                        "front_matter_timeout": True,
+                        "front_matter_max_lines": 0,
+                        "front_matter_formats": "yaml,yml",
+                    }
+                },
+            ),
+            FrontMatterSettings(sort_keys=False, cache_size=DEFAULT_CACHE_SIZE),
+        ),
+    ],
+    ids=["defaults", "plugin", "wrap-override", "no-wrap", "invalid"],
+)
+def test_from_options(options, expected):
+    """Test precedence and the fallback for values of the wrong type."""
+    assert FrontMatterSettings.from_options(options) == expected
+
+
+def test_settings_are_immutable():
+    """Test that shared settings cannot be changed."""
+    settings = FrontMatterSettings(sort_keys=True)
+    with pytest.raises(AttributeError, match="immutable"):
+        settings.sort_keys = False
+    with pytest.raises(AttributeError, match="immutable"):
+        del settings.strict
+    assert not hasattr(settings, "__dict__")
+    assert hash(settings) == hash(FrontMatterSettings(sort_keys=True))
+    assert "sort_keys=True" in repr(settings)
+
+
+def test_resolve_settings_once_per_values(monkeypatch):
+    """Test that equal options are resolved once, however many blocks use them."""
+    calls = []
+    original = FrontMatterSettings.from_options.__func__  # type: ignore[attr-defined]
+
+    def counting(cls, options):
+        calls.append(options)
+        return original(cls, options)
+
+    monkeypatch.setattr(FrontMatterSettings, "from_options", classmethod(counting))
+    monkeypatch.setattr("mdformat_front_matters._settings._MEMO", {})
+    shared = {"plugin": {"front_matters": {"sort_front_matter": True}}}
+    first = resolve_settings({"mdformat": shared})
+    assert resolve_settings({"mdformat": shared}) is first
+    assert resolve_settings({"mdformat": dict(shared)}) is first
+    assert len(calls) == 1
+
+    text = "---\nb: 1\na: 2\n---\n"
+    assert mdformat.text(text, extensions={"front_matters"}, options=shared) == (
+        "---\na: 2\nb: 1\n---\n"
+    )
+    assert len(calls) == 1
+
+    # A mapping changed after use is not served stale settings
+    shared["plugin"]["front_matters"]["sort_front_matter"] = False
+    assert not resolve_settings({"mdformat": shared}).sort_keys
+    assert mdformat.text(text, extensions={"front_matters"}, options=shared) == text
+    assert len(calls) == 2  # noqa: PLR2004
+
+
+def test_resolve_settings_compares_types():
+    """Test that equal values of different types are not mixed up."""
+    assert resolve_settings(_options(wrap=1)).wrap == 1
+    assert resolve_settings(_options(wrap=True)).wrap is None
+    formats = resolve_settings(_options(front_matter_formats=["json"])).formats
+    assert formats == frozenset({"json"})
+    assert resolve_settings(_options(wrap={"unhashable": []})).wrap is None
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        ("json", frozenset({"json"})),
+        ("yaml, toml", frozenset({"yaml", "toml"})),
+        (("toml",), frozenset({"toml"})),
+        ("", None),
+        ("yaml,", None),
+        (["yaml", 1], None),
+        (1, None),
+    ],
+)
+def test_formats_option(value, expected, caplog):
+    """Test that unknown or malformed format lists enable every format."""
+    options = _options(plugin={"front_matters": {"front_matter_formats": value}})
+    assert FrontMatterSettings.from_options(options).formats == expected
+    warned = "Unknown front matter formats" in caplog.text
+    assert warned == (expected is None and isinstance(value, str | list))
+
+
+def test_unknown_formats_warn_once(caplog):
+    """Test that a typo in the formats is reported once, not per block."""
+    options = {"plugin": {"front_matters": {"front_matter_formats": "yaml,tmol"}}}
+    text = "+++\nb = 1\na = 2\n+++\n"
+    for _ in range(2):
+        assert mdformat.text(text, extensions={"front_matters"}, options=options) == (
+            "+++\nb = 1\na = 2\n+++\n"
+        )
+    assert caplog.text.count("'tmol'") == 1
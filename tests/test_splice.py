@@ -0,0 +1,101 @@
+"""Tests for formatting only the front matter of a document."""
+
+from __future__ import annotations
+
+import random
+import time
+
+import mdformat
+import pytest
+
+from mdformat_front_matters import check_front_matter, format_front_matter
+from tests.test_extract import _random_delimited_document
+from tests.test_mdit_plugins import _MD, _random_json_document
+
+BODY = "# Title\n\n*  unformatted   list\n\n\n\nTrailing   text"
+
+
+def _front_matter_lines(text: str) -> int:
+    tokens = _MD.parse(text)
+    if not tokens or tokens[0].type != "front_matter":
+        return 0
+    assert tokens[0].map is not None
+    return tokens[0].map[1]
+
+
+def test_front_matter_matches_mdformat():
+    """Test that the block is found and rendered as `mdformat.text` does."""
+    for seed in range(300):
+        rng = random.Random(seed)  # noqa: S311
+        for document in (_random_delimited_document(rng), _random_json_document(rng)):
+            text = document.replace("# Body", BODY)
+            end_line = _front_matter_lines(text)
+            body = "".join(text.splitlines(keepends=True)[end_line:])
+            result = format_front_matter(text)
+            assert result.endswith(body), text
+            if not end_line:
+                assert result == text
+                continue
+            expected = mdformat.text(text, extensions={"front_matters"})
+            head = result.removesuffix(body)
+            assert expected.startswith(head), text
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ("---\r\nb:   1\r\na: 2\r\n---\r\n*  x", "---\r\na: 2\r\nb: 1\r\n---\r\n*  x"),
+        ("+++\nb=1\na=2\n+++", "+++\na = 2\nb = 1\n+++\n"),
+        ('{\n"b": 1, "a": 2}\n\n*  x\n', '{\n    "a": 2,\n    "b": 1\n}\n\n*  x\n'),
+        ("---\nb: 1\n", "---\nb: 1\n"),
+        ("    ---\nb: 1\n---\n", "    ---\nb: 1\n---\n"),
+        ("", ""),
+    ],
+)
+def test_format_front_matter(text, expected):
+    """Test line endings, formats and documents without front matter."""
+    options = {"plugin": {"front_matters": {"sort_front_matter": True}}}
+    assert format_front_matter(text, options=options) == expected
+
+
+@pytest.mark.parametrize("lines", [1, 2_000])
+def test_body_size_does_not_matter(lines):
+    """Test that a 50 MB body is neither parsed nor rendered."""
+    front_matter = "---\n" + "key: value\n" * lines + "---\n"
+    body = "Some *text* here.\n\n" * 2_500_000
+    start = time.perf_counter()
+    result = format_front_matter(front_matter + body)
+    elapsed = time.perf_counter() - start
+    assert result.endswith(body)
+    assert elapsed < 0.5, f"Formatting took {elapsed:.2f}s"  # noqa: PLR2004
+
+
+def test_check_matches_format():
+    """Test that a block is reported exactly when formatting would change it."""
+    for seed in range(300):
+        rng = random.Random(seed)  # noqa: S311
+        for document in (_random_delimited_document(rng), _random_json_document(rng)):
+            text = document.replace("# Body", BODY)
+            result = check_front_matter(text)
+            if format_front_matter(text) == text:
+                assert result is None, text
+                continue
+            assert result is not None, text
+            end_line = _front_matter_lines(text)
+            head = "".join(text.splitlines(keepends=True)[:end_line])
+            assert result == (0, len(head.encode())), text
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ("---\nb: 1\na: 2\n---\n# Title\n", None),
+        ("---\nb:   1\na: 2\n---\n# Title\n", (0, 20)),
+        ("---\r\ntitle: é\r\n---\r\n# Title\r\n", None),
+        ("---\ntitle:  é\n---\n# Title\n", (0, 19)),
+        ("# Title\n", None),
+    ],
+)
+def test_check_front_matter(text, expected):
+    """Test byte ranges, with multibyte characters and CRLF line endings."""
+    assert check_front_matter(text) == expected
@@ -0,0 +1,111 @@
+"""Tests for the front matter formatting statistics."""
+
+from __future__ import annotations
+
+import subprocess  # noqa: S404
+import sys
+
+import mdformat
+import pytest
+
+from mdformat_front_matters import enable_stats, get_stats, reset_stats
+from mdformat_front_matters._formatters import cache_clear
+
+DOCUMENTS = [
+    "---\nb:   1\na: [1,2]\n---\n# YAML\n",
+    '+++\nb  =  1\na = "x"\n+++\n# TOML\n',
+    '{\n"b": 1, "a": {"c": 2}\n}\n# JSON\n',
+    "---\nb: [\n---\n# Invalid YAML\n",
+    "---\n# Thematic break\n",
+]
+
+
+@pytest.fixture
+def collect():
+    """Collect statistics from a clean state during the test."""
+    cache_clear()
+    reset_stats()
+    enable_stats()
+    yield
+    enable_stats(enabled=False)
+    reset_stats()
+
+
+def _format_all(**options: object) -> None:
+    for text in DOCUMENTS:
+        mdformat.text(text, extensions={"front_matters"}, options=options)
+
+
+def test_stats_off_by_default():
+    """Test that nothing is recorded unless collection is enabled."""
+    reset_stats()
+    _format_all()
+    assert get_stats().phases == {}
+
+
+@pytest.mark.usefixtures("collect")
+def test_stats_phases():
+    """Test that each phase is counted per format."""
+    _format_all(plugin={"front_matters": {"sort_front_matter": True}})
+
+    stats = get_stats()
+    assert set(stats.phases) == {"yaml", "toml", "json", "none"}
+    assert set(stats.phases["yaml"]) == {
+        "detect",
+        "parse",
+        "sort",
+        "dump",
+        "normalize",
+        "fallback",
+        "render",
+    }
+    assert set(stats.phases["json"]) == {
+        "detect",
+        "parse",
+        "dump",
+        "normalize",
+        "render",
+    }
+    assert stats.phases["yaml"]["fallback"].calls == 1
+    assert stats.phases["none"]["detect"].calls >= 1
+    # mdformat renders each document once; YAML has a valid and an invalid block
+    assert stats.phases["yaml"]["render"].calls == 2  # noqa: PLR2004
+    assert stats.phases["toml"]["render"].calls == 1
+    assert all(
+        entry.seconds >= 0
+        for phases in stats.phases.values()
+        for entry in phases.values()
+    )
+    assert (stats.cache_hits, stats.cache_misses) == (0, 4)
+
+    _format_all(plugin={"front_matters": {"sort_front_matter": True}})
+    assert get_stats().cache_hits == 4  # noqa: PLR2004
+
+    reset_stats()
+    assert get_stats() == get_stats()._replace(phases={}, cache_hits=0, cache_misses=0)
+
+
+@pytest.mark.usefixtures("collect")
+def test_stats_disk_cache(tmp_path):
+    """Test that persistent cache hits and misses are counted."""
+    options = {"plugin": {"front_matters": {"front_matter_cache_dir": str(tmp_path)}}}
+    _format_all(**options)
+    cache_clear()
+    _format_all(**options)
+    stats = get_stats()
+    assert (stats.disk_cache_hits, stats.disk_cache_misses) == (4, 4)
+
+
+def test_stats_cli(tmp_path):
+    """Test that the mdformat CLI flag prints a summary at exit."""
+    path = tmp_path / "doc.md"
+    path.write_text(DOCUMENTS[0])
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-m", "mdformat", "--front-matter-stats", str(path)],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    assert "yaml     render" in result.stderr
+    assert "cache: " in result.stderr
+    assert path.read_text() == "---\nb: 1\na: [1, 2]\n---\n\n# YAML\n"